@@ -0,0 +1,3 @@
+"""
+Mark.me - Benchmarks (rodar da raiz do repositório: python -m benchmarks.<nome>).
+"""
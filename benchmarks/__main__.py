@@ -0,0 +1,8 @@
+"""
+Permite rodar: python -m benchmarks run | compare (ver benchmarks/suite.py).
+"""
+import sys
+
+from benchmarks.suite import main
+
+sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Mark.me - API assíncrona: atraso do event loop com N tarefas em andamento (chamada síncrona no
+loop vs. PoolAssincrono de threads e de processos), eventos de progresso e cancelamento.
+Falha (código 1) se o atraso máximo passar de --limite-ms, se os PDFs gerados divergirem da
+versão síncrona ou se o cancelamento não interromper a tarefa.
+
+Uso: python -m benchmarks.bench_assincrono [--tarefas 50] [--paginas 20] [--concorrencia 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.sintetico import gerar_pdf_em_processo, nomes_termos
+from mark_me.assincrono import PoolAssincrono, Progresso, destacar_pdf_multi_async
+from mark_me.core import destacar_pdf_multi, find_matches
+
+_TIQUE = 0.005
+
+
+async def _relogio(atrasos: list[float], parar: asyncio.Event) -> None:
+    """Dorme _TIQUE seguidas vezes e anota quanto cada despertar atrasou."""
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(_TIQUE)
+        atrasos.append(time.perf_counter() - inicio - _TIQUE)
+
+
+async def _medir(rodar) -> tuple[float, float, float]:
+    """(segundos, atraso máximo ms, atraso mediano ms) do loop enquanto rodar() executa."""
+    atrasos: list[float] = []
+    parar = asyncio.Event()
+    relogio = asyncio.create_task(_relogio(atrasos, parar))
+    await asyncio.sleep(0)
+    inicio = time.perf_counter()
+    await rodar()
+    segundos = time.perf_counter() - inicio
+    parar.set()
+    await relogio
+    atrasos.sort()
+    return segundos, atrasos[-1] * 1000, atrasos[len(atrasos) // 2] * 1000
+
+
+def _assinatura(path: str, pares) -> dict[str, int]:
+    return find_matches(path, pares).contagens
+
+
+async def _principal(args, tmp: str, entradas: list[str], pares) -> int:
+    falhas = 0
+    saidas = [os.path.join(tmp, f"s{i}.pdf") for i in range(args.tarefas)]
+
+    async def sincrono():
+        for i, saida in enumerate(saidas):
+            destacar_pdf_multi(entradas[i % len(entradas)], saida, pares)
+
+    print(f"{args.tarefas} tarefas, {len(entradas)} PDFs de {args.paginas} páginas, concorrência {args.concorrencia}")
+    print(f"{'modo':>10} {'total (s)':>10} {'atraso máx (ms)':>16} {'mediana (ms)':>13} {'eventos':>8}")
+    segundos, maximo, mediana = await _medir(sincrono)
+    print(f"{'no loop':>10} {segundos:>10.2f} {maximo:>16.1f} {mediana:>13.1f} {'-':>8}")
+    esperado = [_assinatura(s, pares) for s in saidas]
+
+    for kind in ("thread", "process"):
+        for saida in saidas:
+            os.remove(saida)
+        eventos = 0
+
+        async def tarefa(i: int) -> None:
+            nonlocal eventos
+            progresso = Progresso()
+            job = asyncio.create_task(destacar_pdf_multi_async(
+                entradas[i % len(entradas)], saidas[i], pares, pool=pool, progress=progresso,
+            ))
+            async for _ in progresso:
+                eventos += 1
+            await job
+
+        # Threads: uma tarefa por vez (PyMuPDF); a concorrência vale para processos
+        concorrencia = args.concorrencia if kind == "process" else 1
+        async with PoolAssincrono(max_concurrency=concorrencia, kind=kind) as pool:
+            await pool.executar("contar_ocorrencias_multi", entradas[0], ["aquecer"])  # cria o pool fora da medida
+
+            async def todas():
+                await asyncio.gather(*(tarefa(i) for i in range(args.tarefas)))
+
+            segundos, maximo, mediana = await _medir(todas)
+            print(f"{kind:>10} {segundos:>10.2f} {maximo:>16.1f} {mediana:>13.1f} {eventos:>8}")
+            if maximo > args.limite_ms:
+                print(f"  FALHA: atraso máximo acima de {args.limite_ms} ms")
+                falhas += 1
+            if [_assinatura(s, pares) for s in saidas] != esperado:
+                print("  FALHA: PDFs diferentes da versão síncrona")
+                falhas += 1
+
+            # Cancelamento: cancela no primeiro evento de progresso da busca
+            saida = os.path.join(tmp, f"cancelada-{kind}.pdf")
+            progresso = Progresso()
+            job = asyncio.create_task(destacar_pdf_multi_async(
+                args.grande, saida, pares, pool=pool, progress=progresso, save_mode="incremental",
+            ))
+            async for fase, feitas, _ in progresso:
+                if feitas:
+                    break
+            inicio = time.perf_counter()
+            job.cancel()
+            try:
+                await job
+            except asyncio.CancelledError:
+                pass
+            espera = time.perf_counter() - inicio
+            ok = job.cancelled() and not os.path.exists(saida)
+            print(f"  cancelamento: {espera * 1000:.0f} ms até liberar a vaga, saída {'ausente' if ok else 'GRAVADA'}")
+            if not ok:
+                falhas += 1
+    return 1 if falhas else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--tarefas", type=int, default=50)
+    parser.add_argument("--paginas", type=int, default=20)
+    parser.add_argument("--arquivos", type=int, default=5, help="PDFs distintos (repetidos entre as tarefas)")
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--limite-ms", type=float, default=100.0, help="Atraso máximo aceito no event loop")
+    args = parser.parse_args()
+
+    termos = nomes_termos(3)
+    pares = [(termo, "#ffff00") for termo in termos]
+    with tempfile.TemporaryDirectory() as tmp:
+        entradas = [
+            gerar_pdf_em_processo(os.path.join(tmp, f"e{i}.pdf"), paginas=args.paginas, termos=termos, seed=i)
+            for i in range(args.arquivos)
+        ]
+        args.grande = gerar_pdf_em_processo(os.path.join(tmp, "grande.pdf"), paginas=300, termos=termos)
+        return asyncio.run(_principal(args, tmp, entradas, pares))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
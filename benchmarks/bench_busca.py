@@ -0,0 +1,61 @@
+"""
+Mark.me - Busca por termo (search_for por termo) vs. TextPage única por página.
+
+Uso: python -m benchmarks.bench_busca [--paginas 200] [--termos 1,5,10,20,30]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from benchmarks.sintetico import gerar_pdf, nomes_termos
+from mark_me.core import _buscar_na_pagina
+
+
+def _busca_por_termo(path: str, termos: list[str]) -> list[list[fitz.Rect]]:
+    """Comportamento anterior: search_for re-extrai o texto da página para cada termo."""
+    doc = fitz.open(path)
+    res = [pagina.search_for(termo) for pagina in doc for termo in termos]
+    doc.close()
+    return res
+
+
+def _busca_textpage(path: str, termos: list[str]) -> list[list[fitz.Rect]]:
+    doc = fitz.open(path)
+    res = []
+    for pagina in doc:
+        achados = _buscar_na_pagina(pagina, termos)
+        res.extend(achados[termo] for termo in termos)
+    doc.close()
+    return res
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=200)
+    parser.add_argument("--termos", default="1,5,10,20,30")
+    args = parser.parse_args()
+    contagens = [int(x) for x in args.termos.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        gerar_pdf(path, paginas=args.paginas, termos=nomes_termos(max(contagens)))
+        print(f"{'termos':>6} {'por termo (s)':>14} {'textpage (s)':>13} {'speedup':>8}")
+        for n in contagens:
+            termos = nomes_termos(n)
+            t0 = time.perf_counter()
+            antes = _busca_por_termo(path, termos)
+            t1 = time.perf_counter()
+            depois = _busca_textpage(path, termos)
+            t2 = time.perf_counter()
+            if antes != depois:
+                print(f"ERRO: retângulos diferentes com {n} termos")
+                return 1
+            print(f"{n:>6} {t1 - t0:>14.3f} {t2 - t1:>13.3f} {(t1 - t0) / (t2 - t1):>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
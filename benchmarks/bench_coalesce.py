@@ -0,0 +1,60 @@
+"""
+Mark.me - Anotações por ocorrência vs agrupadas (coalesce): número de anotações, tempo de
+gravação, tamanho da saída e tempo de renderização das páginas marcadas.
+
+Uso: python -m benchmarks.bench_coalesce [--paginas 200] [--densidade 0.05]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from benchmarks.sintetico import gerar_pdf, nomes_termos
+from mark_me.core import COALESCE_MODES, apply_plan, find_matches
+
+
+def _renderizar(path: str) -> tuple[int, float]:
+    """(anotações no arquivo, segundos para renderizar todas as páginas a 72 dpi)."""
+    doc = fitz.open(path)
+    anotacoes = 0
+    t0 = time.perf_counter()
+    for pagina in doc:
+        anotacoes += len(list(pagina.annots()))
+        pagina.get_pixmap(dpi=72, annots=True)
+    segundos = time.perf_counter() - t0
+    doc.close()
+    return anotacoes, segundos
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=200)
+    parser.add_argument("--termos", type=int, default=5)
+    parser.add_argument("--densidade", type=float, default=0.05, help="Fração das palavras que são termos")
+    parser.add_argument("--save-mode", default="compact")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        termos = nomes_termos(args.termos)
+        gerar_pdf(path, paginas=args.paginas, termos=termos, densidade=args.densidade)
+        plan = find_matches(path, [(termo, "#ffff00") for termo in termos])
+        print(f"{args.paginas} páginas, {plan.total} ocorrências, save_mode={args.save_mode}")
+        print(f"{'coalesce':>9} {'anotações':>10} {'gravação (s)':>13} {'saída (MB)':>11} {'render (s)':>11}")
+        for modo in COALESCE_MODES:
+            saida = os.path.join(tmp, f"saida_{modo}.pdf")
+            t0 = time.perf_counter()
+            apply_plan(plan, saida, save_mode=args.save_mode, coalesce=modo)
+            gravacao = time.perf_counter() - t0
+            anotacoes, render = _renderizar(saida)
+            print(
+                f"{modo:>9} {anotacoes:>10} {gravacao:>13.3f} "
+                f"{os.path.getsize(saida) / 1e6:>11.2f} {render:>11.3f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
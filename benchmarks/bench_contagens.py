@@ -0,0 +1,60 @@
+"""
+Mark.me - Contagens ao digitar (GUI): custo por tecla contando no índice de texto montado uma
+vez (indexar_pdf + contar_nos_indices) vs. contar_ocorrencias_multi no PDF a cada tecla.
+Falha (código 1) se as contagens divergirem ou se uma tecla passar de --limite-ms.
+
+Uso: python -m benchmarks.bench_contagens [--paginas 1000] [--limite-ms 100]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.sintetico import gerar_pdf_em_processo, nomes_termos
+from mark_me.core import contar_nos_indices, contar_ocorrencias_multi, indexar_pdf
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=1000)
+    parser.add_argument("--limite-ms", type=float, default=100.0, help="Tempo máximo aceito por tecla no índice")
+    args = parser.parse_args()
+
+    termos = nomes_termos(3)
+    digitado = termos[1]
+    teclas = [digitado[:i] for i in range(1, len(digitado) + 1)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = gerar_pdf_em_processo(os.path.join(tmp, "longo.pdf"), paginas=args.paginas, termos=termos)
+        inicio = time.perf_counter()
+        indices = indexar_pdf(path)
+        for indice in indices:
+            indice.canonico
+        t_indexar = time.perf_counter() - inicio
+
+        por_tecla = []
+        for prefixo in teclas:
+            inicio = time.perf_counter()
+            no_indice = contar_nos_indices(indices, termos[:1] + [prefixo])
+            por_tecla.append(time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        no_pdf = contar_ocorrencias_multi(path, [digitado])
+        t_pdf = time.perf_counter() - inicio
+
+        print(f"{args.paginas} páginas; indexação única: {t_indexar:.2f}s")
+        print(f"{'modo':>22} {'mediana (ms)':>13} {'máx (ms)':>9}")
+        print(f"{'índice, por tecla':>22} {statistics.median(por_tecla) * 1000:>13.1f} {max(por_tecla) * 1000:>9.1f}")
+        print(f"{'PDF, por tecla':>22} {t_pdf * 1000:>13.1f} {'-':>9}")
+        falhas = 0
+        if no_indice[digitado] != no_pdf:
+            print(f"  FALHA: índice conta {no_indice[digitado]}, PDF conta {no_pdf}")
+            falhas += 1
+        if max(por_tecla) * 1000 > args.limite_ms:
+            print(f"  FALHA: tecla acima de {args.limite_ms} ms")
+            falhas += 1
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
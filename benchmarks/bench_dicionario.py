@@ -0,0 +1,55 @@
+"""
+Mark.me - Busca de glossários: tempo por tamanho da lista de termos, busca por termo
+(find_matches) vs uma passada por página com o autômato (find_matches(dictionary=True)).
+
+Uso: python -m benchmarks.bench_dicionario [--paginas 50] [--termos 10,100,1000,10000,50000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.sintetico import gerar_pdf, nomes_termos
+from mark_me.core import _automato, find_matches
+
+# Acima disso a busca por termo levaria minutos; fica de fora da tabela
+_MAX_POR_TERMO = 1000
+
+
+def _glossario(n: int) -> list[str]:
+    """n termos: os do PDF sintético (termo000, ...) e o resto palavras que não aparecem nele."""
+    presentes = nomes_termos(min(n, 20))
+    return presentes + [f"ausente{i:05d} glossario" for i in range(n - len(presentes))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=50)
+    parser.add_argument("--termos", default="10,100,1000,10000,50000", help="Tamanhos de lista, separados por vírgula")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        gerar_pdf(path, paginas=args.paginas, termos=nomes_termos(20), densidade=0.02)
+        print(f"{args.paginas} páginas")
+        print(f"{'termos':>8} {'por termo (s)':>14} {'autômato (s)':>13} {'montagem (s)':>13} {'ocorrências':>12}")
+        for n in (int(x) for x in args.termos.split(",")):
+            pares = [(termo, "#ffff00") for termo in _glossario(n)]
+            por_termo = "—"
+            if n <= _MAX_POR_TERMO:
+                t0 = time.perf_counter()
+                find_matches(path, pares)
+                por_termo = f"{time.perf_counter() - t0:.3f}"
+            _automato.cache_clear()
+            t0 = time.perf_counter()
+            _automato(tuple(termo for termo, _ in pares))
+            montagem = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            plan = find_matches(path, pares, dictionary=True)
+            automato = time.perf_counter() - t0
+            print(f"{n:>8} {por_termo:>14} {automato:>13.3f} {montagem:>13.3f} {plan.total:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""
+Mark.me - Fila de trabalhos (mark watch / mark worker): custo da fila SQLite por trabalho
+(registrar + pegar + concluir), vazão com 1 e N workers em processos e retomada de um
+trabalho cujo worker morreu no meio.
+Falha (código 1) se algum arquivo for processado duas vezes, ficar sem processar ou se o
+trabalho do worker morto não for retomado.
+
+Uso: python -m benchmarks.bench_fila [--pdfs 40] [--paginas 20] [--workers 4]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.sintetico import gerar_pdf_em_processo, nomes_termos
+from mark_me.batch import OK
+from mark_me.fila import FilaTrabalhos, trabalhar
+
+
+def _registrar(fila: FilaTrabalhos, pdfs: list[str], pares, pasta_saida: str) -> None:
+    config = fila.config(pares, {"dictionary": False, "pages": None, "save_mode": "compact", "coalesce": "none"})
+    for pdf in pdfs:
+        info = os.stat(pdf)
+        saida = os.path.join(pasta_saida, os.path.basename(pdf))
+        fila.enfileirar(pdf, saida, info.st_size, info.st_mtime, config)
+
+
+def _worker_que_morre(caminho: str) -> None:
+    """Pega um trabalho com prazo curto e morre sem concluir (como uma máquina que cai)."""
+    with FilaTrabalhos(caminho) as fila:
+        fila.pegar("morto:1", prazo=0.5)
+    os._exit(1)
+
+
+def _rodar(caminho: str, workers: int) -> float:
+    ctx = multiprocessing.get_context("spawn")
+    inicio = time.perf_counter()
+    processos = [ctx.Process(target=trabalhar, args=(caminho,), kwargs={"uma_vez": True}) for _ in range(workers)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join()
+    return time.perf_counter() - inicio
+
+
+def _verificar(caminho: str, n: int, tentativas: dict[int, int] | None = None) -> int:
+    """Falhas: trabalho não concluído ok ou com mais tentativas que o esperado."""
+    with FilaTrabalhos(caminho) as fila:
+        linhas = fila._con.execute("SELECT id, status, tentativas FROM trabalhos ORDER BY id").fetchall()
+    falhas = 0
+    if len(linhas) != n:
+        print(f"  FALHA: {len(linhas)} trabalhos na fila, esperados {n}")
+        falhas += 1
+    for id_, status, feitas in linhas:
+        esperado = (tentativas or {}).get(id_, 1)
+        if status != OK or feitas != esperado:
+            print(f"  FALHA: trabalho {id_} com status {status} e {feitas} tentativas (esperado ok, {esperado})")
+            falhas += 1
+    return falhas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--pdfs", type=int, default=40)
+    parser.add_argument("--paginas", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--operacoes", type=int, default=2000, help="Trabalhos vazios para medir o custo da fila")
+    args = parser.parse_args()
+
+    termos = nomes_termos(3)
+    pares = [(termo, "#ffff00") for termo in termos]
+    falhas = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        # Custo da fila sozinha: registrar, pegar e concluir trabalhos sem PDF
+        with FilaTrabalhos(os.path.join(tmp, "vazia.db")) as fila:
+            config = fila.config(pares, {})
+            inicio = time.perf_counter()
+            for i in range(args.operacoes):
+                fila.enfileirar(f"/x/{i}.pdf", f"/y/{i}.pdf", i, 0.0, config)
+            while (trabalho := fila.pegar("bench:1")) is not None:
+                fila.concluir(trabalho, OK)
+            por_trabalho = (time.perf_counter() - inicio) / args.operacoes
+        print(f"fila SQLite: {por_trabalho * 1000:.2f} ms por trabalho (registrar + pegar + concluir)")
+
+        pdfs = [
+            gerar_pdf_em_processo(os.path.join(tmp, f"doc{i}.pdf"), paginas=args.paginas, termos=termos, seed=i)
+            for i in range(args.pdfs)
+        ]
+        print(f"{args.pdfs} PDFs de {args.paginas} páginas, {os.cpu_count()} núcleos")
+        print(f"{'workers':>8} {'segundos':>9} {'arquivos/s':>11}")
+        for workers in sorted({1, args.workers}):
+            caminho = os.path.join(tmp, f"fila{workers}.db")
+            pasta_saida = os.path.join(tmp, f"saida{workers}")
+            with FilaTrabalhos(caminho) as fila:
+                _registrar(fila, pdfs, pares, pasta_saida)
+            segundos = _rodar(caminho, workers)
+            print(f"{workers:>8} {segundos:>9.2f} {args.pdfs / segundos:>11.1f}")
+            falhas += _verificar(caminho, args.pdfs)
+            saidas = [nome for nome in os.listdir(pasta_saida) if nome.endswith(".pdf")]
+            if len(saidas) != args.pdfs:
+                print(f"  FALHA: {len(saidas)} saídas, esperadas {args.pdfs}")
+                falhas += 1
+
+        # Worker morre com um trabalho reservado: vencido o prazo, outro worker retoma
+        caminho = os.path.join(tmp, "queda.db")
+        with FilaTrabalhos(caminho) as fila:
+            _registrar(fila, pdfs[:3], pares, os.path.join(tmp, "saida_queda"))
+        ctx = multiprocessing.get_context("spawn")
+        morto = ctx.Process(target=_worker_que_morre, args=(caminho,))
+        morto.start()
+        morto.join()
+        time.sleep(0.6)
+        inicio = time.perf_counter()
+        trabalhar(caminho, uma_vez=True)
+        print(f"queda de um worker: trabalho retomado na 2ª tentativa ({time.perf_counter() - inicio:.2f}s para esvaziar)")
+        falhas += _verificar(caminho, 3, tentativas={1: 2})
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
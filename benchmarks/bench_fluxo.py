@@ -0,0 +1,65 @@
+"""
+Mark.me - PDF recebido em memória (ex.: corpo de uma requisição): arquivo temporário de ida e
+volta vs. bytes direto no core (destacar_pdf_multi(dados, None, pares) -> bytes).
+
+Uso: python -m benchmarks.bench_fluxo [--pdfs 30] [--paginas 10]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.sintetico import gerar_pdf, nomes_termos
+from mark_me.core import destacar_pdf_multi, find_matches
+
+
+def _via_disco(dados: bytes, pares, pasta: str) -> bytes:
+    entrada = os.path.join(pasta, "entrada.pdf")
+    saida = os.path.join(pasta, "saida.pdf")
+    with open(entrada, "wb") as f:
+        f.write(dados)
+    destacar_pdf_multi(entrada, saida, pares)
+    with open(saida, "rb") as f:
+        return f.read()
+
+
+def _em_memoria(dados: bytes, pares, pasta: str) -> bytes:
+    return destacar_pdf_multi(dados, None, pares)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--pdfs", type=int, default=30)
+    parser.add_argument("--paginas", type=int, default=10)
+    args = parser.parse_args()
+
+    termos = nomes_termos(3)
+    pares = [(termo, "#ffff00") for termo in termos]
+    with tempfile.TemporaryDirectory() as tmp:
+        corpos = []
+        for i in range(args.pdfs):
+            with open(gerar_pdf(os.path.join(tmp, f"e{i}.pdf"), paginas=args.paginas, termos=termos, seed=i), "rb") as f:
+                corpos.append(f.read())
+        print(f"{args.pdfs} PDFs de {args.paginas} páginas em memória")
+        print(f"{'modo':>10} {'mediana (ms)':>13} {'total (s)':>10}")
+        saidas = {}
+        for nome, funcao in (("disco", _via_disco), ("memória", _em_memoria)):
+            tempos = []
+            saidas[nome] = []
+            for dados in corpos:
+                inicio = time.perf_counter()
+                saidas[nome].append(funcao(dados, pares, tmp))
+                tempos.append(time.perf_counter() - inicio)
+            print(f"{nome:>10} {statistics.median(tempos) * 1000:>13.1f} {sum(tempos):>10.2f}")
+        iguais = all(
+            find_matches(a, pares).contagens == find_matches(b, pares).contagens
+            for a, b in zip(saidas["disco"], saidas["memória"])
+        )
+        print(f"mesmas ocorrências nas saídas: {'sim' if iguais else 'NÃO'}")
+    return 0 if iguais else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
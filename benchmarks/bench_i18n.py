@@ -0,0 +1,74 @@
+"""
+Mark.me - Custo de i18n.t() comparado a uma consulta de dicionário, com chave traduzida, chave
+que cai no idioma padrão e chave ausente; e carga dos catálogos a partir do JSON e do módulo
+compilado (python -m mark_me.i18n --compile). Falha (código 1) se t() passar de --limite vezes
+o custo da consulta pura.
+
+Uso: python -m benchmarks.bench_i18n [--limite 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+from mark_me import i18n
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _ns(stmt, numero: int = 200_000) -> float:
+    return min(timeit.repeat(stmt, number=numero, repeat=5)) / numero * 1e9
+
+
+def _carga_ms() -> float:
+    """Tempo (ms) de set_lang na primeira chamada, num processo novo (melhor de 5)."""
+    codigo = (
+        "import time; from mark_me import i18n; t0 = time.perf_counter(); i18n.set_lang('pt_BR'); "
+        "print((time.perf_counter() - t0) * 1000)"
+    )
+    return min(
+        float(subprocess.run([sys.executable, "-c", codigo], cwd=_RAIZ, capture_output=True, text=True, check=True).stdout)
+        for _ in range(5)
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--limite", type=float, default=10.0, help="Máximo de t() / consulta de dicionário")
+    args = parser.parse_args()
+
+    i18n.set_lang("pt_BR")
+    catalogo = dict(i18n._catalogs()["pt_BR"])
+    so_no_padrao = next((k for k in i18n._catalogs()["en"] if k not in i18n._load("pt_BR")), "ui.generate")
+    base = _ns(lambda: catalogo.get("ui.generate", "ui.generate"))
+    casos = {
+        "dict.get": base,
+        "t() traduzida": _ns(lambda: i18n.t("ui.generate")),
+        "t() via padrão": _ns(lambda: i18n.t(so_no_padrao)),
+        "t() ausente": _ns(lambda: i18n.t("nao.existe")),
+        "t() com {n}": _ns(lambda: i18n.t("msg.limit_body", n=32), 50_000),
+    }
+    print(f"{'caso':>16} {'ns/chamada':>11} {'x dict.get':>11}")
+    for caso, ns in casos.items():
+        print(f"{caso:>16} {ns:>11.0f} {ns / base:>11.1f}")
+
+    # Sem módulo compilado já existente, compara JSON x compilado e remove o que gerou
+    if not os.path.exists(i18n._COMPILED):
+        json_ms = _carga_ms()
+        i18n.compile_catalogs()
+        try:
+            compilado_ms = _carga_ms()
+        finally:
+            os.remove(i18n._COMPILED)
+        print(f"primeira carga: JSON {json_ms:.2f} ms, módulo compilado {compilado_ms:.2f} ms")
+
+    pior = max(ns for caso, ns in casos.items() if caso.startswith("t()") and "{n}" not in caso)
+    if pior > base * args.limite:
+        print(f"ERRO: t() custa {pior / base:.1f}x uma consulta de dicionário (limite {args.limite}x).", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
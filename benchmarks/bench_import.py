@@ -0,0 +1,94 @@
+"""
+Mark.me - Tempo de importação na partida a frio (python -X importtime): mark --help, erro de
+argumento e import mark_me. Conta só o tempo cumulativo dos módulos mark_me.* (com o que eles
+importam), sem o site/runpy do interpretador. Falha (código 1) se algum caso passar do orçamento,
+carregar módulos pesados que só deveriam vir quando usados (PyMuPDF, Tkinter) ou carregar
+módulos do mark_me além dos da partida (cli, modos, stats).
+
+Uso: python -m benchmarks.bench_import [--orcamento-ms 50] [--repeticoes 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+# Sem importar benchmarks.suite: ele carrega o PyMuPDF, e este script não precisa
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CASOS = {
+    "mark --help": ["-m", "mark_me", "mark", "--help"],
+    "mark (sem argumentos)": ["-m", "mark_me", "mark"],
+    "import mark_me": ["-c", "import mark_me"],
+}
+PROIBIDOS = ("fitz", "pymupdf", "tkinter")
+# Únicos módulos do pacote que a partida pode carregar; o resto (core, lote, servidor...) só quando usado
+MODULOS_PARTIDA = {"mark_me", "mark_me.cli", "mark_me.modos", "mark_me.stats"}
+# Os casos levam ~25 ms; antes da importação preguiçosa, mais de 140 ms (core e PyMuPDF na partida)
+ORCAMENTO_MS = 50.0
+
+
+def _do_pacote(nome: str) -> bool:
+    return nome == "mark_me" or nome.startswith("mark_me.")
+
+
+def medir(args: list[str]) -> tuple[float, set[str]]:
+    """(ms de importação dos módulos mark_me.*, módulos importados) de uma execução a frio."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=_RAIZ, capture_output=True, text=True,
+    )
+    total_us = 0
+    modulos = set()
+    # O -X importtime lista os filhos antes do pai, com mais recuo: de trás para frente, a pilha
+    # diz se o módulo já está dentro de um mark_me.* (cujo cumulativo já o inclui)
+    pilha: list[tuple[int, bool]] = []
+    for linha in reversed(proc.stderr.splitlines()):
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, cumulativo, nome = linha[len("import time:"):].split("|")
+        recuo = len(nome) - len(nome.lstrip())
+        nome = nome.strip()
+        modulos.add(nome)
+        while pilha and pilha[-1][0] >= recuo:
+            pilha.pop()
+        dentro = bool(pilha) and pilha[-1][1]
+        if _do_pacote(nome) and not dentro:
+            total_us += int(cumulativo)
+        pilha.append((recuo, dentro or _do_pacote(nome)))
+    return total_us / 1000, modulos
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument(
+        "--orcamento-ms", type=float, default=ORCAMENTO_MS, help="Tempo de importação do mark_me máximo por caso",
+    )
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    falhas = []
+    print(f"{'caso':>24} {'importação (ms)':>16}  módulos fora da partida")
+    for caso, cmd in CASOS.items():
+        tempos, pesados = [], set()
+        for _ in range(args.repeticoes):
+            ms, modulos = medir(cmd)
+            tempos.append(ms)
+            pesados |= {m for m in modulos if m.split(".")[0] in PROIBIDOS}
+            pesados |= {m for m in modulos if _do_pacote(m)} - MODULOS_PARTIDA
+        mediana = statistics.median(tempos)
+        print(f"{caso:>24} {mediana:>16.1f}  {', '.join(sorted(pesados)[:3]) or '-'}")
+        if mediana > args.orcamento_ms:
+            falhas.append(f"{caso}: {mediana:.1f} ms > {args.orcamento_ms:.0f} ms")
+        if pesados:
+            falhas.append(f"{caso}: carregou {', '.join(sorted(pesados)[:3])}")
+    if falhas:
+        print("FORA DO ORÇAMENTO:", file=sys.stderr)
+        for falha in falhas:
+            print(f"  {falha}", file=sys.stderr)
+        return 1
+    print(f"Dentro do orçamento de {args.orcamento_ms:.0f} ms, sem PyMuPDF/Tkinter nem core/lote/servidor.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+"""
+Mark.me - Parada antecipada: contar_ocorrencias_multi (busca tudo) vs. has_any_match e
+count_matches(limit=...) (que param na primeira ocorrência / no limite), com a ocorrência no começo,
+no meio ou ausente do documento.
+
+Uso: python -m benchmarks.bench_iter [--paginas 300] [--termos 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import fitz
+
+from benchmarks.sintetico import gerar_pdf_em_processo, nomes_termos
+from mark_me.core import contar_ocorrencias_multi, count_matches, has_any_match
+
+
+def _medir(funcao, *args, **kwargs) -> tuple[float, object]:
+    inicio = time.perf_counter()
+    valor = funcao(*args, **kwargs)
+    return time.perf_counter() - inicio, valor
+
+
+def _com_termo_na_pagina(origem: str, destino: str, pagina: int | None, termo: str) -> str:
+    """Cópia do PDF com termo escrito só na página indicada (None = em nenhuma)."""
+    doc = fitz.open(origem)
+    if pagina is not None:
+        doc[pagina].insert_text((72, 72), termo, fontsize=11)
+    doc.save(destino)
+    doc.close()
+    return destino
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=300)
+    parser.add_argument("--termos", type=int, default=5)
+    parser.add_argument("--limite", type=int, default=10, help="limit= de count_matches")
+    args = parser.parse_args()
+
+    termos = nomes_termos(args.termos)
+    alvo = "alvounico"
+    with tempfile.TemporaryDirectory() as tmp:
+        base = gerar_pdf_em_processo(os.path.join(tmp, "base.pdf"), paginas=args.paginas, termos=termos)
+        casos = {
+            "no começo": _com_termo_na_pagina(base, os.path.join(tmp, "inicio.pdf"), 0, alvo),
+            "no meio": _com_termo_na_pagina(base, os.path.join(tmp, "meio.pdf"), args.paginas // 2, alvo),
+            "ausente": _com_termo_na_pagina(base, os.path.join(tmp, "ausente.pdf"), None, alvo),
+        }
+        print(f"{args.paginas} páginas; tempos em segundos")
+        print(f"{'ocorrência':>12} {'contar tudo':>12} {'has_any':>9} {'count(limit)':>13}")
+        for nome, path in casos.items():
+            t_tudo, total = _medir(contar_ocorrencias_multi, path, [alvo])
+            t_any, achou = _medir(has_any_match, path, [alvo])
+            if achou != (total > 0):
+                print(f"  FALHA: has_any_match={achou} com total {total}")
+                return 1
+            print(f"{nome:>12} {t_tudo:>12.3f} {t_any:>9.3f} {'-':>13}")
+        t_tudo, total = _medir(contar_ocorrencias_multi, base, termos)
+        t_lim, parcial = _medir(count_matches, base, termos, limit=args.limite)
+        print(f"{'termos (' + str(total) + ')':>12} {t_tudo:>12.3f} {'-':>9} {t_lim:>13.3f}")
+        if parcial != min(total, args.limite):
+            print(f"  FALHA: count_matches(limit={args.limite}) = {parcial}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
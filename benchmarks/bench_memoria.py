@@ -0,0 +1,74 @@
+"""
+Mark.me - Pico de memória (RSS) do CLI mark conforme o número de páginas, com e sem --chunk-pages.
+
+No modo em blocos o pico deve ficar estável com o crescimento do documento; o script falha
+(código 1) se o pico em blocos do maior PDF passar do menor em mais de --limite, ou se as
+marcações diferirem das da gravação única.
+
+Uso: python -m benchmarks.bench_memoria [--paginas 250,500,1000,2000] [--chunk-pages 100] [--escaneado]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from benchmarks.bench_workers import assinatura_anotacoes
+from benchmarks.sintetico import gerar_pdf_em_processo, nomes_termos
+from benchmarks.suite import _rodar
+
+
+def _cli(entrada: str, saida: str, termos: list[str], extra: list[str]) -> list[str]:
+    cmd = [sys.executable, "-W", "ignore", "-m", "mark_me", "mark", entrada, "-o", saida, "--save-mode", "incremental"]
+    for termo in termos:
+        cmd += ["-t", termo]
+    return cmd + extra
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", default="250,500,1000,2000", help="Tamanhos de documento, separados por vírgula")
+    parser.add_argument("--termos", type=int, default=5)
+    parser.add_argument("--densidade", type=float, default=0.002, help="Baixa: o plano de ocorrências cresce com elas")
+    parser.add_argument("--chunk-pages", type=int, default=100)
+    parser.add_argument("--escaneado", action="store_true", help="Página com imagem de fundo (PDF digitalizado)")
+    parser.add_argument("--limite", type=float, default=0.25, help="Crescimento tolerado do pico em blocos (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    tamanhos = sorted(int(n) for n in args.paginas.split(","))
+    termos = nomes_termos(args.termos)
+    picos_blocos = []
+    print(f"{'páginas':>8} {'único (MB)':>11} {'blocos (MB)':>12} {'único (s)':>10} {'blocos (s)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for paginas in tamanhos:
+            entrada = os.path.join(tmp, f"entrada_{paginas}.pdf")
+            gerar_pdf_em_processo(
+                entrada, paginas=paginas, termos=termos, densidade=args.densidade, escaneado=args.escaneado,
+            )
+            unico, blocos = os.path.join(tmp, f"unico_{paginas}.pdf"), os.path.join(tmp, f"blocos_{paginas}.pdf")
+            s_unico, rss_unico, _ = _rodar(_cli(entrada, unico, termos, []))
+            s_blocos, rss_blocos, _ = _rodar(_cli(entrada, blocos, termos, ["--chunk-pages", str(args.chunk_pages)]))
+            picos_blocos.append(rss_blocos)
+            print(f"{paginas:>8} {rss_unico:>11.1f} {rss_blocos:>12.1f} {s_unico:>10.2f} {s_blocos:>11.2f}")
+            os.remove(entrada)
+        # Só depois das medições: abrir as saídas aqui faria este processo crescer
+        iguais = all(
+            assinatura_anotacoes(os.path.join(tmp, f"unico_{n}.pdf"))
+            == assinatura_anotacoes(os.path.join(tmp, f"blocos_{n}.pdf"))
+            for n in tamanhos
+        )
+
+    codigo = 0
+    if not iguais:
+        print("ERRO: marcações em blocos diferem da gravação única.", file=sys.stderr)
+        codigo = 1
+    crescimento = picos_blocos[-1] / picos_blocos[0] - 1
+    if crescimento > args.limite:
+        print(f"ERRO: pico em blocos cresceu {crescimento:.0%} (limite {args.limite:.0%}).", file=sys.stderr)
+        codigo = 1
+    elif iguais:
+        print(f"Marcações idênticas; pico em blocos variou {crescimento:+.0%} entre {tamanhos[0]} e {tamanhos[-1]} páginas.")
+    return codigo
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+"""
+Mark.me - Pré-filtro de páginas: busca com prefilter=False (search_for em toda página) vs.
+prefilter=True (pula as páginas cujo texto não contém nenhum termo), vs. o automático (padrão)
+e vs. pages= (só um trecho); e num documento denso, onde o automático deve desligar o filtro.
+Falha (código 1) se o pré-filtro mudar as ocorrências encontradas.
+
+Uso: python -m benchmarks.bench_prefiltro [--paginas 500] [--termos 10] [--densidade 0.0005] [--densidade-alta 0.05]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.sintetico import gerar_pdf_em_processo, nomes_termos
+from mark_me.core import find_matches
+from mark_me.stats import Estatisticas
+
+
+def _assinatura(plan) -> dict:
+    return {
+        numero: {termo: [tuple(r) for r in rects] for termo, rects in achados.items()}
+        for numero, achados in plan.paginas.items()
+    }
+
+
+def _medir(path: str, pares, **kwargs):
+    stats = Estatisticas()
+    inicio = time.perf_counter()
+    plan = find_matches(path, pares, stats=stats, **kwargs)
+    return time.perf_counter() - inicio, plan, stats.contagens
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=500)
+    parser.add_argument("--termos", type=int, default=10)
+    parser.add_argument("--densidade", type=float, default=0.0005, help="Termos raros: a maioria das páginas sem nenhum")
+    parser.add_argument("--densidade-alta", type=float, default=0.05, help="Documento denso: termos em toda página")
+    args = parser.parse_args()
+
+    termos = nomes_termos(args.termos)
+    pares = [(termo, "#ffff00") for termo in termos]
+    trecho = f"1-{max(1, args.paginas // 10)}"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = gerar_pdf_em_processo(
+            os.path.join(tmp, "raro.pdf"), paginas=args.paginas, termos=termos, densidade=args.densidade,
+        )
+        print(f"{args.paginas} páginas, {args.termos} termos, densidade {args.densidade}")
+        print(f"{'modo':>18} {'segundos':>9} {'ocorrências':>12} {'puladas':>8} {'fora':>6}")
+        casos = (
+            ("sem pré-filtro", {"prefilter": False}),
+            ("com pré-filtro", {"prefilter": True}),
+            ("automático", {}),
+            (f"pages={trecho}", {"pages": trecho}),
+        )
+        planos = {}
+        for nome, kwargs in casos:
+            segundos, plan, contagens = _medir(path, pares, **kwargs)
+            planos[nome] = plan
+            print(
+                f"{nome:>18} {segundos:>9.3f} {plan.total:>12} "
+                f"{contagens.get('paginas_puladas', 0):>8} {contagens.get('paginas_fora', 0):>6}"
+            )
+        if not _assinatura(planos["sem pré-filtro"]) == _assinatura(planos["com pré-filtro"]) == _assinatura(planos["automático"]):
+            print("  FALHA: o pré-filtro mudou as ocorrências")
+            return 1
+        fim = int(trecho.split("-")[1])
+        esperado = {n: v for n, v in _assinatura(planos["sem pré-filtro"]).items() if n < fim}
+        if _assinatura(planos[f"pages={trecho}"]) != esperado:
+            print(f"  FALHA: pages={trecho} diferente das mesmas páginas na busca completa")
+            return 1
+
+        path = gerar_pdf_em_processo(
+            os.path.join(tmp, "denso.pdf"), paginas=args.paginas, termos=termos, densidade=args.densidade_alta,
+        )
+        print(f"documento denso (densidade {args.densidade_alta})")
+        planos = {}
+        for nome, kwargs in casos[:3]:
+            segundos, plan, contagens = _medir(path, pares, **kwargs)
+            planos[nome] = plan
+            print(f"{nome:>18} {segundos:>9.3f} {plan.total:>12} {contagens.get('paginas_puladas', 0):>8} {'-':>6}")
+        if not _assinatura(planos["sem pré-filtro"]) == _assinatura(planos["com pré-filtro"]) == _assinatura(planos["automático"]):
+            print("  FALHA: o pré-filtro mudou as ocorrências (documento denso)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
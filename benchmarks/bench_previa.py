@@ -0,0 +1,115 @@
+"""
+Mark.me - Pré-visualização (GUI) de um PDF longo: custo de abrir (índice + plano das marcações)
+e de renderizar só as páginas visíveis vs. renderizar todas de uma vez; e o LRU de imagens ao
+rolar o documento para frente e de volta, sem passar do limite de memória.
+Falha (código 1) se o LRU passar de --cache-mb ou se a volta não reaproveitar as imagens.
+
+Uso: python -m benchmarks.bench_previa [--paginas 2000] [--visiveis 3] [--cache-mb 96]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import fitz
+
+from benchmarks.sintetico import gerar_pdf_em_processo, nomes_termos
+from mark_me.core import indexar_pdf, plano_nos_indices, renderizar_pagina
+from mark_me.gui import _LRUImagens
+
+
+class _Imagem:
+    """Só o tamanho de uma tk.PhotoImage (o LRU não olha o conteúdo)."""
+
+    def __init__(self, largura: int, altura: int):
+        self._largura, self._altura = largura, altura
+
+    def width(self) -> int:
+        return self._largura
+
+    def height(self) -> int:
+        return self._altura
+
+
+def _tamanho_ppm(ppm: bytes) -> tuple[int, int]:
+    largura, altura = ppm.split(maxsplit=3)[1:3]
+    return int(largura), int(altura)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=2000)
+    parser.add_argument("--visiveis", type=int, default=3, help="Páginas visíveis de uma vez (mais uma de cada lado)")
+    parser.add_argument("--cache-mb", type=int, default=96)
+    parser.add_argument("--rolagem", type=int, default=200, help="Páginas percorridas ao rolar")
+    args = parser.parse_args()
+
+    termos = nomes_termos(5)
+    pares = [(termo, "#ffff00") for termo in termos]
+    falhas = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = gerar_pdf_em_processo(os.path.join(tmp, "longo.pdf"), paginas=args.paginas, termos=termos)
+        inicio = time.perf_counter()
+        indices = indexar_pdf(path)
+        doc = fitz.open(path)
+        tamanhos = [(pagina.rect.width, pagina.rect.height) for pagina in doc]
+        t_abrir = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        plan = plano_nos_indices(path, indices, pares)
+        t_plano = time.perf_counter() - inicio
+
+        janela = range(args.visiveis + 2)
+        inicio = time.perf_counter()
+        imagens = {numero: renderizar_pagina(doc, plan, numero) for numero in janela}
+        t_visiveis = time.perf_counter() - inicio
+        por_pagina = t_visiveis / len(janela)
+
+        print(f"{args.paginas} páginas ({len(tamanhos)} tamanhos lidos), {plan.total} ocorrências")
+        print(f"{'etapa':>30} {'segundos':>9}")
+        print(f"{'abrir (índice + tamanhos)':>30} {t_abrir:>9.3f}")
+        print(f"{'plano das marcações':>30} {t_plano:>9.3f}")
+        print(f"{f'{len(janela)} páginas visíveis':>30} {t_visiveis:>9.3f}")
+        print(f"{'todas, estimado':>30} {por_pagina * args.paginas:>9.1f}")
+
+        largura, altura = _tamanho_ppm(next(iter(imagens.values())))
+        limite = args.cache_mb * 1024 * 1024
+        lru = _LRUImagens(limite)
+        maximo = pedidas = 0
+
+        def rolar(paginas) -> int:
+            nonlocal maximo, pedidas
+            acertos = 0
+            for topo in paginas:
+                for numero in range(max(topo - 1, 0), min(topo + args.visiveis + 1, args.paginas)):
+                    if lru.obter(numero) is None:
+                        pedidas += 1
+                        lru.guardar(numero, _Imagem(largura, altura))
+                    else:
+                        acertos += 1
+                    maximo = max(maximo, lru._bytes)
+            return acertos
+
+        rolar(range(args.rolagem))
+        pedidas_ida = pedidas
+        # Volta o trecho que ainda cabe no LRU
+        cabem = limite // (largura * altura * 4)
+        volta = range(args.rolagem - 1, max(args.rolagem - cabem + args.visiveis + 2, 0) - 1, -1)
+        acertos = rolar(volta)
+        print(
+            f"LRU: {cabem} páginas de {largura}x{altura} em {args.cache_mb} MB; máximo usado "
+            f"{maximo / 1024 / 1024:.1f} MB; ida renderizou {pedidas_ida}, volta ({len(volta)} posições) "
+            f"renderizou {pedidas - pedidas_ida} e reaproveitou {acertos}"
+        )
+        if maximo > limite:
+            print("  FALHA: LRU acima do limite de memória")
+            falhas += 1
+        if pedidas != pedidas_ida:
+            print("  FALHA: a volta renderizou páginas que deviam estar no LRU")
+            falhas += 1
+        doc.close()
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
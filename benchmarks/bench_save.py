@@ -0,0 +1,40 @@
+"""
+Mark.me - Tempo de gravação e tamanho da saída por save_mode (fast, compact, incremental).
+
+Uso: python -m benchmarks.bench_save [--paginas 200] [--escaneado]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.sintetico import gerar_pdf, nomes_termos
+from mark_me.core import SAVE_MODES, apply_plan, find_matches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=200)
+    parser.add_argument("--termos", type=int, default=10)
+    parser.add_argument("--escaneado", action="store_true", help="Página com imagem de fundo (PDF digitalizado)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        termos = nomes_termos(args.termos)
+        gerar_pdf(path, paginas=args.paginas, termos=termos, escaneado=args.escaneado)
+        plan = find_matches(path, [(termo, "#ffff00") for termo in termos])
+        entrada_mb = os.path.getsize(path) / 1e6
+        print(f"{args.paginas} páginas, {plan.total} ocorrências, entrada {entrada_mb:.2f} MB")
+        print(f"{'modo':>12} {'gravação (s)':>13} {'saída (MB)':>11}")
+        for modo in SAVE_MODES:
+            saida = os.path.join(tmp, f"saida_{modo}.pdf")
+            t0 = time.perf_counter()
+            apply_plan(plan, saida, save_mode=modo)
+            segundos = time.perf_counter() - t0
+            print(f"{modo:>12} {segundos:>13.3f} {os.path.getsize(saida) / 1e6:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""
+Mark.me - Latência do CLI mark em muitos PDFs pequenos: cada chamada no próprio processo vs
+encaminhada a um mark serve já no ar (--server).
+
+Uso: python -m benchmarks.bench_servidor [--chamadas 30] [--paginas 3]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.sintetico import gerar_pdf, nomes_termos
+from benchmarks.suite import _RAIZ, _rodar
+from mark_me.server import enviar
+
+
+def _esperar_servidor(sock: str, limite: float = 30.0) -> None:
+    fim = time.monotonic() + limite
+    while enviar({"op": "ping"}, sock) is None:
+        if time.monotonic() > fim:
+            raise RuntimeError("mark serve não respondeu")
+        time.sleep(0.05)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--chamadas", type=int, default=30)
+    parser.add_argument("--paginas", type=int, default=3)
+    parser.add_argument("--arquivos", type=int, default=5, help="PDFs distintos (repetidos entre as chamadas)")
+    args = parser.parse_args()
+
+    termos = nomes_termos(3)
+    py = [sys.executable, "-W", "ignore", "-m", "mark_me", "mark"]
+    with tempfile.TemporaryDirectory() as tmp:
+        entradas = []
+        for i in range(args.arquivos):
+            entradas.append(gerar_pdf(os.path.join(tmp, f"e{i}.pdf"), paginas=args.paginas, termos=termos, seed=i))
+        sock = os.path.join(tmp, "markme.sock")
+        servidor = subprocess.Popen(py + ["serve", "--socket", sock], cwd=_RAIZ, stderr=subprocess.DEVNULL)
+        try:
+            _esperar_servidor(sock)
+            print(f"{args.chamadas} chamadas, {args.arquivos} PDFs de {args.paginas} páginas")
+            print(f"{'modo':>12} {'mediana (s)':>12} {'total (s)':>10}")
+            for modo, extra in (("processo", []), ("servidor", ["--server", sock])):
+                tempos = []
+                for n in range(args.chamadas):
+                    cmd = py + [entradas[n % len(entradas)], "-o", os.path.join(tmp, "saida.pdf")]
+                    for termo in termos:
+                        cmd += ["-t", termo]
+                    tempos.append(_rodar(cmd + extra)[0])
+                print(f"{modo:>12} {statistics.median(tempos):>12.3f} {sum(tempos):>10.2f}")
+        finally:
+            servidor.terminate()
+            servidor.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,158 @@
+"""
+Mark.me - Ocorrências em colunas (TabelaOcorrencias, usada pelo MatchPlan) vs. um fitz.Rect por
+ocorrência ({página: {termo: [Rect]}}, como o plano guardava antes): memória por ocorrência,
+tempo para montar, contar por termo, percorrer página a página e coleta de lixo, e bytes para
+mandar o plano a outro processo. Termos frequentes (tipo stopword) em muitas páginas.
+Falha (código 1) se as duas formas divergirem.
+
+"montar" parte das ocorrências já encontradas (tuplas): no plano antigo, cria os Rect; nas colunas,
+copia os números. "idem, Rect por página" é o caminho da anotação, que cria os Rect de uma página
+por vez (descartados em seguida).
+
+Uso: python -m benchmarks.bench_tabela [--paginas 10000] [--por-pagina 100] [--pdf-paginas 200]
+"""
+import argparse
+import gc
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import fitz
+
+from benchmarks.sintetico import gerar_pdf_em_processo, nomes_termos
+from mark_me.core import find_matches
+from mark_me.tabela import TabelaOcorrencias
+
+
+def _paginas_sinteticas(n_paginas: int, por_pagina: int, termos: list[str]):
+    """Gera (página, {termo: [(x0, y0, x1, y1)]}) como a busca devolve, página a página."""
+    rng = random.Random(0)
+    for numero in range(n_paginas):
+        achados: dict[str, list[tuple]] = {}
+        for _ in range(por_pagina):
+            x, y = rng.uniform(36, 500), rng.uniform(36, 780)
+            achados.setdefault(rng.choice(termos), []).append((x, y, x + 20.0, y + 9.0))
+        yield numero, achados
+
+
+def _medir(funcao, *args):
+    """(resultado de funcao(*args), segundos, bytes alocados que continuam vivos)."""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    valor = funcao(*args)
+    segundos = time.perf_counter() - inicio
+    vivos = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return valor, segundos, vivos
+
+
+def _objetos(paginas) -> dict:
+    return {numero: {t: [fitz.Rect(r) for r in rects] for t, rects in achados.items()} for numero, achados in paginas}
+
+
+def _tabela(paginas, termos) -> TabelaOcorrencias:
+    tabela = TabelaOcorrencias(termos)
+    for numero, achados in paginas:
+        tabela.acrescentar(numero, achados)
+    return tabela
+
+
+def _cronometro(funcao, *args) -> float:
+    inicio = time.perf_counter()
+    funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def _contar_objetos(plano: dict) -> dict[str, int]:
+    contagens: dict[str, int] = {}
+    for achados in plano.values():
+        for termo, rects in achados.items():
+            contagens[termo] = contagens.get(termo, 0) + len(rects)
+    return contagens
+
+
+def _percorrer_objetos(plano: dict) -> float:
+    return sum(r.x1 - r.x0 for achados in plano.values() for rects in achados.values() for r in rects)
+
+
+def _percorrer_tabela(tabela: TabelaOcorrencias) -> float:
+    return sum(x1 - x0 for _, _, x0, _, x1, _ in tabela.linhas())
+
+
+def _percorrer_rects(tabela: TabelaOcorrencias) -> float:
+    return sum(r.x1 - r.x0 for numero in tabela.faixas() for rects in tabela.da_pagina(numero).values() for r in rects)
+
+
+def _iguais(a: dict, b: dict) -> bool:
+    """Mesmos termos e retângulos (as colunas guardam float32)."""
+    return a.keys() == b.keys() and all(
+        len(a[t]) == len(b[t]) and all(abs(u - v) < 1e-3 for ra, rb in zip(a[t], b[t]) for u, v in zip(ra, rb))
+        for t in a
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=10000)
+    parser.add_argument("--por-pagina", type=int, default=100, help="Ocorrências por página")
+    parser.add_argument("--termos", type=int, default=20)
+    parser.add_argument("--pdf-paginas", type=int, default=200, help="PDF real com termos frequentes (0 = pular)")
+    args = parser.parse_args()
+
+    termos = nomes_termos(args.termos)
+    paginas = list(_paginas_sinteticas(args.paginas, args.por_pagina, termos))
+    n = args.paginas * args.por_pagina
+    objetos, t_obj, mem_obj = _medir(_objetos, paginas)
+    tabela, t_tab, mem_tab = _medir(_tabela, paginas, termos)
+    del paginas
+
+    falhas = 0
+    if _contar_objetos(objetos) != {t: c for t, c in tabela.contagens().items() if c}:
+        print("  FALHA: contagens diferentes")
+        falhas += 1
+    amostra = random.Random(1).sample(range(args.paginas), 20)
+    if not all(_iguais(objetos[numero], tabela.da_pagina(numero)) for numero in amostra):
+        print("  FALHA: retângulos diferentes")
+        falhas += 1
+
+    print(f"{n} ocorrências ({args.paginas} páginas x {args.por_pagina}), {args.termos} termos")
+    print(f"{'':>26} {'Rect por ocorrência':>20} {'colunas':>10}")
+    print(f"{'bytes por ocorrência':>26} {mem_obj / n:>20.1f} {mem_tab / n:>10.1f}")
+    print(f"{'montar (s)':>26} {t_obj:>20.3f} {t_tab:>10.3f}")
+    print(
+        f"{'contar por termo (s)':>26} {_cronometro(_contar_objetos, objetos):>20.3f} "
+        f"{_cronometro(tabela.contagens):>10.3f}"
+    )
+    print(
+        f"{'percorrer tudo (s)':>26} {_cronometro(_percorrer_objetos, objetos):>20.3f} "
+        f"{_cronometro(_percorrer_tabela, tabela):>10.3f}"
+    )
+    print(f"{'  idem, Rect por página (s)':>26} {'-':>20} {_cronometro(_percorrer_rects, tabela):>10.3f}")
+    t_gc_obj = _cronometro(gc.collect)
+    dados_obj = len(pickle.dumps(objetos, protocol=pickle.HIGHEST_PROTOCOL))
+    del objetos
+    t_gc_tab = _cronometro(gc.collect)
+    print(f"{'gc.collect() com o plano (s)':>26} {t_gc_obj:>20.3f} {t_gc_tab:>10.3f}")
+    print(f"{'pickle (MB)':>26} {dados_obj / 1e6:>20.1f} {len(pickle.dumps(tabela)) / 1e6:>10.1f}")
+
+    if args.pdf_paginas:
+        frequentes = nomes_termos(3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = gerar_pdf_em_processo(
+                os.path.join(tmp, "frequente.pdf"), paginas=args.pdf_paginas, termos=frequentes, densidade=0.3,
+            )
+            plan, segundos, vivos = _medir(find_matches, path, [(t, "#ffff00") for t in frequentes])
+        print(
+            f"find_matches em PDF real ({args.pdf_paginas} páginas, 30% das palavras são termos): "
+            f"{plan.total} ocorrências em {segundos:.2f}s; plano com {vivos / plan.total:.1f} bytes por ocorrência"
+        )
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
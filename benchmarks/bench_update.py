@@ -0,0 +1,77 @@
+"""
+Mark.me - Reaplicar a lista de termos num PDF já marcado: refazer tudo a partir do original
+(destacar_pdf_multi) vs. atualizar_pdf_multi (só a diferença, gravação incremental), ao
+acrescentar um termo, trocar uma cor e tirar um termo de uma lista de N.
+Falha (código 1) se as marcas da atualização diferirem das de refazer tudo.
+
+Uso: python -m benchmarks.bench_update [--paginas 300] [--termos 30]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import fitz
+
+from benchmarks.sintetico import gerar_pdf_em_processo, nomes_termos
+from mark_me.core import AUTOR_MARCAS, atualizar_pdf_multi, destacar_pdf_multi
+
+
+def _marcas(path: str) -> set:
+    """(página, termo, cor, retângulo) de cada marca do Mark.me no PDF."""
+    doc = fitz.open(path)
+    marcas = set()
+    for pagina in doc:
+        for annot in pagina.annots():
+            if annot.info["title"] == AUTOR_MARCAS:
+                cor = tuple(round(c, 3) for c in annot.colors["stroke"])
+                marcas.add((pagina.number, annot.info["subject"], cor, tuple(round(v, 2) for v in annot.rect)))
+    doc.close()
+    return marcas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=300)
+    parser.add_argument("--termos", type=int, default=30)
+    args = parser.parse_args()
+
+    termos = nomes_termos(args.termos + 1)
+    base = [(termo, "#ffff00") for termo in termos[:-1]]
+    casos = {
+        "+1 termo": base + [(termos[-1], "#00ff00")],
+        "1 cor trocada": [(base[0][0], "#ff0000")] + base[1:],
+        "-1 termo": base[:-1],
+    }
+    falhas = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        original = gerar_pdf_em_processo(os.path.join(tmp, "original.pdf"), paginas=args.paginas, termos=termos)
+        marcado = os.path.join(tmp, "marcado.pdf")
+        destacar_pdf_multi(original, marcado, base)
+        print(f"{args.paginas} páginas, {args.termos} termos já marcados; tempos em segundos")
+        print(f"{'mudança':>14} {'refazer tudo':>13} {'atualizar':>10} {'bytes acrescentados':>20}")
+        for nome, pares in casos.items():
+            completo = os.path.join(tmp, "completo.pdf")
+            inicio = time.perf_counter()
+            destacar_pdf_multi(original, completo, pares)
+            t_tudo = time.perf_counter() - inicio
+
+            atualizado = os.path.join(tmp, "atualizado.pdf")
+            shutil.copyfile(marcado, atualizado)
+            antes = os.path.getsize(atualizado)
+            inicio = time.perf_counter()
+            atualizar_pdf_multi(atualizado, atualizado, pares)
+            t_atualizar = time.perf_counter() - inicio
+            acrescentados = os.path.getsize(atualizado) - antes
+
+            print(f"{nome:>14} {t_tudo:>13.3f} {t_atualizar:>10.3f} {acrescentados:>20}")
+            if _marcas(atualizado) != _marcas(completo):
+                print("  FALHA: marcas diferentes de refazer tudo")
+                falhas += 1
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Mark.me - Escala da busca paralela por páginas (workers=N) em um PDF sintético grande.
+
+Uso: python -m benchmarks.bench_workers [--paginas 2000] [--workers 1,2,4,8]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from benchmarks.sintetico import gerar_pdf, nomes_termos
+from mark_me.core import apply_plan, find_matches
+
+
+def assinatura_anotacoes(path: str) -> list[tuple]:
+    """Lista (página, tipo, vértices, cor) de todas as anotações, para comparar saídas."""
+    doc = fitz.open(path)
+    res = []
+    for pagina in doc:
+        for annot in pagina.annots():
+            res.append((pagina.number, annot.type[0], tuple(annot.vertices or ()), annot.colors.get("stroke")))
+    doc.close()
+    return res
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--paginas", type=int, default=2000)
+    parser.add_argument("--termos", type=int, default=20)
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+    lista_workers = [int(x) for x in args.workers.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        termos = nomes_termos(args.termos)
+        gerar_pdf(path, paginas=args.paginas, termos=termos)
+        pares = [(termo, "#ffff00") for termo in termos]
+        print(f"{args.paginas} páginas, {args.termos} termos, {os.cpu_count()} núcleos")
+        print(f"{'workers':>7} {'busca (s)':>10} {'gravação (s)':>13} {'speedup busca':>14}")
+        referencia = None
+        base = None
+        for n in lista_workers:
+            saida = os.path.join(tmp, f"saida_{n}.pdf")
+            t0 = time.perf_counter()
+            plan = find_matches(path, pares, workers=n)
+            t1 = time.perf_counter()
+            apply_plan(plan, saida)
+            t2 = time.perf_counter()
+            base = base or (t1 - t0)
+            assinatura = assinatura_anotacoes(saida)
+            if referencia is None:
+                referencia = assinatura
+            elif assinatura != referencia:
+                print(f"ERRO: anotações com {n} workers diferem da execução serial")
+                return 1
+            print(f"{n:>7} {t1 - t0:>10.3f} {t2 - t1:>13.3f} {base / (t1 - t0):>13.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,29 @@
+"""
+Mark.me - Um caso de benchmark em processo próprio (o processo pai mede o pico de RSS).
+
+Uso interno: python -m benchmarks.caso {contar,destacar} ENTRADA SAIDA TERMO [TERMO ...]
+Imprime o tempo da chamada (sem a inicialização do interpretador) em JSON.
+"""
+import json
+import sys
+import time
+
+from mark_me.core import contar_ocorrencias_multi, destacar_pdf_multi
+
+
+def main() -> int:
+    caso, entrada, saida, *termos = sys.argv[1:]
+    t0 = time.perf_counter()
+    if caso == "contar":
+        contar_ocorrencias_multi(entrada, termos)
+    elif caso == "destacar":
+        destacar_pdf_multi(entrada, saida, [(termo, "#ffff00") for termo in termos])
+    else:
+        print(f"caso desconhecido: {caso}", file=sys.stderr)
+        return 2
+    print(json.dumps({"segundos": time.perf_counter() - t0}))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
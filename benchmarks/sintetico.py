@@ -0,0 +1,75 @@
+"""
+Mark.me - Gerador determinístico de PDFs sintéticos para os benchmarks.
+"""
+import multiprocessing
+import random
+
+import fitz  # PyMuPDF
+
+_SILABAS = ("ca", "de", "lo", "ra", "ti", "mo", "su", "ne", "pa", "ve", "li", "gor", "tan", "bri", "sel")
+
+
+def nomes_termos(n: int) -> list[str]:
+    """Retorna n termos distintos (termo000, termo001, ...) que não aparecem no texto de fundo."""
+    return [f"termo{i:03d}" for i in range(n)]
+
+
+def _palavra(rng: random.Random) -> str:
+    return "".join(rng.choice(_SILABAS) for _ in range(rng.randint(1, 4)))
+
+
+def _imagem_ruido(rng: random.Random, largura: int = 300, altura: int = 420) -> fitz.Pixmap:
+    """Imagem em tons de cinza claros com ruído (pouco compressível, como uma digitalização)."""
+    amostras = bytes(rng.randint(200, 255) for _ in range(largura * altura))
+    return fitz.Pixmap(fitz.csGRAY, largura, altura, amostras, False)
+
+
+def gerar_pdf(
+    path: str,
+    paginas: int = 100,
+    palavras_por_pagina: int = 300,
+    termos: list[str] | None = None,
+    densidade: float = 0.01,
+    seed: int = 0,
+    escaneado: bool = False,
+    justificado: bool = False,
+) -> str:
+    """Gera um PDF em path. densidade = fração das palavras substituídas por um dos termos.
+
+    escaneado=True põe uma imagem de fundo própria em cada página, como num PDF digitalizado com OCR.
+    justificado=True justifica o texto: espaços entre palavras de larguras diferentes em cada linha.
+    """
+    rng = random.Random(seed)
+    termos = termos or []
+    doc = fitz.open()
+    for _ in range(paginas):
+        palavras = []
+        for _ in range(palavras_por_pagina):
+            if termos and rng.random() < densidade:
+                palavras.append(rng.choice(termos))
+            else:
+                palavras.append(_palavra(rng))
+        pagina = doc.new_page()
+        if escaneado:
+            pagina.insert_image(pagina.rect, pixmap=_imagem_ruido(rng))
+        pagina.insert_textbox(
+            fitz.Rect(36, 36, pagina.rect.width - 36, pagina.rect.height - 36), " ".join(palavras), fontsize=8,
+            align=fitz.TEXT_ALIGN_JUSTIFY if justificado else fitz.TEXT_ALIGN_LEFT,
+        )
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return path
+
+
+def gerar_pdf_em_processo(path: str, **kwargs) -> str:
+    """gerar_pdf num processo à parte, para o processo que mede não crescer.
+
+    No Linux o pico de RSS de um filho (os.wait4) parte da memória do pai no fork; gerar o PDF
+    no próprio processo da medição inflaria os picos medidos.
+    """
+    proc = multiprocessing.Process(target=gerar_pdf, args=(path,), kwargs=kwargs)
+    proc.start()
+    proc.join()
+    if proc.exitcode:
+        raise RuntimeError(f"geração de {path} falhou ({proc.exitcode})")
+    return path
@@ -0,0 +1,190 @@
+"""
+Mark.me - Suíte de benchmarks: contar_ocorrencias_multi, destacar_pdf_multi e o CLI mark de ponta
+a ponta sobre um PDF sintético parametrizável. Mede tempo, pico de RSS e tamanho da saída, grava
+os resultados em JSON e compara com uma linha de base.
+
+Uso:
+  python -m benchmarks run [--paginas 200] [--palavras 300] [--termos 20] [--densidade 0.01]
+                           [--repeticoes 3] [--salvar atual.json] [--baseline base.json] [--limite 0.2]
+  python -m benchmarks compare base.json atual.json [--limite 0.2]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from benchmarks.sintetico import gerar_pdf_em_processo, nomes_termos
+
+# Métricas comparadas com a linha de base (maior = pior)
+METRICAS = ("segundos", "rss_mb")
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rodar(cmd: list[str]) -> tuple[float, float, str]:
+    """Roda cmd como processo filho; retorna (segundos de parede, pico de RSS em MB, stdout).
+
+    O pico de RSS vem de os.wait4 (só desse filho); sem wait4 (Windows) fica NaN.
+    """
+    with tempfile.TemporaryFile("w+") as erros:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=_RAIZ, stdout=subprocess.PIPE, stderr=erros, text=True)
+        saida = proc.stdout.read()
+        proc.stdout.close()
+        if hasattr(os, "wait4"):
+            _, status, uso = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            rss_mb = uso.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:
+            proc.wait()
+            rss_mb = math.nan
+        segundos = time.perf_counter() - t0
+        if proc.returncode:
+            erros.seek(0)
+            raise RuntimeError(f"{' '.join(cmd)} falhou ({proc.returncode}): {erros.read().strip()}")
+    return segundos, rss_mb, saida
+
+
+def _casos(entrada: str, saida: str, termos: list[str]) -> dict[str, list[str]]:
+    py = [sys.executable, "-W", "ignore"]
+    cli = py + ["-m", "mark_me", "mark", entrada, "-o", saida]
+    for termo in termos:
+        cli += ["-t", termo]
+    return {
+        "contar_ocorrencias_multi": py + ["-m", "benchmarks.caso", "contar", entrada, saida, *termos],
+        "destacar_pdf_multi": py + ["-m", "benchmarks.caso", "destacar", entrada, saida, *termos],
+        "cli_mark": cli,
+    }
+
+
+def executar(
+    paginas: int = 200,
+    palavras: int = 300,
+    n_termos: int = 20,
+    densidade: float = 0.01,
+    repeticoes: int = 3,
+    seed: int = 0,
+) -> dict:
+    """Gera o PDF sintético e mede cada caso; tempo = mediana das repetições, RSS = máximo."""
+    parametros = {
+        "paginas": paginas,
+        "palavras_por_pagina": palavras,
+        "termos": n_termos,
+        "densidade": densidade,
+        "seed": seed,
+    }
+    resultado = {
+        "parametros": parametros,
+        "repeticoes": repeticoes,
+        "ambiente": {
+            "python": platform.python_version(),
+            "pymupdf": fitz.VersionBind,
+            "plataforma": platform.platform(),
+        },
+        "casos": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        entrada = os.path.join(tmp, "entrada.pdf")
+        termos = nomes_termos(n_termos)
+        gerar_pdf_em_processo(entrada, paginas=paginas, palavras_por_pagina=palavras, termos=termos, densidade=densidade, seed=seed)
+        resultado["entrada_bytes"] = os.path.getsize(entrada)
+        for nome, cmd in _casos(entrada, os.path.join(tmp, "saida.pdf"), termos).items():
+            tempos, picos = [], []
+            saida_bytes = 0
+            for _ in range(repeticoes):
+                saida_pdf = os.path.join(tmp, "saida.pdf")
+                if os.path.exists(saida_pdf):
+                    os.remove(saida_pdf)
+                segundos, rss_mb, stdout = _rodar(cmd)
+                if nome != "cli_mark":
+                    # Tempo medido dentro do processo: exclui inicialização do interpretador
+                    segundos = json.loads(stdout.strip().splitlines()[-1])["segundos"]
+                tempos.append(segundos)
+                picos.append(rss_mb)
+                saida_bytes = os.path.getsize(saida_pdf) if os.path.exists(saida_pdf) else 0
+            resultado["casos"][nome] = {
+                "segundos": round(statistics.median(tempos), 4),
+                "rss_mb": round(max(picos), 1),
+                "saida_bytes": saida_bytes,
+            }
+    return resultado
+
+
+def comparar(base: dict, atual: dict, limite: float) -> list[str]:
+    """Lista as regressões: métricas de atual acima de base * (1 + limite)."""
+    regressoes = []
+    if base.get("parametros") != atual.get("parametros"):
+        regressoes.append(f"parâmetros diferentes da linha de base: {base.get('parametros')} vs {atual.get('parametros')}")
+        return regressoes
+    for caso, medidas in atual["casos"].items():
+        ref = base["casos"].get(caso)
+        if not ref:
+            continue
+        for metrica in METRICAS:
+            antes, depois = ref.get(metrica), medidas.get(metrica)
+            if antes and depois and not math.isnan(antes) and depois > antes * (1 + limite):
+                regressoes.append(f"{caso}.{metrica}: {antes} -> {depois} (+{(depois / antes - 1) * 100:.0f}%)")
+    return regressoes
+
+
+def _imprimir(resultado: dict) -> None:
+    print(f"{'caso':>26} {'tempo (s)':>10} {'pico RSS (MB)':>14} {'saída (MB)':>11}")
+    for caso, m in resultado["casos"].items():
+        print(f"{caso:>26} {m['segundos']:>10.3f} {m['rss_mb']:>14.1f} {m['saida_bytes'] / 1e6:>11.2f}")
+
+
+def _carregar(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _relatar_regressoes(regressoes: list[str], limite: float) -> int:
+    if regressoes:
+        print(f"REGRESSÃO (limite {limite:.0%}):", file=sys.stderr)
+        for r in regressoes:
+            print(f"  {r}", file=sys.stderr)
+        return 1
+    print(f"Sem regressões acima de {limite:.0%}.")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks do Mark.me.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    run = sub.add_parser("run", help="Rodar a suíte")
+    run.add_argument("--paginas", type=int, default=200)
+    run.add_argument("--palavras", type=int, default=300, help="Palavras por página")
+    run.add_argument("--termos", type=int, default=20)
+    run.add_argument("--densidade", type=float, default=0.01, help="Fração das palavras que são termos")
+    run.add_argument("--repeticoes", type=int, default=3)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--salvar", metavar="ARQUIVO", help="Gravar resultados em JSON")
+    run.add_argument("--baseline", metavar="ARQUIVO", help="Comparar com uma linha de base e falhar se regredir")
+    run.add_argument("--limite", type=float, default=0.2, help="Regressão tolerada (0.2 = 20%%)")
+
+    comp = sub.add_parser("compare", help="Comparar dois resultados gravados")
+    comp.add_argument("base")
+    comp.add_argument("atual")
+    comp.add_argument("--limite", type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+    if args.comando == "compare":
+        return _relatar_regressoes(comparar(_carregar(args.base), _carregar(args.atual), args.limite), args.limite)
+
+    resultado = executar(args.paginas, args.palavras, args.termos, args.densidade, args.repeticoes, args.seed)
+    _imprimir(resultado)
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    if args.baseline:
+        return _relatar_regressoes(comparar(_carregar(args.baseline), resultado, args.limite), args.limite)
+    return 0
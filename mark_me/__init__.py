@@ -1,16 +1,69 @@
-"""Mark.me — destaque termos em PDF com cor personalizada (GUI e CLI)."""
-from mark_me.core import (
-    contar_ocorrencias,
-    contar_ocorrencias_multi,
-    destacar_pdf,
-    destacar_pdf_multi,
-    hex_to_rgb_normalized,
-)
-
-__all__ = [
-    "contar_ocorrencias",
-    "contar_ocorrencias_multi",
-    "destacar_pdf",
-    "destacar_pdf_multi",
-    "hex_to_rgb_normalized",
-]
+"""Mark.me — destaque termos em PDF com cor personalizada (GUI e CLI).
+
+Os nomes públicos são carregados só no primeiro uso (PEP 562): importar o pacote não carrega o
+PyMuPDF, então o CLI (--help, erros de argumento, cliente do mark serve) inicia rápido.
+"""
+from typing import TYPE_CHECKING
+
+# nome público -> submódulo que o define
+_ORIGEM = {
+    "Cancelado": "core",
+    "DiferencaMarcas": "core",
+    "Estatisticas": "stats",
+    "MatchPlan": "core",
+    "Ocorrencia": "core",
+    "PoolAssincrono": "assincrono",
+    "Progresso": "assincrono",
+    "TabelaOcorrencias": "tabela",
+    "apply_plan": "core",
+    "atualizar_pdf_multi": "core",
+    "count_matches": "core",
+    "contar_ocorrencias": "core",
+    "contar_ocorrencias_multi": "core",
+    "contar_ocorrencias_multi_async": "assincrono",
+    "destacar_pdf": "core",
+    "destacar_pdf_multi": "core",
+    "destacar_pdf_multi_async": "assincrono",
+    "find_matches": "core",
+    "has_any_match": "core",
+    "hex_to_rgb_normalized": "core",
+    "iter_matches": "core",
+}
+
+__all__ = list(_ORIGEM)
+
+
+def __getattr__(nome: str):
+    if nome not in _ORIGEM:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    from importlib import import_module
+    valor = getattr(import_module(f"{__name__}.{_ORIGEM[nome]}"), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from mark_me.assincrono import PoolAssincrono, Progresso, contar_ocorrencias_multi_async, destacar_pdf_multi_async
+    from mark_me.core import (
+        Cancelado,
+        DiferencaMarcas,
+        MatchPlan,
+        Ocorrencia,
+        apply_plan,
+        atualizar_pdf_multi,
+        count_matches,
+        contar_ocorrencias,
+        contar_ocorrencias_multi,
+        destacar_pdf,
+        destacar_pdf_multi,
+        find_matches,
+        has_any_match,
+        hex_to_rgb_normalized,
+        iter_matches,
+    )
+    from mark_me.stats import Estatisticas
+    from mark_me.tabela import TabelaOcorrencias
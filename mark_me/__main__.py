@@ -10,13 +10,15 @@ _parent = os.path.dirname(_here)
 if _parent not in sys.path:
     sys.path.insert(0, _parent)
 
-if len(sys.argv) >= 2 and sys.argv[1].lower() == "mark":
-    # CLI: python -m mark_me mark file.pdf -term x -pick
-    sys.argv.pop(1)
-    from mark_me.cli import main
-    sys.exit(main())
-else:
-    # GUI
-    from mark_me.gui import MarkMeApp
-    app = MarkMeApp()
-    app.run()
+# Protegido por __main__: os processos de trabalho da GUI (spawn) reimportam este módulo
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1].lower() == "mark":
+        # CLI: python -m mark_me mark file.pdf -term x -pick
+        sys.argv.pop(1)
+        from mark_me.cli import main
+        sys.exit(main())
+    else:
+        # GUI
+        from mark_me.gui import MarkMeApp
+        app = MarkMeApp()
+        app.run()
@@ -0,0 +1,233 @@
+"""
+Mark.me - API assíncrona (asyncio): contar_ocorrencias_multi_async e destacar_pdf_multi_async
+rodam as funções do core num pool de threads ou de processos, sem travar o event loop.
+
+    async with PoolAssincrono(max_concurrency=4, kind="process") as pool:
+        progresso = Progresso()
+        tarefa = asyncio.create_task(destacar_pdf_multi_async("a.pdf", "b.pdf", pares, pool=pool, progress=progresso))
+        async for fase, feitas, total in progresso:
+            ...
+        await tarefa
+
+- max_concurrency limita as tarefas em execução; as demais esperam no await (backpressure).
+- Cancelar a tarefa asyncio aciona o cancel= do core: o trabalho para na próxima página e a vaga
+  só é liberada depois disso.
+- kind="thread" (padrão): o PyMuPDF não é seguro entre threads, então roda uma tarefa por vez
+  (max_concurrency 1). kind="process": tarefas em paralelo, cada uma num processo.
+"""
+import asyncio
+import functools
+import threading
+import weakref
+
+KINDS = ("thread", "process")
+MAX_CONCURRENCY_PADRAO = 4
+
+_trava_pdf = threading.Lock()
+_FIM = object()
+
+
+def _core():
+    # O core (PyMuPDF) só é carregado quando a primeira tarefa roda
+    try:
+        from mark_me import core
+    except ImportError:
+        import core
+    return core
+
+
+def _funcao(nome: str):
+    return getattr(_core(), nome)
+
+
+class Progresso:
+    """Iterador assíncrono dos eventos (fase, feitas, total) de uma tarefa; termina junto com ela.
+
+    Passe em progress= de uma função *_async e percorra com async for no mesmo event loop.
+    """
+
+    def __init__(self):
+        self._fila: asyncio.Queue = asyncio.Queue()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def __call__(self, fase: str, feitas: int, total: int) -> None:
+        # Chamado na thread de trabalho
+        self._loop.call_soon_threadsafe(self._fila.put_nowait, (fase, feitas, total))
+
+    def _fechar(self) -> None:
+        self._fila.put_nowait(_FIM)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> tuple[str, int, int]:
+        item = await self._fila.get()
+        if item is _FIM:
+            raise StopAsyncIteration
+        return item
+
+
+def _executar_travado(nome: str, args: tuple, kwargs: dict):
+    with _trava_pdf:
+        return _funcao(nome)(*args, **kwargs)
+
+
+def _executar_em_processo(nome: str, args: tuple, kwargs: dict, cancelar, fila):
+    """Alvo do pool de processos: cancel e a fila de progresso são proxies do Manager."""
+    return _core().executar_com_progresso(_funcao(nome), args, kwargs, cancelar, fila)
+
+
+def _repassar(fila, progresso: Progresso) -> None:
+    for _, *evento in iter(fila.get, None):
+        progresso(*evento)
+
+
+class PoolAssincrono:
+    """Pool que roda as funções do core fora do event loop, com no máximo max_concurrency tarefas.
+
+    kind: "thread" (uma tarefa por vez: o PyMuPDF não é seguro entre threads) ou "process".
+    max_concurrency: padrão 1 com "thread" (maior que 1 é recusado) e MAX_CONCURRENCY_PADRAO com
+    "process". max_workers: processos do pool (padrão: max_concurrency).
+    Pode ser usado por vários event loops; feche com close() ou async with.
+    """
+
+    def __init__(self, max_concurrency: int | None = None, kind: str = "thread", max_workers: int | None = None):
+        if kind not in KINDS:
+            raise ValueError(f"kind deve ser um de {KINDS}, não {kind!r}")
+        if max_concurrency is None:
+            max_concurrency = 1 if kind == "thread" else MAX_CONCURRENCY_PADRAO
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency deve ser >= 1")
+        if kind == "thread" and max_concurrency > 1:
+            raise ValueError(
+                "kind='thread' roda uma tarefa por vez (o PyMuPDF não é seguro entre threads); "
+                "use kind='process' para max_concurrency > 1"
+            )
+        self.max_concurrency = max_concurrency
+        self.kind = kind
+        self._max_workers = 1 if kind == "thread" else max_workers or max_concurrency
+        self._pool = None
+        self._manager = None
+        self._criacao = threading.Lock()
+        self._semaforos: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _executor(self):
+        with self._criacao:
+            if self._pool is None:
+                if self.kind == "thread":
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="markme-async")
+                else:
+                    import multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+                    self._manager = multiprocessing.Manager()
+                    self._pool = ProcessPoolExecutor(max_workers=self._max_workers)
+            return self._pool
+
+    def _semaforo(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaforo
+
+    async def executar(self, nome: str, *args, progress: Progresso | None = None, **kwargs):
+        """Roda core.<nome>(*args, **kwargs) no pool (nome: contar_ocorrencias_multi, destacar_pdf_multi, ...)."""
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._semaforo():
+                executor = await loop.run_in_executor(None, self._executor) if self._pool is None else self._pool
+                if progress is not None:
+                    progress._loop = loop
+                if self.kind == "thread":
+                    cancelar = threading.Event()
+                    chamada = functools.partial(
+                        _executar_travado, nome, args, {**kwargs, "progress": progress, "cancel": cancelar},
+                    )
+                    return await self._aguardar(loop.run_in_executor(executor, chamada), cancelar)
+                cancelar = self._manager.Event()
+                fila = self._manager.Queue() if progress is not None else None
+                repasse = loop.run_in_executor(None, _repassar, fila, progress) if fila is not None else None
+                try:
+                    chamada = functools.partial(_executar_em_processo, nome, args, kwargs, cancelar, fila)
+                    return await self._aguardar(loop.run_in_executor(executor, chamada), cancelar)
+                finally:
+                    if repasse is not None:
+                        fila.put(None)
+                        await asyncio.shield(repasse)
+        finally:
+            if progress is not None:
+                progress._fechar()
+
+    @staticmethod
+    async def _aguardar(futuro: asyncio.Future, cancelar):
+        try:
+            return await asyncio.shield(futuro)
+        except asyncio.CancelledError:
+            # Para o trabalho na próxima página e só então libera a vaga
+            cancelar.set()
+            try:
+                await futuro
+            except BaseException:
+                pass
+            raise
+
+    def close(self) -> None:
+        """Encerra o pool, esperando as tarefas em andamento."""
+        with self._criacao:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+    async def __aenter__(self) -> "PoolAssincrono":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+_pool_padrao: PoolAssincrono | None = None
+
+
+def _pool(pool: PoolAssincrono | None) -> PoolAssincrono:
+    global _pool_padrao
+    if pool is not None:
+        return pool
+    if _pool_padrao is None:
+        _pool_padrao = PoolAssincrono()
+    return _pool_padrao
+
+
+async def contar_ocorrencias_multi_async(
+    input_path: str,
+    termos: list[str],
+    *,
+    pool: PoolAssincrono | None = None,
+    progress: Progresso | None = None,
+    **opcoes,
+) -> int:
+    """Versão assíncrona de contar_ocorrencias_multi (opcoes: as mesmas, exceto progress e cancel).
+
+    pool: PoolAssincrono a usar (padrão: um pool de threads compartilhado).
+    """
+    return await _pool(pool).executar("contar_ocorrencias_multi", input_path, termos, progress=progress, **opcoes)
+
+
+async def destacar_pdf_multi_async(
+    input_path: str,
+    output_path: str,
+    pares: list[tuple[str, str]],
+    *,
+    pool: PoolAssincrono | None = None,
+    progress: Progresso | None = None,
+    **opcoes,
+) -> bytes | None:
+    """Versão assíncrona de destacar_pdf_multi (opcoes: as mesmas, exceto progress e cancel).
+
+    pool: PoolAssincrono a usar (padrão: um pool de threads compartilhado). Com output_path
+    None, retorna os bytes do PDF marcado.
+    """
+    return await _pool(pool).executar("destacar_pdf_multi", input_path, output_path, pares, progress=progress, **opcoes)
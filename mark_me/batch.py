@@ -0,0 +1,278 @@
+"""
+Mark.me - Processamento em lote: vários PDFs por execução do CLI, com pool de processos
+e relatório por arquivo (status, ocorrências, tempo).
+"""
+import contextlib
+import glob
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+
+from typing import TYPE_CHECKING
+
+try:
+    from mark_me.stats import Estatisticas
+except ImportError:
+    from stats import Estatisticas
+
+if TYPE_CHECKING:
+    from mark_me.cache import CacheIndices
+
+SUFIXO_SAIDA = "_marcado.pdf"
+SUFIXO_CONFIG = ".markme"  # ao lado de cada saída: assinatura dos termos e opções que a geraram
+
+# Opções de gravação que mudam o PDF gerado (chunk_pages / max_memory_mb não mudam)
+_OPCOES_DA_SAIDA = ("save_mode", "coalesce")
+
+# Status possíveis de um arquivo no relatório
+OK = "ok"
+SEM_OCORRENCIA = "no_match"
+ATUALIZADO = "skipped"
+ERRO = "error"
+
+
+@dataclass
+class ResultadoArquivo:
+    """Resultado de um arquivo do lote (uma entrada do relatório JSON)."""
+    entrada: str
+    saida: str
+    status: str = ""
+    ocorrencias: int = 0
+    por_termo: dict[str, int] = field(default_factory=dict)
+    segundos: float = 0.0
+    erro: str = ""
+    perfil: dict = field(default_factory=dict)
+
+
+def expandir_entradas(entradas: list[str], recursivo: bool = False) -> list[tuple[str, str]]:
+    """Expande arquivos, globs e pastas em [(pdf, pasta_raiz)], sem repetir arquivos.
+
+    pasta_raiz é a pasta informada (ou a do próprio arquivo) e serve para {reldir} em modelo_saida.
+    Em pastas e globs, ignora as saídas do próprio Mark.me (*_marcado.pdf). Um arquivo que existe
+    vale pelo nome, mesmo com caracteres de glob (ex.: relatorio[1].pdf).
+    """
+    vistos: set[str] = set()
+    resultado: list[tuple[str, str]] = []
+
+    def adicionar(caminho: str, raiz: str) -> None:
+        caminho = os.path.abspath(caminho)
+        if caminho not in vistos:
+            vistos.add(caminho)
+            resultado.append((caminho, os.path.abspath(raiz)))
+
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            padrao = os.path.join(glob.escape(entrada), "**" if recursivo else "", "*")
+            for caminho in sorted(glob.glob(padrao, recursive=recursivo)):
+                if _eh_pdf_de_entrada(caminho):
+                    adicionar(caminho, entrada)
+        elif glob.has_magic(entrada) and not os.path.isfile(entrada):  # arquivo existente: nome literal
+            for caminho in sorted(glob.glob(entrada, recursive=recursivo)):
+                if _eh_pdf_de_entrada(caminho):
+                    adicionar(caminho, os.path.dirname(caminho))
+        else:
+            adicionar(entrada, os.path.dirname(os.path.abspath(entrada)))
+    return resultado
+
+
+def _eh_pdf_de_entrada(caminho: str) -> bool:
+    nome = os.path.basename(caminho).lower()
+    return os.path.isfile(caminho) and nome.endswith(".pdf") and not nome.endswith(SUFIXO_SAIDA)
+
+
+def caminho_saida(entrada: str, raiz: str, modelo_saida: str | None) -> str:
+    """Monta o caminho de saída: <pasta>/<nome>_marcado.pdf.
+
+    modelo_saida é a pasta de saída e aceita {dir} (pasta do arquivo) e {reldir} (subpasta do
+    arquivo relativa à pasta informada). Sem modelo, grava ao lado do arquivo de entrada.
+    """
+    pasta_entrada = os.path.dirname(entrada)
+    if modelo_saida:
+        reldir = os.path.relpath(pasta_entrada, raiz)
+        pasta = modelo_saida.format(dir=pasta_entrada, reldir="" if reldir == "." else reldir)
+    else:
+        pasta = pasta_entrada
+    nome_base = os.path.splitext(os.path.basename(entrada))[0]
+    return os.path.abspath(os.path.join(pasta, f"{nome_base}{SUFIXO_SAIDA}"))
+
+
+def saidas_repetidas(tarefas: list[tuple[str, str]]) -> dict[str, list[str]]:
+    """{saída: [entradas]} das saídas que mais de uma entrada geraria (ex.: mesmo nome em
+    subpastas com --output-dir sem {reldir})."""
+    por_saida: dict[str, list[str]] = {}
+    for entrada, saida in tarefas:
+        por_saida.setdefault(os.path.normcase(saida), []).append(entrada)
+    return {saida: entradas for saida, entradas in por_saida.items() if len(entradas) > 1}
+
+
+def assinatura_config(
+    pares: list[tuple[str, str]],
+    opcoes_gravacao: dict | None = None,
+    dicionario: bool = False,
+    paginas: str | None = None,
+) -> str:
+    """Hash dos termos, cores e opções que definem o conteúdo da saída."""
+    opcoes = opcoes_gravacao or {}
+    dados = {
+        "pares": [list(par) for par in pares],
+        "dictionary": dicionario,
+        "pages": paginas,
+        **{nome: opcoes.get(nome) for nome in _OPCOES_DA_SAIDA},
+    }
+    return hashlib.sha256(json.dumps(dados, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _ler_assinatura(saida: str) -> str | None:
+    try:
+        with open(saida + SUFIXO_CONFIG, encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def saida_atualizada(entrada: str, saida: str, assinatura: str | None = None) -> bool:
+    """True se a saída já existe, não é mais antiga que a entrada e (com assinatura) foi gerada
+    com os mesmos termos e opções (arquivo <saida>.markme)."""
+    try:
+        if os.path.getmtime(saida) < os.path.getmtime(entrada):
+            return False
+    except OSError:
+        return False
+    return assinatura is None or _ler_assinatura(saida) == assinatura
+
+
+def processar_arquivo(
+    entrada: str,
+    saida: str,
+    pares: list[tuple[str, str]],
+    forcar: bool = False,
+    cache: "CacheIndices | None" = None,
+    opcoes_gravacao: dict | None = None,
+    medir: bool = False,
+    dicionario: bool = False,
+    paginas: str | None = None,
+    cancel=None,
+) -> ResultadoArquivo:
+    """Busca e grava um arquivo do lote. Nunca levanta exceção: erros vão para o resultado.
+
+    Sem forcar, pula a saída já gerada, depois da entrada, com os mesmos termos, cores e opções
+    (a assinatura fica em <saida>.markme, gravado junto com a saída).
+
+    opcoes_gravacao vai para apply_plan (ex.: save_mode, coalesce); chunk_pages e max_memory_mb
+    valem também para a busca.
+    medir=True preenche resultado.perfil com os tempos por fase e as contagens.
+    dicionario=True usa a busca de listas grandes de termos (find_matches(dictionary=True)).
+    paginas restringe a busca a essas páginas (ex.: "1-20,45"; find_matches(pages=...)).
+    cancel (ex.: threading.Event) interrompe busca e gravação; o arquivo fica com erro Cancelado.
+    """
+    # O core (PyMuPDF) só é carregado quando há arquivo a processar
+    try:
+        from mark_me.core import apply_plan, find_matches
+    except ImportError:
+        from core import apply_plan, find_matches
+
+    resultado = ResultadoArquivo(entrada=entrada, saida=saida)
+    stats = Estatisticas() if medir else None
+    inicio = time.perf_counter()
+    try:
+        assinatura = assinatura_config(pares, opcoes_gravacao, dicionario, paginas)
+        if not forcar and saida_atualizada(entrada, saida, assinatura):
+            resultado.status = ATUALIZADO
+            return resultado
+        opcoes = opcoes_gravacao or {}
+        plan = find_matches(
+            entrada, pares, cache_dir=cache, stats=stats, cancel=cancel, dictionary=dicionario, pages=paginas,
+            chunk_pages=opcoes.get("chunk_pages"), max_memory_mb=opcoes.get("max_memory_mb"),
+        )
+        resultado.ocorrencias = plan.total
+        resultado.por_termo = plan.contagens
+        if plan.total == 0:
+            resultado.status = SEM_OCORRENCIA
+            return resultado
+        os.makedirs(os.path.dirname(saida), exist_ok=True)
+        # Sem assinatura enquanto a saída é regravada: se a gravação falhar, o arquivo não é pulado
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(saida + SUFIXO_CONFIG)
+        apply_plan(plan, saida, stats=stats, cancel=cancel, **opcoes)
+        with open(saida + SUFIXO_CONFIG, "w", encoding="utf-8") as f:
+            f.write(assinatura + "\n")
+        resultado.status = OK
+    except Exception as e:
+        resultado.status = ERRO
+        resultado.erro = f"{type(e).__name__}: {e}"
+    finally:
+        resultado.segundos = round(time.perf_counter() - inicio, 4)
+        if stats is not None:
+            perfil = stats.como_dict()
+            resultado.perfil = {"fases": perfil["fases"], "contagens": perfil["contagens"]}
+    return resultado
+
+
+def processar_lote(
+    tarefas: list[tuple[str, str]],
+    pares: list[tuple[str, str]],
+    jobs: int = 1,
+    forcar: bool = False,
+    cache: "CacheIndices | None" = None,
+    opcoes_gravacao: dict | None = None,
+    medir: bool = False,
+    ao_concluir=None,
+    dicionario: bool = False,
+    paginas: str | None = None,
+) -> list[ResultadoArquivo]:
+    """Processa [(entrada, saida)] com até jobs processos. Retorna os resultados na ordem das tarefas.
+
+    ao_concluir(resultado), se informado, é chamado no processo principal a cada arquivo concluído.
+    """
+    resultados: list[ResultadoArquivo | None] = [None] * len(tarefas)
+    if jobs <= 1 or len(tarefas) < 2:
+        for i, (entrada, saida) in enumerate(tarefas):
+            resultados[i] = processar_arquivo(entrada, saida, pares, forcar, cache, opcoes_gravacao, medir, dicionario, paginas)
+            if ao_concluir:
+                ao_concluir(resultados[i])
+        return resultados
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tarefas))) as pool:
+        futuros = {
+            pool.submit(
+                processar_arquivo, entrada, saida, pares, forcar, cache, opcoes_gravacao, medir, dicionario, paginas,
+            ): i
+            for i, (entrada, saida) in enumerate(tarefas)
+        }
+        for futuro in as_completed(futuros):
+            i = futuros[futuro]
+            try:
+                resultados[i] = futuro.result()
+            except Exception as e:  # processo filho morreu (ex.: falta de memória)
+                entrada, saida = tarefas[i]
+                resultados[i] = ResultadoArquivo(entrada=entrada, saida=saida, status=ERRO, erro=f"{type(e).__name__}: {e}")
+            if ao_concluir:
+                ao_concluir(resultados[i])
+    return resultados
+
+
+def resumo(resultados: list[ResultadoArquivo], segundos: float) -> dict:
+    """Relatório do lote: totais por status e o resultado de cada arquivo."""
+    por_status: dict[str, int] = {}
+    for r in resultados:
+        por_status[r.status] = por_status.get(r.status, 0) + 1
+    return {
+        "arquivos": len(resultados),
+        "por_status": por_status,
+        "ocorrencias": sum(r.ocorrencias for r in resultados),
+        "segundos": round(segundos, 4),
+        "resultados": [asdict(r) for r in resultados],
+    }
+
+
+def gravar_resumo(dados: dict, destino: str) -> None:
+    """Grava o relatório JSON em destino ("-" = saída padrão)."""
+    texto = json.dumps(dados, ensure_ascii=False, indent=2)
+    if destino == "-":
+        print(texto)
+        return
+    with open(destino, "w", encoding="utf-8") as f:
+        f.write(texto + "\n")
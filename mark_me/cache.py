@@ -0,0 +1,229 @@
+"""
+Mark.me - Cache em disco (opt-in) dos índices de texto por página.
+
+Chave: hash SHA-256 do conteúdo do PDF + versão do PyMuPDF + versão do formato. Cada documento
+vira um arquivo na pasta do cache, em formato próprio (tamanhos, texto e floats: ler uma entrada
+não executa nada, ao contrário de pickle). Gravações são atômicas (arquivo temporário +
+os.replace) e a remoção por tamanho (LRU pela data de último uso) roda sob trava de arquivo, então
+vários processos podem compartilhar a mesma pasta.
+"""
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+
+import fitz  # PyMuPDF
+
+try:
+    from mark_me.index import CAMPOS_CAIXA, IndicePagina
+except ImportError:
+    from index import CAMPOS_CAIXA, IndicePagina
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava; a remoção concorrente só pode falhar e ser ignorada
+    fcntl = None
+
+ENV_CACHE = "MARKME_CACHE"
+ENV_CACHE_MAX_MB = "MARKME_CACHE_MAX_MB"
+TAMANHO_MAXIMO_PADRAO_MB = 1024
+VERSAO_FORMATO = 3
+_EXTENSAO = ".idx"
+
+# Arquivo (comprimido com zlib): cabeçalho e, por página, os tamanhos seguidos do texto (UTF-8)
+# e das caixas (float32 little-endian)
+_MARCA = b"MKIX"
+_CABECALHO = struct.Struct("<4sII")  # marca, versão do formato, número de páginas
+_PAGINA = struct.Struct("<II")  # bytes do texto, bytes das caixas
+
+
+def hash_arquivo(path: "str | bytes | memoryview") -> str:
+    """SHA-256 do conteúdo do arquivo, lido em blocos (ou do PDF já em memória)."""
+    if not isinstance(path, str):
+        return hashlib.sha256(path).hexdigest()
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class CacheIndices:
+    """Pasta de cache com limite de tamanho (bytes) e remoção dos menos usados."""
+
+    def __init__(self, pasta: str, tamanho_maximo: int | None = None):
+        self.pasta = os.path.abspath(pasta)
+        if tamanho_maximo is None:
+            tamanho_maximo = int(os.environ.get(ENV_CACHE_MAX_MB) or TAMANHO_MAXIMO_PADRAO_MB) * 1024 * 1024
+        self.tamanho_maximo = tamanho_maximo
+
+    def chave(self, input_path: "str | bytes | memoryview") -> str:
+        """Chave do documento: conteúdo + versão do PyMuPDF + formato do índice."""
+        return f"{hash_arquivo(input_path)}-{fitz.VersionBind}-{VERSAO_FORMATO}"
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.pasta, chave + _EXTENSAO)
+
+    def obter(self, chave: str) -> list[IndicePagina] | None:
+        """Índices das páginas, ou None se ausente/ilegível. Marca a entrada como usada agora."""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "rb") as f:
+                indices = _ler_indices(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error, zlib.error):
+            _remover(caminho)
+            return None
+        if indices is None:
+            return None
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        return indices
+
+    def gravar(self, chave: str, indices: list[IndicePagina]) -> None:
+        """Grava os índices de forma atômica e depois aplica o limite de tamanho."""
+        os.makedirs(self.pasta, exist_ok=True)
+        conteudo = zlib.compress(_gravar_indices(indices), 6)
+        fd, tmp = tempfile.mkstemp(dir=self.pasta, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(conteudo)
+            os.replace(tmp, self._caminho(chave))
+        except BaseException:
+            _remover(tmp)
+            raise
+        self.limitar_tamanho()
+
+    def limitar_tamanho(self) -> None:
+        """Remove as entradas usadas há mais tempo até o total caber em tamanho_maximo."""
+        with open(os.path.join(self.pasta, ".lock"), "a") as trava:
+            if fcntl is not None:
+                fcntl.flock(trava, fcntl.LOCK_EX)
+            entradas = []
+            with os.scandir(self.pasta) as it:
+                for e in it:
+                    if e.name.endswith(_EXTENSAO):
+                        try:
+                            st = e.stat()
+                        except OSError:
+                            continue
+                        entradas.append((st.st_mtime, st.st_size, e.path))
+            total = sum(tamanho for _, tamanho, _ in entradas)
+            for _, tamanho, caminho in sorted(entradas):
+                if total <= self.tamanho_maximo:
+                    break
+                if _remover(caminho):
+                    total -= tamanho
+
+
+class CacheMemoria(CacheIndices):
+    """Cache em memória (LRU por número de documentos), para processos que ficam no ar (mark serve).
+
+    A chave é o caminho + data de modificação + tamanho: não lê o arquivo inteiro para calcular
+    o hash, e um PDF regravado no mesmo caminho vira outra entrada (PDF em memória: hash do
+    conteúdo). Seguro entre threads.
+    """
+
+    def __init__(self, maximo_documentos: int = 32):
+        self.pasta = None
+        self.tamanho_maximo = None
+        self.maximo_documentos = maximo_documentos
+        self._entradas: OrderedDict[str, list[IndicePagina]] = OrderedDict()
+        self._trava = threading.Lock()
+
+    def __getstate__(self):
+        # Processos filhos (workers) recebem um cache vazio, sem a trava
+        return {"maximo_documentos": self.maximo_documentos}
+
+    def __setstate__(self, estado):
+        self.__init__(estado["maximo_documentos"])
+
+    def chave(self, input_path: "str | bytes | memoryview") -> str:
+        if not isinstance(input_path, str):  # PDF em memória: só o conteúdo identifica
+            return f"sha256:{hash_arquivo(input_path)}"
+        st = os.stat(input_path)
+        return f"{os.path.abspath(input_path)}:{st.st_mtime_ns}:{st.st_size}"
+
+    def obter(self, chave: str) -> list[IndicePagina] | None:
+        with self._trava:
+            indices = self._entradas.get(chave)
+            if indices is not None:
+                self._entradas.move_to_end(chave)
+            return indices
+
+    def gravar(self, chave: str, indices: list[IndicePagina]) -> None:
+        with self._trava:
+            self._entradas[chave] = indices
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.maximo_documentos:
+                self._entradas.popitem(last=False)
+
+    def limitar_tamanho(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+def _gravar_indices(indices: list[IndicePagina]) -> bytes:
+    partes = [_CABECALHO.pack(_MARCA, VERSAO_FORMATO, len(indices))]
+    for ix in indices:
+        texto = ix.texto.encode("utf-8", "surrogatepass")
+        caixas = ix.caixas
+        if sys.byteorder == "big":
+            caixas = array("f", caixas)
+            caixas.byteswap()
+        partes += [_PAGINA.pack(len(texto), len(caixas) * caixas.itemsize), texto, caixas.tobytes()]
+    return b"".join(partes)
+
+
+def _ler_indices(dados: bytes) -> list[IndicePagina] | None:
+    """Índices gravados por _gravar_indices; None se de outra versão. ValueError/struct.error se estragado."""
+    marca, versao, total = _CABECALHO.unpack_from(dados)
+    if marca != _MARCA:
+        raise ValueError("não é um índice do Mark.me")
+    if versao != VERSAO_FORMATO:
+        return None
+    dados = memoryview(dados)
+    pos = _CABECALHO.size
+    indices = []
+    for _ in range(total):
+        tamanho_texto, tamanho_caixas = _PAGINA.unpack_from(dados, pos)
+        pos += _PAGINA.size
+        fim_texto = pos + tamanho_texto
+        fim = fim_texto + tamanho_caixas
+        if fim > len(dados) or tamanho_caixas % (4 * CAMPOS_CAIXA):
+            raise ValueError("índice truncado")
+        caixas = array("f")
+        caixas.frombytes(dados[fim_texto:fim])
+        if sys.byteorder == "big":
+            caixas.byteswap()
+        indices.append(IndicePagina(str(dados[pos:fim_texto], "utf-8", "surrogatepass"), caixas))
+        pos = fim
+    if pos != len(dados):
+        raise ValueError("sobram bytes no índice")
+    return indices
+
+
+def _remover(caminho: str) -> bool:
+    try:
+        os.remove(caminho)
+        return True
+    except OSError:
+        return False
+
+
+def cache_padrao(cache_dir: "str | CacheIndices | None" = None) -> CacheIndices | None:
+    """Cache a usar: o informado, ou a pasta em MARKME_CACHE; None se nenhum (cache desligado)."""
+    if isinstance(cache_dir, CacheIndices):
+        return cache_dir
+    pasta = cache_dir or os.environ.get(ENV_CACHE)
+    return CacheIndices(pasta) if pasta else None
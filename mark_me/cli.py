@@ -2,18 +2,54 @@
 Mark.me - Interface de linha de comando.
 
 Uso:
-  mark <arquivo.pdf> -t "termo1" -t "termo2" [-c "#hex1" -c "#hex2"] [-o saida.pdf]
+  mark <arquivo.pdf> -t "termo1" -t "termo2" [-c "#hex1" -c "#hex2"] [-o saida.pdf] [-j N]
   Vários -t e -c: primeiro -t com primeiro -c, etc. Cores faltando usam amarelo.
   -pick abre o seletor de cor (um único) para todos os termos; use -c para cores por termo.
+  --terms-file glossario.csv (termo[,cor]) para listas com milhares de termos.
+  "-" como arquivo lê o PDF da entrada padrão; -o - grava na saída padrão (cat a.pdf | mark - -t x > b.pdf).
+  --dry-run [--report ocorrencias.jsonl] só busca: lista as ocorrências sem gravar PDF.
+  --pages 1-20,45,100- busca e marca só essas páginas (contadas a partir de 1).
+  --update reaplica a lista de termos a um PDF já marcado, mudando só a diferença.
+
+Lote:
+  mark a.pdf b.pdf "docs/*.pdf" pasta/ [-r] -t "termo" [--output-dir MODELO] [-j N] [--summary r.json]
+
+Servidor (PyMuPDF e índices de texto já carregados):
+  mark serve [--socket CAMINHO] [--workers N] [--connections N] [--max-docs N]
+  mark a.pdf -t "termo" --server [CAMINHO]     (ou MARKME_SOCKET; sem servidor, roda aqui mesmo)
+
+Pasta monitorada com fila SQLite (--db ARQUIVO ou MARKME_FILA):
+  mark watch PASTA -t "termo" [-r] [--output-dir MODELO]
+  mark worker [-j N] [--max-attempts N]
+  mark status [--dead [N]] [--requeue-dead] [--json]
 """
 import argparse
+import contextlib
+import glob
+import json
 import os
 import sys
+import time
 
+from typing import TYPE_CHECKING, BinaryIO
+
+# Só módulos leves aqui: o core (PyMuPDF), o lote e o servidor são importados quando usados, para
+# --help, erros de argumento e o caso comum (um arquivo, sem servidor) não pagarem esse custo
 try:
-    from mark_me.core import contar_ocorrencias_multi, destacar_pdf_multi
+    from mark_me.modos import COALESCE_MODES, ENV_SOCKET, SAVE_MODES, tipo_paginas
+    from mark_me.stats import Estatisticas
 except ImportError:
-    from core import contar_ocorrencias_multi, destacar_pdf_multi
+    from modos import COALESCE_MODES, ENV_SOCKET, SAVE_MODES, tipo_paginas
+    from stats import Estatisticas
+
+if TYPE_CHECKING:
+    from mark_me.cache import CacheIndices
+
+# Nome de arquivo que indica entrada/saída padrão
+FLUXO = "-"
+
+# Subcomandos da fila de trabalhos -> função de mark_me.fila (importada só quando usada)
+COMANDOS_FILA = {"watch": "main_watch", "worker": "main_worker", "status": "main_status"}
 
 
 def _pick_color() -> str:
@@ -28,7 +64,53 @@ def _pick_color() -> str:
     return (hex_str or "#ffff00").strip()
 
 
+def pares_dos_argumentos(args: argparse.Namespace) -> list[tuple[str, str]] | None:
+    """Pares (termo, cor) de -t/-c e --terms-file, com as mesmas regras em mark e mark watch.
+
+    Vários -t e -c: primeiro -t com primeiro -c, etc.; cores faltando usam amarelo e o "#" é
+    opcional. Imprime o erro no stderr e retorna None se não houver termo ou o --terms-file não
+    puder ser lido.
+    """
+    termos = [t.strip() for t in args.term or [] if t and t.strip()]
+    if not termos and not args.terms_file:
+        print("Erro: informe ao menos um termo (-t 'termo' ou --terms-file).", file=sys.stderr)
+        return None
+    cores = []
+    for c in args.color or []:
+        cx = (c or "#ffff00").strip()
+        if not cx.startswith("#"):
+            cx = "#" + cx
+        cores.append(cx)
+    pares = [(t, cores[i] if i < len(cores) else "#ffff00") for i, t in enumerate(termos)]
+    if args.terms_file:
+        try:
+            from mark_me.dicionario import ler_termos
+        except ImportError:
+            from dicionario import ler_termos
+        try:
+            pares += ler_termos(args.terms_file)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Erro ao ler --terms-file: {e}", file=sys.stderr)
+            return None
+        if not pares:
+            print("Erro: nenhum termo em --terms-file.", file=sys.stderr)
+            return None
+    return pares
+
+
 def main() -> int:
+    if sys.argv[1:2] == ["serve"]:
+        try:
+            from mark_me.server import main as main_serve
+        except ImportError:
+            from server import main as main_serve
+        return main_serve(sys.argv[2:])
+    if sys.argv[1:2] and sys.argv[1] in COMANDOS_FILA:
+        try:
+            from mark_me import fila
+        except ImportError:
+            import fila
+        return getattr(fila, COMANDOS_FILA[sys.argv[1]])(sys.argv[2:])
     parser = argparse.ArgumentParser(
         prog="mark",
         description="Mark.me — destaque termos em PDF com cor personalizada.",
@@ -36,7 +118,8 @@ def main() -> int:
     parser.add_argument(
         "pdf",
         metavar="ARQUIVO",
-        help="Caminho do arquivo PDF",
+        nargs="+",
+        help="Caminho do arquivo PDF ('-' = entrada padrão). Vários arquivos, globs ou pastas processam em lote.",
     )
     parser.add_argument(
         "-t", "--term",
@@ -45,6 +128,11 @@ def main() -> int:
         default=None,
         help="Termo a destacar (pode repetir: -t 'a' -t 'b')",
     )
+    parser.add_argument(
+        "--terms-file",
+        metavar="ARQUIVO",
+        help="CSV com um termo por linha e cor opcional (termo,#hex); busca todos numa só passada por página",
+    )
     parser.add_argument(
         "-pick",
         action="store_true",
@@ -60,60 +148,562 @@ def main() -> int:
     parser.add_argument(
         "-o", "--output",
         metavar="ARQUIVO",
-        help="Arquivo de saída. Se omitido, usa <nome>_marcado.pdf na mesma pasta.",
+        help="Arquivo de saída ('-' = saída padrão). Se omitido, usa <nome>_marcado.pdf na mesma pasta (entrada '-': saída padrão).",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Processos em paralelo (0 = todos os núcleos): páginas de um arquivo ou arquivos do lote. Padrão: 1",
+    )
+    parser.add_argument(
+        "-r", "--recursive",
+        action="store_true",
+        help="Em pastas (e globs com **), incluir subpastas",
+    )
+    parser.add_argument(
+        "--output-dir",
+        metavar="MODELO",
+        help="Pasta de saída; aceita {dir} (pasta do arquivo) e {reldir} (subpasta relativa à pasta informada)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reprocessar mesmo se a saída já for mais nova que a entrada (lote)",
+    )
+    parser.add_argument(
+        "--summary",
+        metavar="ARQUIVO",
+        help="Gravar relatório JSON do lote em ARQUIVO ('-' = saída padrão)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Só buscar: mostra as ocorrências por arquivo sem gravar PDF",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="ARQUIVO",
+        help="Com --dry-run: cada ocorrência (arquivo, página, termo, retângulo) em JSON Lines, à medida que é encontrada ('-' = saída padrão)",
+    )
+    parser.add_argument(
+        "--pages",
+        type=tipo_paginas,
+        default=None,
+        metavar="INTERVALOS",
+        help="Só estas páginas, a partir de 1 (ex: 1-20,45,100-); as demais nem são lidas",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="PDF já marcado pelo Mark.me: só marca os termos novos, recolore os de cor trocada e remove os que saíram da lista (sem -o, no próprio arquivo, que precisa ter marcas do Mark.me)",
+    )
+    parser.add_argument(
+        "--save-mode",
+        choices=SAVE_MODES,
+        default=None,
+        help="Gravação: compact (menor arquivo, padrão), fast (mais rápida) ou incremental (só acrescenta as anotações)",
+    )
+    parser.add_argument(
+        "--coalesce",
+        choices=COALESCE_MODES,
+        default="none",
+        help="Anotações: uma por ocorrência (none, padrão), uma por termo e linha (line) ou por termo e página (page)",
+    )
+    parser.add_argument(
+        "--chunk-pages",
+        type=int,
+        default=None,
+        metavar="N",
+        help="PDFs muito grandes: processar em blocos de N páginas, gravando cada bloco (memória estável; gravação incremental)",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=float,
+        default=None,
+        metavar="MB",
+        help="Fechar o bloco sempre que a memória do processo passar de MB (com ou sem --chunk-pages)",
+    )
+    parser.add_argument(
+        "--server",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="SOCKET",
+        help=f"Enviar ao servidor do mark serve (padrão: {ENV_SOCKET} ou o socket padrão); sem servidor, roda aqui",
+    )
+    parser.add_argument(
+        "--server-timeout",
+        type=float,
+        default=None,
+        metavar="SEGUNDOS",
+        help="Com --server: esperar a resposta até SEGUNDOS e, sem ela, rodar aqui (padrão: MARKME_SERVER_TIMEOUT ou 600)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Mostrar tempo por fase (abrir, busca, anotação, gravação) e as páginas mais lentas",
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="ARQUIVO",
+        help="Gravar o perfil (fases, contagens, tempos por página) em JSON ('-' = saída padrão)",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="ARQUIVO",
+        help="Gravar perfil do cProfile (abrir com pstats / snakeviz)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="PASTA",
+        default=None,
+        help="Cache dos índices de texto por conteúdo do PDF (padrão: variável MARKME_CACHE; sem ela, desligado)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=None,
+        metavar="MB",
+        help="Tamanho máximo do cache; remove os menos usados (padrão: MARKME_CACHE_MAX_MB ou 1024)",
     )
     args = parser.parse_args()
 
-    termos_raw = args.term or []
-    termos = [t.strip() for t in termos_raw if t and t.strip()]
-    if not termos:
-        print("Erro: informe ao menos um termo (-t 'termo').", file=sys.stderr)
+    pares = pares_dos_argumentos(args)
+    if pares is None:
+        return 1
+    termos = [t for t, _ in pares]
+
+    em_blocos = args.chunk_pages is not None or args.max_memory is not None
+    if em_blocos and args.save_mode not in (None, "incremental"):
+        print("Erro: --chunk-pages/--max-memory gravam de forma incremental; use --save-mode incremental.", file=sys.stderr)
+        return 1
+    if em_blocos and args.update:
+        print("Erro: --update não aceita --chunk-pages/--max-memory.", file=sys.stderr)
         return 1
+    args.save_mode = args.save_mode or ("incremental" if em_blocos or args.update else "compact")
 
-    pdf_path = os.path.abspath(args.pdf)
-    if not os.path.isfile(pdf_path):
-        print(f"Erro: arquivo não encontrado: {pdf_path}", file=sys.stderr)
+    workers = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    # Um arquivo que existe é ele mesmo, ainda que o nome tenha [, * ou ? (ex.: relatorio[1].pdf)
+    lote = len(args.pdf) > 1 or os.path.isdir(args.pdf[0]) or (
+        glob.has_magic(args.pdf[0]) and not os.path.isfile(args.pdf[0])
+    )
+    if lote and args.output:
+        print("Erro: -o vale para um único arquivo; no lote use --output-dir.", file=sys.stderr)
+        return 1
+    if lote and args.update:
+        print("Erro: --update vale para um único arquivo.", file=sys.stderr)
+        return 1
+    if lote and FLUXO in args.pdf:
+        print("Erro: a entrada padrão ('-') vale para um único arquivo.", file=sys.stderr)
+        return 1
+    if _saida_padrao(args) and args.profile_json == FLUXO:
+        print("Erro: com o PDF na saída padrão, use --profile-json ARQUIVO.", file=sys.stderr)
         return 1
+    if args.report and not args.dry_run:
+        print("Erro: --report vale com --dry-run.", file=sys.stderr)
+        return 1
+    if args.save_mode == "incremental" and not args.dry_run and (FLUXO in args.pdf or _saida_padrao(args)):
+        print("Erro: a gravação incremental (e --chunk-pages/--max-memory) precisa de arquivos, não de '-'.", file=sys.stderr)
+        return 1
+    stats = Estatisticas() if (args.profile or args.profile_json) and not lote else None
+
+    def executar() -> int:
+        if args.dry_run:
+            if args.report == FLUXO:
+                # A saída padrão leva só o relatório; o resto vai para o stderr
+                saida_relatorio = sys.stdout
+                with contextlib.redirect_stdout(sys.stderr):
+                    return _main_dry_run(args, termos, lote, saida_relatorio)
+            return _main_dry_run(args, termos, lote)
+        if lote:
+            return _main_lote(args, pares, termos, workers)
+        if _saida_padrao(args):
+            # A saída padrão leva só o PDF: o que for impresso (inclusive por bibliotecas) vai para o stderr
+            saida_pdf = sys.stdout.buffer
+            with contextlib.redirect_stdout(sys.stderr):
+                return _main_arquivo(args, pares, termos, workers, stats, saida_pdf)
+        return _main_arquivo(args, pares, termos, workers, stats)
+
+    if args.cprofile:
+        import cProfile
+        perfilador = cProfile.Profile()
+        codigo = perfilador.runcall(executar)
+        perfilador.dump_stats(args.cprofile)
+    else:
+        codigo = executar()
+    if stats is not None:
+        _relatar_perfil(stats, args)
+    return codigo
 
+
+def _saida_padrao(args: argparse.Namespace) -> bool:
+    """True se o PDF marcado vai para a saída padrão (-o -, ou entrada '-' sem -o nem --output-dir)."""
+    return args.output == FLUXO or (args.output is None and args.output_dir is None and args.pdf == [FLUXO])
+
+
+def _main_arquivo(
+    args: argparse.Namespace,
+    pares: list[tuple[str, str]],
+    termos: list[str],
+    workers: int,
+    stats: Estatisticas | None,
+    saida_pdf: BinaryIO | None = None,
+) -> int:
+    """Processa um único PDF: busca, confirma que há ocorrências e grava (em saida_pdf, se informada)."""
+    if args.pdf[0] == FLUXO:
+        # PDF vindo de um pipe: fica em memória, sem arquivo temporário
+        pdf_path = sys.stdin.buffer.read()
+        if not pdf_path:
+            print("Erro: entrada padrão vazia.", file=sys.stderr)
+            return 1
+    else:
+        pdf_path = os.path.abspath(args.pdf[0])
+        if not os.path.isfile(pdf_path):
+            print(f"Erro: arquivo não encontrado: {pdf_path}", file=sys.stderr)
+            return 1
+
+    if saida_pdf is not None:
+        out_path = saida_pdf
+    elif args.output:
+        out_path = os.path.abspath(args.output)
+    elif args.update and args.output_dir is None and isinstance(pdf_path, str):
+        out_path = pdf_path  # --update sem -o: atualiza o próprio arquivo
+    elif isinstance(pdf_path, str):
+        try:
+            from mark_me.batch import caminho_saida
+        except ImportError:
+            from batch import caminho_saida
+        out_path = caminho_saida(pdf_path, os.path.dirname(pdf_path), args.output_dir)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    else:  # entrada '-' com --output-dir
+        try:
+            from mark_me.batch import SUFIXO_SAIDA
+        except ImportError:
+            from batch import SUFIXO_SAIDA
+        out_path = os.path.join(os.path.abspath(args.output_dir), "stdin" + SUFIXO_SAIDA)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+    # O protocolo do mark serve troca caminhos: com entrada/saída padrão, roda aqui
+    if isinstance(pdf_path, str) and isinstance(out_path, str) and _usar_servidor(args, stats):
+        try:
+            from mark_me.server import enviar
+        except ImportError:
+            from server import enviar
+        resposta = enviar(
+            {
+                "op": "mark",
+                "entrada": pdf_path,
+                "saida": out_path,
+                "pares": pares,
+                "opcoes": _opcoes_gravacao(args),
+                "dictionary": bool(args.terms_file),
+                "pages": args.pages,
+            },
+            args.server or None,
+            args.server_timeout,
+        )
+        if resposta is not None:
+            return _relatar_servidor(resposta, out_path)
+
+    if args.update:
+        if args.pick:
+            cor_unica = _pick_color()
+            pares = [(t, cor_unica) for t in termos]
+        return _main_atualizar(args, pdf_path, out_path, pares, workers, stats)
+
+    try:
+        from mark_me.core import apply_plan, find_matches
+    except ImportError:
+        from core import apply_plan, find_matches
     try:
-        n = contar_ocorrencias_multi(pdf_path, termos)
+        plan = find_matches(
+            pdf_path, pares, workers=workers, cache_dir=_cache(args), stats=stats,
+            dictionary=bool(args.terms_file), pages=args.pages, **_limites_memoria(args),
+        )
     except Exception as e:
         print(f"Erro ao ler o PDF: {e}", file=sys.stderr)
         return 1
-    if n == 0:
+    if plan.total == 0:
         print("Nenhuma ocorrência dos termos no PDF. Nada a processar.", file=sys.stderr)
         return 1
 
-    cores_raw = (args.color or [])
-    cores = []
-    for c in cores_raw:
-        cx = (c or "#ffff00").strip()
-        if not cx.startswith("#"):
-            cx = "#" + cx
-        cores.append(cx)
     if args.pick:
+        import dataclasses
         cor_unica = _pick_color()
-        pares = [(t, cor_unica) for t in termos]
-    else:
-        pares = []
-        for i, t in enumerate(termos):
-            pares.append((t, cores[i] if i < len(cores) else "#ffff00"))
-
-    if args.output:
-        out_path = os.path.abspath(args.output)
-    else:
-        nome_base = os.path.splitext(os.path.basename(pdf_path))[0]
-        dir_base = os.path.dirname(pdf_path)
-        out_path = os.path.join(dir_base, f"{nome_base}_marcado.pdf")
+        plan = dataclasses.replace(plan, pares=[(t, cor_unica) for t in termos])
 
     try:
-        destacar_pdf_multi(pdf_path, out_path, pares)
-        print(f"Pronto: {out_path}")
+        apply_plan(plan, out_path, stats=stats, **_opcoes_gravacao(args))
+        if isinstance(out_path, str):
+            print(f"Pronto: {out_path}")
+        else:
+            out_path.flush()
+            print("Pronto: saída padrão", file=sys.stderr)
         return 0
     except Exception as e:
         print(f"Erro ao processar o PDF: {e}", file=sys.stderr)
         return 1
 
 
+def _main_atualizar(
+    args: argparse.Namespace,
+    pdf_path: str | bytes,
+    out_path: str | BinaryIO,
+    pares: list[tuple[str, str]],
+    workers: int,
+    stats: Estatisticas | None,
+) -> int:
+    """--update: leva o PDF já marcado às marcas pedidas, refazendo só o que mudou."""
+    try:
+        from mark_me.core import SemMarcas, atualizar_pdf_multi
+    except ImportError:
+        from core import SemMarcas, atualizar_pdf_multi
+    no_lugar = isinstance(out_path, str) and out_path == pdf_path
+    try:
+        diferenca = atualizar_pdf_multi(
+            pdf_path, out_path, pares, workers=workers, cache_dir=_cache(args), save_mode=args.save_mode,
+            stats=stats, coalesce=args.coalesce, dictionary=bool(args.terms_file), pages=args.pages,
+            require_marks=no_lugar,
+        )
+    except SemMarcas as e:
+        # Sem marcas, --update no lugar regravaria o original do usuário: só com -o
+        print(f"Erro: {e}; para marcá-lo, use -o ARQUIVO (ou rode sem --update).", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Erro ao processar o PDF: {e}", file=sys.stderr)
+        return 1
+    destino = out_path if isinstance(out_path, str) else "saída padrão"
+    if not isinstance(out_path, str):
+        out_path.flush()
+    if not diferenca.mudou:
+        print(f"Nada a mudar: {destino} já tem as marcas pedidas.")
+        return 0
+    partes = []
+    for rotulo, termos in (("novos", diferenca.novos), ("recoloridos", diferenca.recoloridos), ("removidos", diferenca.removidos)):
+        if termos:
+            partes.append(f"{rotulo}: {', '.join(termos)}")
+    if diferenca.ocorrencias:
+        partes.append(f"{diferenca.ocorrencias} ocorrências marcadas")
+    print(f"Atualizado: {destino} ({'; '.join(partes)})")
+    return 0
+
+
+def _leitor_fechou() -> int:
+    """Quem lia a saída padrão fechou o pipe (ex.: mark ... --dry-run | head): termina em silêncio."""
+    # Sem isso, o Python tenta descarregar o stdout ao sair e mostra outro BrokenPipeError
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.__stdout__.fileno())
+    return 0
+
+
+def _main_dry_run(args: argparse.Namespace, termos: list[str], lote: bool, saida_relatorio=None) -> int:
+    """--dry-run: busca sem gravar PDF, com as ocorrências geradas página a página (iter_matches).
+
+    --report grava uma linha JSON por ocorrência assim que é encontrada (em saida_relatorio, se
+    informada; senão no arquivo de --report). Código de saída 1 se
+    algum arquivo falhou ou, com um único arquivo, se não houve ocorrência.
+    """
+    try:
+        from mark_me.core import iter_matches
+    except ImportError:
+        from core import iter_matches
+    if args.pdf == [FLUXO]:
+        entradas = [FLUXO]
+    else:
+        try:
+            from mark_me.batch import expandir_entradas
+        except ImportError:
+            from batch import expandir_entradas
+        entradas = [pdf for pdf, _ in expandir_entradas(args.pdf, recursivo=args.recursive)]
+        if not entradas:
+            print("Erro: nenhum PDF encontrado nas entradas informadas.", file=sys.stderr)
+            return 1
+    relatorio = saida_relatorio
+    if relatorio is None and args.report:
+        try:
+            relatorio = open(args.report, "w", encoding="utf-8")
+        except OSError as e:
+            print(f"Erro ao criar --report: {e}", file=sys.stderr)
+            return 1
+    cache = _cache(args)
+    falhas = total = 0
+    try:
+        for entrada in entradas:
+            por_termo = dict.fromkeys(termos, 0)
+            try:
+                fonte = sys.stdin.buffer.read() if entrada == FLUXO else entrada
+                for ocorrencia in iter_matches(
+                    fonte, termos, cache_dir=cache, dictionary=bool(args.terms_file), pages=args.pages,
+                    **_limites_memoria(args),
+                ):
+                    por_termo[ocorrencia.termo] += 1
+                    if relatorio is not None:
+                        linha = {
+                            "arquivo": entrada,
+                            "pagina": ocorrencia.pagina + 1,
+                            "termo": ocorrencia.termo,
+                            "rect": [round(v, 2) for v in ocorrencia.rect],
+                        }
+                        relatorio.write(json.dumps(linha, ensure_ascii=False) + "\n")
+            except BrokenPipeError:
+                raise
+            except Exception as e:
+                falhas += 1
+                print(f"Erro ao ler o PDF {entrada}: {e}", file=sys.stderr)
+                continue
+            n = sum(por_termo.values())
+            total += n
+            detalhes = ", ".join(f"{termo}: {c}" for termo, c in por_termo.items() if c)
+            print(f"{entrada}: {n} ocorrências" + (f" ({detalhes})" if detalhes else ""))
+    except BrokenPipeError:
+        return _leitor_fechou()
+    finally:
+        if relatorio is not None and relatorio is not saida_relatorio:
+            relatorio.close()
+    if falhas:
+        return 1
+    if not lote and total == 0:
+        print("Nenhuma ocorrência dos termos no PDF.", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _cache(args: argparse.Namespace) -> "CacheIndices | None":
+    """Cache de índices pedido por --cache-dir / MARKME_CACHE (None = desligado)."""
+    try:
+        from mark_me.cache import cache_padrao
+    except ImportError:
+        from cache import cache_padrao
+    cache = cache_padrao(args.cache_dir)
+    if cache is not None and args.cache_max_mb is not None:
+        cache.tamanho_maximo = args.cache_max_mb * 1024 * 1024
+    return cache
+
+
+def _usar_servidor(args: argparse.Namespace, stats: Estatisticas | None) -> bool:
+    """Encaminhar ao mark serve? Só se pedido, e não com -pick, --update, perfil, workers ou
+    --cache-dir/--cache-max-mb (o servidor usa o próprio LRU em memória; esses rodam aqui).
+    """
+    pedido = args.server is not None or bool(os.environ.get(ENV_SOCKET))
+    cache_pedido = args.cache_dir is not None or args.cache_max_mb is not None
+    return (
+        pedido and not args.pick and not args.update and stats is None and not args.cprofile
+        and args.jobs == 1 and not cache_pedido
+    )
+
+
+def _relatar_servidor(resposta: dict, out_path: str) -> int:
+    """Mesmas mensagens e códigos de saída da execução local."""
+    if not resposta.get("ok"):
+        print(f"Erro ao processar o PDF: {resposta.get('erro')}", file=sys.stderr)
+        return 1
+    if resposta.get("total", 0) == 0:
+        print("Nenhuma ocorrência dos termos no PDF. Nada a processar.", file=sys.stderr)
+        return 1
+    print(f"Pronto: {out_path}")
+    return 0
+
+
+def _limites_memoria(args: argparse.Namespace) -> dict:
+    return {"chunk_pages": args.chunk_pages, "max_memory_mb": args.max_memory}
+
+
+def _opcoes_gravacao(args: argparse.Namespace) -> dict:
+    """Opções de apply_plan vindas da linha de comando."""
+    return {"save_mode": args.save_mode, "coalesce": args.coalesce, **_limites_memoria(args)}
+
+
+def _relatar_perfil(stats: Estatisticas, args: argparse.Namespace) -> None:
+    """--profile: tabela no stderr; --profile-json: JSON em arquivo ('-' = saída padrão)."""
+    if args.profile:
+        print(stats.resumo_texto(), file=sys.stderr)
+    if args.profile_json:
+        texto = json.dumps(stats.como_dict(), ensure_ascii=False, indent=2)
+        if args.profile_json == "-":
+            print(texto)
+        else:
+            with open(args.profile_json, "w", encoding="utf-8") as f:
+                f.write(texto + "\n")
+
+
+def _main_lote(
+    args: argparse.Namespace,
+    pares: list[tuple[str, str]],
+    termos: list[str],
+    jobs: int,
+) -> int:
+    """Processa vários PDFs; um arquivo com erro não interrompe os demais."""
+    try:
+        from mark_me.batch import (
+            ATUALIZADO,
+            ERRO,
+            caminho_saida,
+            expandir_entradas,
+            gravar_resumo,
+            processar_lote,
+            resumo,
+            saidas_repetidas,
+        )
+    except ImportError:
+        from batch import (
+            ATUALIZADO,
+            ERRO,
+            caminho_saida,
+            expandir_entradas,
+            gravar_resumo,
+            processar_lote,
+            resumo,
+            saidas_repetidas,
+        )
+    if args.pick:
+        cor_unica = _pick_color()
+        pares = [(t, cor_unica) for t in termos]
+    entradas = expandir_entradas(args.pdf, recursivo=args.recursive)
+    if not entradas:
+        print("Erro: nenhum PDF encontrado nas entradas informadas.", file=sys.stderr)
+        return 1
+    tarefas = [(pdf, caminho_saida(pdf, raiz, args.output_dir)) for pdf, raiz in entradas]
+    repetidas = saidas_repetidas(tarefas)
+    if repetidas:
+        for saida, origens in repetidas.items():
+            print(f"Erro: {len(origens)} entradas gravariam em {saida}: {', '.join(origens)}", file=sys.stderr)
+        print("Use --output-dir com {reldir} ou separe as entradas em execuções diferentes.", file=sys.stderr)
+        return 1
+
+    # Com --summary -, a saída padrão fica só para o JSON
+    saida_progresso = sys.stderr if args.summary == "-" else sys.stdout
+
+    def ao_concluir(r) -> None:
+        if r.status == ERRO:
+            print(f"[{r.status}] {r.entrada}: {r.erro}", file=sys.stderr)
+        elif r.status == ATUALIZADO:
+            print(f"[{r.status}] {r.entrada} (saída já atualizada: {r.saida})", file=saida_progresso)
+        else:
+            print(f"[{r.status}] {r.entrada} ({r.ocorrencias} ocorrências, {r.segundos:.2f}s)", file=saida_progresso)
+
+    inicio = time.perf_counter()
+    resultados = processar_lote(
+        tarefas,
+        pares,
+        jobs=jobs,
+        forcar=args.force,
+        cache=_cache(args),
+        opcoes_gravacao=_opcoes_gravacao(args),
+        medir=args.profile or bool(args.profile_json),
+        ao_concluir=ao_concluir,
+        dicionario=bool(args.terms_file),
+        paginas=args.pages,
+    )
+    dados = resumo(resultados, time.perf_counter() - inicio)
+    totais = ", ".join(f"{n} {status}" for status, n in sorted(dados["por_status"].items()))
+    print(f"Lote: {dados['arquivos']} arquivos ({totais}) em {dados['segundos']:.2f}s", file=sys.stderr)
+    if args.summary:
+        gravar_resumo(dados, args.summary)
+    return 1 if dados["por_status"].get(ERRO) else 0
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,8 +1,239 @@
 """
 Mark.me - Lógica de destaque em PDF (compartilhada por GUI e CLI).
 """
+import contextlib
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from itertools import islice
+from typing import BinaryIO, Container, Iterable, Iterator, NamedTuple, Sequence
+
 import fitz  # PyMuPDF
 
+try:
+    from mark_me.cache import CacheIndices, cache_padrao
+    from mark_me.dicionario import Automato
+    from mark_me.index import IndicePagina, padrao_termo
+    from mark_me.modos import COALESCE_MODES, SAVE_MODES, intervalos_paginas
+    from mark_me.stats import Estatisticas
+    from mark_me.tabela import TabelaOcorrencias, VistaPaginas
+except ImportError:
+    from cache import CacheIndices, cache_padrao
+    from dicionario import Automato
+    from index import IndicePagina, padrao_termo
+    from modos import COALESCE_MODES, SAVE_MODES, intervalos_paginas
+    from stats import Estatisticas
+    from tabela import TabelaOcorrencias, VistaPaginas
+
+# Mesmas flags que Page.search_for usa quando não recebe textpage: assim os
+# retângulos obtidos com a TextPage compartilhada são idênticos aos de antes.
+_FLAGS_BUSCA = (
+    fitz.TEXT_DEHYPHENATE
+    | fitz.TEXT_PRESERVE_WHITESPACE
+    | fitz.TEXT_PRESERVE_LIGATURES
+    | fitz.TEXT_MEDIABOX_CLIP
+)
+
+
+# PDF de entrada: caminho ou o documento em memória (bytes, bytearray, memoryview, mmap ou arquivo
+# aberto em modo binário). Buffers são abertos sem cópia quando o PyMuPDF permite.
+FontePDF = str | os.PathLike | bytes | bytearray | memoryview | mmap.mmap | BinaryIO
+# Saída: caminho, arquivo/fluxo binário com write, ou None para receber os bytes
+DestinoPDF = str | os.PathLike | BinaryIO | None
+
+# Seleção de páginas: "1-20,45,100-" (a partir de 1, como no CLI) ou números a partir de 0
+PaginasPDF = str | Iterable[int] | None
+
+# Ignorados no pré-filtro: espaços (a busca junta sequências e quebras de linha) e hífens
+# (TEXT_DEHYPHENATE junta a palavra partida no fim da linha)
+_SEM_SEPARADORES = {ord(c): None for c in map(chr, range(0x3001)) if c.isspace()} | {ord("-"): None, 0xAD: None}
+
+# Pré-filtro automático (prefilter=None): o texto extraído a mais só compensa se evita buscas;
+# depois das primeiras _AMOSTRA_PREFILTRO páginas, segue ligado só se ao menos _MINIMO_EVITADAS
+# das buscas (termo x página) foram evitadas
+_AMOSTRA_PREFILTRO = 16
+_MINIMO_EVITADAS = 0.25
+
+# Autor (/T) das anotações criadas pelo Mark.me; o assunto (/Subj) guarda o termo marcado, o que
+# permite a atualizar_pdf_multi reconhecê-las
+AUTOR_MARCAS = "Mark.me"
+
+# Porcentagem do store do MuPDF liberada ao fechar um bloco (100 = esvaziar o cache)
+_ESVAZIAR_STORE = 100
+# Páginas mínimas de um bloco fechado por max_memory_mb: com o limite abaixo do que o processo já
+# usa, cada página viraria um bloco (reabrir + gravar) sem poupar memória nenhuma
+_MINIMO_PAGINAS_MEMORIA = 8
+
+# Intervalo mínimo (s) entre eventos de progresso mandados a outro processo (ver executar_com_progresso)
+INTERVALO_PROGRESSO = 0.05
+
+
+class Cancelado(Exception):
+    """Levantada quando o evento cancel= é acionado durante uma busca ou gravação."""
+
+
+class SemMarcas(ValueError):
+    """Levantada por atualizar_pdf_multi(require_marks=True) num PDF sem marcas do Mark.me."""
+
+
+def _acompanhador(fase: str, total: int, progress, cancel):
+    """Função chamada a cada página concluída: verifica cancel e repassa progress(fase, feitas, total).
+
+    Retorna None quando não há nada a acompanhar, para os laços não pagarem a chamada.
+    """
+    if progress is None and cancel is None:
+        return None
+
+    def acompanhar(feitas: int) -> None:
+        if cancel is not None and cancel.is_set():
+            raise Cancelado()
+        if progress is not None:
+            progress(fase, feitas, total)
+    return acompanhar
+
+
+class _CancelamentoLimitado:
+    """cancel= que consulta o evento de outro processo (ex.: proxy do Manager, uma ida e volta de
+    IPC por consulta) no máximo a cada INTERVALO_PROGRESSO s, em vez de a cada página.
+    """
+
+    def __init__(self, evento):
+        self._evento = evento
+        self._ultimo = float("-inf")
+        self._acionado = False
+
+    def is_set(self) -> bool:
+        if not self._acionado:
+            agora = time.monotonic()
+            if agora - self._ultimo >= INTERVALO_PROGRESSO:
+                self._ultimo = agora
+                self._acionado = self._evento.is_set()
+        return self._acionado
+
+
+def executar_com_progresso(funcao, args: tuple, kwargs: dict, cancel, fila):
+    """Roda funcao(*args, progress=..., cancel=cancel, **kwargs) num processo de trabalho (GUI e
+    PoolAssincrono), mandando o progresso para a fila do processo que acompanha.
+
+    Eventos: ("progresso", fase, feitas, total), no máximo um a cada INTERVALO_PROGRESSO s, mais o
+    primeiro e o último de cada fase; fila None = sem progresso. cancel é consultado no mesmo
+    ritmo (o cancelamento chega com até INTERVALO_PROGRESSO s de atraso). Retorna o resultado de
+    funcao; exceções (inclusive Cancelado) ficam para o chamador.
+    """
+    ultimo = 0.0
+
+    def enviar_evento(fase: str, feitas: int, total: int) -> None:
+        nonlocal ultimo
+        agora = time.monotonic()
+        if feitas == 0 or feitas == total or agora - ultimo >= INTERVALO_PROGRESSO:
+            ultimo = agora
+            fila.put(("progresso", fase, feitas, total))
+    progress = enviar_evento if fila is not None else None
+    cancel = _CancelamentoLimitado(cancel) if cancel is not None else None
+    return funcao(*args, progress=progress, cancel=cancel, **kwargs)
+
+
+def _rss_mb() -> float | None:
+    """Memória residente atual do processo em MB (Linux: /proc/self/statm); None se indisponível."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _limites(chunk_pages: int | None, max_memory_mb: float | None) -> tuple[int | None, float | None] | None:
+    """(chunk_pages, max_memory_mb) para o modo em blocos, ou None se nenhum limite foi pedido.
+
+    max_memory_mb abaixo da memória do processo no início vira essa memória: fechar blocos não
+    desce abaixo dela (ver também _MINIMO_PAGINAS_MEMORIA).
+    """
+    if chunk_pages is not None and chunk_pages < 1:
+        raise ValueError("chunk_pages deve ser pelo menos 1.")
+    if max_memory_mb is not None and max_memory_mb <= 0:
+        raise ValueError("max_memory_mb deve ser positivo.")
+    if chunk_pages is None and max_memory_mb is None:
+        return None
+    if max_memory_mb is not None:
+        inicial = _rss_mb()
+        if inicial is not None:
+            max_memory_mb = max(max_memory_mb, inicial)
+    return chunk_pages, max_memory_mb
+
+
+def _bloco_cheio(paginas_no_bloco: int, limites) -> bool:
+    """True se é hora de fechar o bloco: chunk_pages páginas ou memória acima de max_memory_mb
+    (esta com pelo menos _MINIMO_PAGINAS_MEMORIA páginas no bloco).
+    """
+    if limites is None or paginas_no_bloco == 0:
+        return False
+    chunk_pages, max_memory_mb = limites
+    if chunk_pages is not None and paginas_no_bloco >= chunk_pages:
+        return True
+    if max_memory_mb is not None and paginas_no_bloco >= _MINIMO_PAGINAS_MEMORIA:
+        rss = _rss_mb()
+        return rss is not None and rss > max_memory_mb
+    return False
+
+
+def _fonte(entrada: FontePDF) -> str | bytes | memoryview:
+    """Caminho (str) ou buffer que fitz.open aceita sem copiar (bytes ou memoryview)."""
+    if isinstance(entrada, (str, os.PathLike)):
+        return os.fspath(entrada)
+    if isinstance(entrada, (bytes, memoryview)):
+        return entrada
+    if isinstance(entrada, io.BytesIO):
+        return entrada.getbuffer()
+    if isinstance(entrada, (bytearray, mmap.mmap)) or not hasattr(entrada, "read"):
+        return memoryview(entrada).cast("B")  # mmap também tem read(), mas é um buffer
+    return entrada.read()
+
+
+def _abrir(fonte: str | bytes | memoryview) -> fitz.Document:
+    if isinstance(fonte, str):
+        return fitz.open(fonte)
+    return fitz.open(stream=fonte, filetype="pdf")
+
+
+def _selecao(pages: PaginasPDF, n_paginas: int) -> Sequence[int]:
+    """Números (a partir de 0, em ordem, sem repetição) das páginas pedidas; as que não existem são ignoradas."""
+    if pages is None:
+        return range(n_paginas)
+    if isinstance(pages, str):
+        numeros = set()
+        for inicio, fim in intervalos_paginas(pages):
+            numeros.update(range(inicio, n_paginas if fim is None else min(fim, n_paginas)))
+        return sorted(numeros)
+    return sorted({n for n in pages if 0 <= n < n_paginas})
+
+
+def _percorrer(doc: fitz.Document, numeros: Iterable[int], limites=None, fonte: str | bytes | memoryview | None = None):
+    """Gera (número, página) das páginas em numeros e fecha o documento no fim.
+
+    Com limites, a cada bloco o documento é fechado e reaberto (de fonte; padrão: doc.name) e o
+    store do MuPDF é esvaziado: os objetos já lidos não se acumulam e a memória fica estável em
+    documentos muito grandes.
+    """
+    fonte = doc.name if fonte is None else fonte
+    no_bloco = 0
+    try:
+        for numero in numeros:
+            if _bloco_cheio(no_bloco, limites):
+                doc.close()
+                fitz.TOOLS.store_shrink(_ESVAZIAR_STORE)
+                doc = _abrir(fonte)
+                no_bloco = 0
+            yield numero, doc[numero]
+            no_bloco += 1
+    finally:
+        doc.close()
+
 
 def hex_to_rgb_normalized(hex_color: str) -> tuple[float, float, float]:
     """Converte cor hexadecimal (#RRGGBB) para RGB normalizado (0-1) para PyMuPDF."""
@@ -15,9 +246,95 @@ def hex_to_rgb_normalized(hex_color: str) -> tuple[float, float, float]:
     return (r, g, b)
 
 
-def contar_ocorrencias(input_path: str, termo_busca: str) -> int:
+def _chave_filtro(texto: str) -> str:
+    """Texto para o pré-filtro: minúsculo, sem espaços nem hífens. Se a busca acha o termo na
+    página, a chave do termo está na chave do texto (o contrário não vale: é só um filtro)."""
+    return texto.lower().translate(_SEM_SEPARADORES)
+
+
+def _chaves_filtro(termos: list[str]) -> dict[str, str]:
+    return {termo: _chave_filtro(termo) for termo in termos}
+
+
+def _prefiltrar(textpage: fitz.TextPage, termos: list[str], chaves: dict[str, str]) -> list[str]:
+    """Termos cujo texto aparece na página (teste de texto simples, bem mais barato que search_for)."""
+    texto = _chave_filtro(textpage.extractText())
+    return [termo for termo in termos if chaves[termo] in texto]
+
+
+class _PreFiltro:
+    """Pré-filtro de páginas de uma busca. No modo automático, desliga (ativo = False) depois da
+    amostra se quase nenhuma busca foi evitada: em documentos densos, extrair o texto de cada
+    página só encarece a busca."""
+
+    def __init__(self, termos: list[str], automatico: bool):
+        self.chaves = _chaves_filtro(termos)
+        self.ativo = True
+        self._automatico = automatico
+        self._paginas = self._buscas = self._evitadas = 0
+
+    def filtrar(self, textpage: fitz.TextPage, termos: list[str]) -> list[str]:
+        passaram = _prefiltrar(textpage, termos, self.chaves)
+        if self._automatico:
+            self._paginas += 1
+            self._buscas += len(termos)
+            self._evitadas += len(termos) - len(passaram)
+            if self._paginas == _AMOSTRA_PREFILTRO and self._evitadas < _MINIMO_EVITADAS * self._buscas:
+                self.ativo = False
+        return passaram
+
+
+def _prefiltro(termos: list[str], prefilter: bool | None) -> _PreFiltro | None:
+    """Pré-filtro para o prefilter de find_matches / iter_matches (None: sem pré-filtro)."""
+    return None if prefilter is False else _PreFiltro(termos, automatico=prefilter is None)
+
+
+def _buscar_na_pagina(
+    pagina: fitz.Page, termos: list[str], filtro: _PreFiltro | None = None,
+) -> dict[str, list[fitz.Rect]] | None:
+    """Extrai o texto da página uma única vez e busca todos os termos nessa TextPage.
+
+    Com filtro ativo, só busca os termos que passam no pré-filtro; retorna None se nenhum passa
+    (página pulada, sem busca geométrica).
+    """
+    textpage = pagina.get_textpage(flags=_FLAGS_BUSCA)
+    if filtro is not None and filtro.ativo:
+        termos = filtro.filtrar(textpage, termos)
+        if not termos:
+            return None
+    resultado: dict[str, list[fitz.Rect]] = {}
+    for termo in termos:
+        if termo not in resultado:
+            resultado[termo] = pagina.search_for(termo, textpage=textpage)
+    return resultado
+
+
+@lru_cache(maxsize=4)
+def _automato(termos: tuple[str, ...]) -> Automato:
+    """Autômato dos termos, montado uma vez por processo (os workers recebem só a lista)."""
+    return Automato(termos)
+
+
+def _buscador(termos: list[str], dicionario: bool, prefiltro: bool | None = False):
+    """Função página -> {termo: [retângulos]} (só termos encontrados) para o modo de busca pedido.
+
+    Com prefiltro (True ou None = automático; não se aplica ao dicionário), retorna None nas
+    páginas puladas pelo pré-filtro.
+    """
+    if not dicionario:
+        filtro = _prefiltro(termos, prefiltro)
+
+        def buscar(pagina: fitz.Page) -> dict[str, list[fitz.Rect]] | None:
+            achados = _buscar_na_pagina(pagina, termos, filtro)
+            return None if achados is None else {t: rects for t, rects in achados.items() if rects}
+        return buscar
+    automato = _automato(tuple(termos))
+    return lambda pagina: automato.buscar(IndicePagina.da_textpage(pagina.get_textpage(flags=_FLAGS_BUSCA)))
+
+
+def contar_ocorrencias(input_path: FontePDF, termo_busca: str) -> int:
     """Retorna o número de ocorrências do termo no PDF (verificação rápida, sem gravar)."""
-    doc = fitz.open(input_path)
+    doc = _abrir(_fonte(input_path))
     total = 0
     for pagina in doc:
         total += len(pagina.search_for(termo_busca))
@@ -25,39 +342,877 @@ def contar_ocorrencias(input_path: str, termo_busca: str) -> int:
     return total
 
 
-def contar_ocorrencias_multi(input_path: str, termos: list[str]) -> int:
-    """Retorna o total de ocorrências de todos os termos no PDF."""
-    doc = fitz.open(input_path)
-    total = 0
-    for pagina in doc:
+def _normalizar_pares(pares: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Remove espaços nas pontas e descarta termos vazios."""
+    return [(t.strip(), c) for t, c in pares if t and t.strip()]
+
+
+@dataclass
+class MatchPlan:
+    """Resultado de uma busca: ocorrências por página e por termo, prontas para aplicar.
+
+    ocorrencias: as ocorrências em colunas (página, termo, retângulo; ver mark_me.tabela), sem
+    um objeto Python por ocorrência. paginas: a mesma coisa como {índice da página: {termo:
+    [retângulos]}}, montada página a página quando lida; só tem páginas com ocorrência.
+    input_path: caminho do PDF ou o buffer com o documento em memória.
+    """
+    input_path: str | bytes | memoryview
+    pares: list[tuple[str, str]]
+    ocorrencias: TabelaOcorrencias | None = None
+
+    def __post_init__(self):
+        if self.ocorrencias is None:
+            self.ocorrencias = TabelaOcorrencias(termo for termo, _ in self.pares)
+
+    @property
+    def paginas(self) -> VistaPaginas:
+        return VistaPaginas(self.ocorrencias)
+
+    @property
+    def contagens(self) -> dict[str, int]:
+        """Número de ocorrências por termo (na ordem de pares)."""
+        return self.ocorrencias.contagens()
+
+    @property
+    def total(self) -> int:
+        """Total de ocorrências de todos os termos (termo repetido em pares conta uma vez)."""
+        return len(self.ocorrencias)
+
+    def filtrar(self, paginas: Container[int] | None = None, termos: Container[str] | None = None) -> "MatchPlan":
+        """Plano só com as ocorrências dessas páginas e desses termos (ex.: aplicar parte de uma busca)."""
+        return replace(self, ocorrencias=self.ocorrencias.filtrar(paginas, termos))
+
+
+def _buscar_intervalo(
+    input_path: str | bytes | memoryview,
+    termos: list[str],
+    medir: bool,
+    limites,
+    dicionario: bool,
+    prefiltro: bool | None,
+    numeros: Sequence[int],
+    acompanhar=None,
+    stats: Estatisticas | None = None,
+) -> tuple[TabelaOcorrencias, Estatisticas | None]:
+    """Busca os termos nas páginas em numeros. Também roda em processos filhos (workers).
+
+    medir=True mede tempo e ocorrências por página e páginas puladas pelo pré-filtro: em série,
+    direto em stats (ao_medir é chamado assim que cada página termina); num worker, sem stats,
+    numa Estatisticas da faixa, devolvida para o processo principal mesclar (senão None).
+    limites: ver _percorrer; dicionario e prefiltro: ver find_matches. acompanhar(páginas
+    feitas), só no processo principal, é chamado a cada página.
+    """
+    buscar = _buscador(termos, dicionario, prefiltro)
+    parcial = Estatisticas() if medir and stats is None else None
+    if parcial is not None:
+        stats = parcial
+    tabela = TabelaOcorrencias(termos)
+    t0 = time.perf_counter() if stats is not None else 0.0
+    doc = _abrir(input_path)
+    if stats is not None:
+        stats.medir("abrir", time.perf_counter() - t0)
+    for feitas, (numero, pagina) in enumerate(_percorrer(doc, numeros, limites, input_path), 1):
+        t0 = time.perf_counter() if stats is not None else 0.0
+        achados = buscar(pagina)
+        if achados:
+            tabela.acrescentar(numero, achados)
+        if stats is not None:
+            stats.medir("busca", time.perf_counter() - t0, numero)
+            if achados is None:
+                stats.contar("paginas_puladas", 1, numero)
+            else:
+                stats.contar("ocorrencias", sum(len(rects) for rects in achados.values()), numero)
+        if acompanhar is not None:
+            acompanhar(feitas)
+    return tabela, parcial
+
+
+def _indexar_intervalo(
+    input_path: str | bytes | memoryview, numeros: Sequence[int], acompanhar=None,
+) -> list[IndicePagina]:
+    """Extrai o índice de texto das páginas em numeros. Também roda em processos filhos."""
+    doc = _abrir(input_path)
+    indices = []
+    for feitas, numero in enumerate(numeros, 1):
+        indices.append(IndicePagina.da_textpage(doc[numero].get_textpage(flags=_FLAGS_BUSCA)))
+        if acompanhar is not None:
+            acompanhar(feitas)
+    doc.close()
+    return indices
+
+
+def _faixas(numeros: Sequence[int], workers: int) -> list[Sequence[int]]:
+    """Divide as páginas em faixas contíguas; algumas por worker para equilibrar a carga."""
+    n_faixas = min(len(numeros), workers * 4) or 1
+    tamanho = -(-len(numeros) // n_faixas)
+    return [numeros[i:i + tamanho] for i in range(0, len(numeros), tamanho)]
+
+
+def _por_faixas(
+    funcao,
+    input_path: str | bytes | memoryview,
+    extra: tuple,
+    workers: int,
+    fase: str = "busca",
+    progress=None,
+    cancel=None,
+    pages: PaginasPDF = None,
+    stats: Estatisticas | None = None,
+    em_serie: dict | None = None,
+) -> list:
+    """Roda funcao(input_path, *extra, numeros) sobre as páginas pedidas (todas, sem pages); resultados em ordem.
+
+    Em série, o progresso é por página; com workers, a cada faixa concluída (e o cancelamento
+    descarta as faixas que ainda não começaram). stats conta as páginas fora da seleção.
+    em_serie: argumentos nomeados a mais só para a chamada em série (objetos do processo principal).
+    """
+    doc = _abrir(input_path)
+    n_paginas = doc.page_count
+    doc.close()
+    numeros = _selecao(pages, n_paginas)
+    if stats is not None and pages is not None:
+        stats.contar("paginas_fora", n_paginas - len(numeros))
+    acompanhar = _acompanhador(fase, len(numeros), progress, cancel)
+    if workers <= 1 or len(numeros) < 2:
+        return [funcao(input_path, *extra, numeros, acompanhar=acompanhar, **(em_serie or {}))]
+    faixas = _faixas(numeros, workers)
+    if not isinstance(input_path, str):
+        input_path = bytes(input_path)  # memoryview não vai para outro processo; cada worker recebe uma cópia
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(faixas)))
+    try:
+        futuros = {pool.submit(funcao, input_path, *extra, faixa): len(faixa) for faixa in faixas}
+        if acompanhar is not None:
+            feitas = 0
+            for futuro in as_completed(futuros):
+                futuro.result()
+                feitas += futuros[futuro]
+                acompanhar(feitas)
+        return [futuro.result() for futuro in futuros]
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _buscar_nos_indices(
+    indices: list[IndicePagina],
+    termos: list[str],
+    stats: Estatisticas | None = None,
+    acompanhar=None,
+    dicionario: bool = False,
+    numeros: Sequence[int] | None = None,
+) -> TabelaOcorrencias:
+    """Busca os termos nos índices de texto (só das páginas em numeros, se informado), sem abrir o PDF."""
+    automato = _automato(tuple(termos)) if dicionario else None
+    padroes = {} if dicionario else {termo: padrao_termo(termo) for termo in termos}
+    tabela = TabelaOcorrencias(termos)
+    for feitas, numero in enumerate(range(len(indices)) if numeros is None else numeros, 1):
+        indice = indices[numero]
+        t0 = time.perf_counter() if stats is not None else 0.0
+        achados = automato.buscar(indice) if automato is not None else {}
+        for termo, padrao in padroes.items():
+            rects = indice.buscar(padrao)
+            if rects:
+                achados[termo] = rects
+        if achados:
+            tabela.acrescentar(numero, achados)
+        if stats is not None:
+            stats.medir("busca", time.perf_counter() - t0, numero)
+            stats.contar("ocorrencias", sum(len(rects) for rects in achados.values()), numero)
+        if acompanhar is not None:
+            acompanhar(feitas)
+    return tabela
+
+
+def _indices_com_cache(
+    input_path: str | bytes | memoryview,
+    cache: CacheIndices,
+    workers: int,
+    stats: Estatisticas | None = None,
+    progress=None,
+    cancel=None,
+) -> list[IndicePagina]:
+    """Índices do documento vindos do cache; na falta, extrai (com workers) e grava no cache."""
+    t0 = time.perf_counter() if stats is not None else 0.0
+    chave = cache.chave(input_path)
+    indices = cache.obter(chave)
+    if stats is not None:
+        stats.medir("cache", time.perf_counter() - t0)
+    if indices is None:
+        t0 = time.perf_counter() if stats is not None else 0.0
+        faixas = _por_faixas(_indexar_intervalo, input_path, (), workers, "indexacao", progress, cancel)
+        indices = [ix for faixa in faixas for ix in faixa]
+        cache.gravar(chave, indices)
+        if stats is not None:
+            stats.medir("indexacao", time.perf_counter() - t0)
+    return indices
+
+
+def indexar_pdf(
+    input_path: FontePDF,
+    workers: int = 1,
+    cache_dir: str | CacheIndices | None = None,
+    progress=None,
+    cancel=None,
+) -> list[IndicePagina]:
+    """Índices de texto de todas as páginas (ver mark_me.index), do cache quando houver.
+
+    Para buscar muitas vezes no mesmo documento sem reabri-lo (ex.: contagens ao digitar, na
+    GUI); ver contar_nos_indices. progress/cancel: ver find_matches (fase "indexacao").
+    """
+    fonte = _fonte(input_path)
+    cache = cache_padrao(cache_dir)
+    if cache is not None:
+        return _indices_com_cache(fonte, cache, workers, progress=progress, cancel=cancel)
+    faixas = _por_faixas(_indexar_intervalo, fonte, (), workers, "indexacao", progress, cancel)
+    return [ix for faixa in faixas for ix in faixa]
+
+
+def contar_nos_indices(indices: list[IndicePagina], termos: list[str], cancel=None) -> dict[str, int]:
+    """Ocorrências de cada termo nos índices de indexar_pdf (as mesmas de find_matches).
+
+    cancel interrompe com Cancelado, verificado a cada página.
+    """
+    padroes = {termo: padrao_termo(termo) for termo in dict.fromkeys(t.strip() for t in termos) if termo}
+    contagens = dict.fromkeys(padroes, 0)
+    for indice in indices:
+        if cancel is not None and cancel.is_set():
+            raise Cancelado()
+        for termo, padrao in padroes.items():
+            if indice.contem(padrao):
+                contagens[termo] += indice.contar(padrao)
+    return contagens
+
+
+def plano_nos_indices(
+    input_path: FontePDF,
+    indices: list[IndicePagina],
+    pares: list[tuple[str, str]],
+    cancel=None,
+) -> MatchPlan:
+    """MatchPlan dos pares buscado nos índices de indexar_pdf, sem reler o PDF (ex.: pré-visualização).
+
+    cancel interrompe com Cancelado, verificado a cada página.
+    """
+    pares = _normalizar_pares(pares)
+    plan = MatchPlan(input_path=_fonte(input_path), pares=pares)
+    if pares:
+        acompanhar = _acompanhador("busca", len(indices), None, cancel)
+        plan.ocorrencias = _buscar_nos_indices(indices, [termo for termo, _ in pares], acompanhar=acompanhar)
+    return plan
+
+
+def find_matches(
+    input_path: FontePDF,
+    pares: list[tuple[str, str]],
+    workers: int = 1,
+    cache_dir: str | CacheIndices | None = None,
+    stats: Estatisticas | None = None,
+    progress=None,
+    cancel=None,
+    chunk_pages: int | None = None,
+    max_memory_mb: float | None = None,
+    dictionary: bool = False,
+    pages: PaginasPDF = None,
+    prefilter: bool | None = None,
+) -> MatchPlan:
+    """Busca todos os (termo, cor_hex) no PDF em uma única passada, sem gravar nada.
+
+    input_path: caminho ou PDF em memória (bytes, bytearray, memoryview, mmap ou arquivo binário
+    aberto; ver FontePDF). O plano guarda o buffer para apply_plan não ler o documento de novo.
+    workers > 1 distribui faixas de páginas entre processos; cada um abre o PDF por conta própria.
+    cache_dir (ou a variável MARKME_CACHE) liga o cache em disco dos índices de texto: com o
+    documento já indexado, a busca não lê o conteúdo das páginas.
+    stats recebe tempos por fase/página e contagens (ver mark_me.stats).
+    progress(fase, feitas, total) informa o avanço; cancel (ex.: threading.Event) interrompe a
+    busca com Cancelado assim que is_set() for verdadeiro.
+    chunk_pages / max_memory_mb: percorre o documento em blocos de no máximo chunk_pages páginas
+    (ou até a memória do processo passar de max_memory_mb), reabrindo o PDF entre eles para a
+    memória não crescer com o número de páginas. Não se aplica à indexação do cache.
+    dictionary=True busca todos os termos numa só passada pelo texto de cada página (listas com
+    milhares de termos; ver mark_me.dicionario): ocorrências sobrepostas de termos diferentes
+    seguem a regra mais à esquerda, depois mais longa, e não são marcadas duas vezes.
+    pages: só estas páginas — "1-20,45,100-" (a partir de 1) ou números a partir de 0; as que
+    não existem são ignoradas. stats conta as de fora em "paginas_fora".
+    prefilter: antes da busca geométrica (search_for), testa se o texto do termo aparece no texto
+    simples da página, ignorando maiúsculas, espaços e hífens; páginas sem nenhum termo são
+    puladas (stats: "paginas_puladas"). Nunca descarta uma ocorrência; sem efeito com dictionary
+    ou com o cache, que já buscam no texto. None (padrão): automático — o teste custa uma extração
+    de texto a mais por página, então é desligado se nas primeiras 16 páginas (de cada worker)
+    ele evitar menos de 1/4 das buscas (termo x página); True: sempre; False: nunca.
+    """
+    limites = _limites(chunk_pages, max_memory_mb)
+    pares = _normalizar_pares(pares)
+    if not pares:
+        raise ValueError("Nenhum termo informado.")
+    input_path = _fonte(input_path)
+    plan = MatchPlan(input_path=input_path, pares=pares)
+    termos = [termo for termo, _ in pares]
+    cache = cache_padrao(cache_dir)
+    if cache is not None:
+        indices = _indices_com_cache(input_path, cache, workers, stats, progress, cancel)
+        numeros = _selecao(pages, len(indices))
+        if stats is not None and pages is not None:
+            stats.contar("paginas_fora", len(indices) - len(numeros))
+        acompanhar = _acompanhador("busca", len(numeros), progress, cancel)
+        plan.ocorrencias = _buscar_nos_indices(indices, termos, stats, acompanhar, dictionary, numeros)
+        return plan
+    faixas = _por_faixas(
+        _buscar_intervalo, input_path, (termos, stats is not None, limites, dictionary, prefilter), workers, "busca",
+        progress, cancel, pages, stats, em_serie={"stats": stats},
+    )
+    for tabela, parcial in faixas:
+        plan.ocorrencias.estender(tabela)
+        if parcial is not None:
+            stats.mesclar(parcial)
+    return plan
+
+
+class Ocorrencia(NamedTuple):
+    """Uma ocorrência encontrada por iter_matches (pagina a partir de 0)."""
+    pagina: int
+    termo: str
+    rect: fitz.Rect
+
+
+def _ocorrencias_da_pagina(
+    pagina: fitz.Page, termos: list[str], automato: Automato | None, filtro: _PreFiltro | None = None,
+):
+    """Gera (termo, rect) da página na ordem de termos; sem dicionário, busca um termo por vez
+    (com filtro ativo, só os que passam no pré-filtro)."""
+    textpage = pagina.get_textpage(flags=_FLAGS_BUSCA)
+    if automato is None and filtro is not None and filtro.ativo:
+        termos = filtro.filtrar(textpage, termos)
+    if automato is not None:
+        achados = automato.buscar(IndicePagina.da_textpage(textpage))
         for termo in termos:
-            total += len(pagina.search_for(termo))
+            for rect in achados.get(termo, ()):
+                yield termo, rect
+        return
+    for termo in termos:
+        for rect in pagina.search_for(termo, textpage=textpage):
+            yield termo, rect
+
+
+def iter_matches(
+    input_path: FontePDF,
+    termos: list[str],
+    cache_dir: str | CacheIndices | None = None,
+    chunk_pages: int | None = None,
+    max_memory_mb: float | None = None,
+    dictionary: bool = False,
+    pages: PaginasPDF = None,
+    prefilter: bool | None = None,
+) -> Iterator[Ocorrencia]:
+    """Gera as ocorrências (pagina, termo, rect) à medida que são encontradas, página a página.
+
+    Parar de consumir (break, islice) interrompe a busca: as páginas e os termos seguintes não
+    são lidos. Na página, a ordem é a de termos (repetidos contam uma vez). Com cache_dir, usa os
+    índices se o documento já estiver no cache, mas não indexa (isso exigiria ler tudo).
+    chunk_pages / max_memory_mb, dictionary, pages e prefilter: ver find_matches.
+    """
+    limites = _limites(chunk_pages, max_memory_mb)
+    termos = list(dict.fromkeys(termo for termo, _ in _normalizar_pares([(t, "") for t in termos])))
+    if not termos:
+        return
+    fonte = _fonte(input_path)
+    automato = _automato(tuple(termos)) if dictionary else None
+    cache = cache_padrao(cache_dir)
+    indices = cache.obter(cache.chave(fonte)) if cache is not None else None
+    if indices is not None:
+        padroes = {} if dictionary else {termo: padrao_termo(termo) for termo in termos}
+        for numero in _selecao(pages, len(indices)):
+            indice = indices[numero]
+            achados = automato.buscar(indice) if automato is not None else {}
+            for termo in termos:
+                rects = achados.get(termo) if automato is not None else indice.buscar(padroes[termo])
+                for rect in rects or ():
+                    yield Ocorrencia(numero, termo, rect)
+        return
+    filtro = _prefiltro(termos, prefilter) if automato is None else None
+    doc = _abrir(fonte)
+    for numero, pagina in _percorrer(doc, _selecao(pages, doc.page_count), limites, fonte):
+        for termo, rect in _ocorrencias_da_pagina(pagina, termos, automato, filtro):
+            yield Ocorrencia(numero, termo, rect)
+
+
+def has_any_match(input_path: FontePDF, termos: list[str], **opcoes) -> bool:
+    """True se algum termo aparece no PDF; para na primeira ocorrência (opcoes: ver iter_matches)."""
+    return next(iter_matches(input_path, termos, **opcoes), None) is not None
+
+
+def count_matches(input_path: FontePDF, termos: list[str], limit: int | None = None, **opcoes) -> int:
+    """Total de ocorrências, parando de buscar ao chegar em limit (opcoes: ver iter_matches)."""
+    return sum(1 for _ in islice(iter_matches(input_path, termos, **opcoes), limit))
+
+
+def _mesmo_arquivo(a: str, b: str) -> bool:
+    return os.path.exists(b) and os.path.samefile(a, b)
+
+
+def _abrir_para_gravar(
+    input_path: str | bytes | memoryview, output_path: str | BinaryIO | None, save_mode: str,
+) -> fitz.Document:
+    """Abre o documento que vai receber as marcações.
+
+    No modo incremental a atualização é acrescentada ao próprio arquivo de saída, então a
+    entrada é copiada para lá antes (a menos que entrada e saída sejam o mesmo arquivo); se o
+    documento não puder ser aberto para isso, a cópia é removida.
+    """
+    if save_mode not in SAVE_MODES:
+        raise ValueError(f"save_mode inválido: {save_mode!r} (use {', '.join(SAVE_MODES)}).")
+    if save_mode != "incremental":
+        return _abrir(input_path)
+    if not isinstance(input_path, str) or not isinstance(output_path, str):
+        raise ValueError("save_mode 'incremental' exige entrada e saída em disco; com PDF em memória ou fluxo, use 'fast' ou 'compact'.")
+    copiou = not _mesmo_arquivo(input_path, output_path)
+    if copiou:
+        shutil.copyfile(input_path, output_path)
+    doc = None
+    try:
+        doc = fitz.open(output_path)
+        if not doc.can_save_incrementally():
+            raise ValueError("Este PDF não permite gravação incremental (ex.: precisou de reparo); use save_mode 'fast' ou 'compact'.")
+    except BaseException:
+        _desfazer_gravacao(doc, output_path, copiou)
+        raise
+    return doc
+
+
+def _fechar(doc: fitz.Document | None) -> None:
+    """Fecha o documento, se ainda aberto (_salvar fecha o que regravou sobre a própria origem)."""
+    if doc is not None and not doc.is_closed:
+        doc.close()
+
+
+def _desfazer_gravacao(doc: fitz.Document | None, output_path: DestinoPDF, copiou: bool) -> None:
+    """Fecha o documento e remove a saída que era só a cópia da entrada (gravação incremental)."""
+    _fechar(doc)
+    if copiou:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(output_path)
+
+
+def _salvar(doc: fitz.Document, output_path: str | BinaryIO | None, save_mode: str) -> bytes | None:
+    """Grava em output_path (caminho ou fluxo binário); com None, retorna os bytes do PDF.
+
+    Em "fast" e "compact" com output_path igual ao arquivo aberto (o MuPDF só regrava a origem
+    de forma incremental), grava num temporário da mesma pasta, fecha o documento e troca o
+    arquivo com os.replace.
+    """
+    if save_mode == "incremental":
+        doc.save(doc.name, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+        return None
+    opcoes = {} if save_mode == "fast" else {"garbage": 4, "deflate": True, "clean": True}
+    if output_path is None:
+        return doc.tobytes(**opcoes)
+    if isinstance(output_path, str) and doc.name and _mesmo_arquivo(doc.name, output_path):
+        descritor, temporario = tempfile.mkstemp(suffix=".pdf", dir=os.path.dirname(os.path.abspath(output_path)))
+        os.close(descritor)
+        try:
+            doc.save(temporario, **opcoes)
+            doc.close()  # antes da troca: no Windows, o arquivo aberto não pode ser substituído
+            shutil.copymode(output_path, temporario)
+            os.replace(temporario, output_path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temporario)
+            raise
+    elif isinstance(output_path, str):
+        doc.save(output_path, **opcoes)
+    else:
+        # Fluxo: Document.save grava no caminho de .name (ex.: "<stdout>") e exige seek
+        output_path.write(doc.tobytes(**opcoes))
+    return None
+
+
+def apply_plan(
+    plan: MatchPlan,
+    output_path: DestinoPDF = None,
+    save_mode: str = "compact",
+    stats: Estatisticas | None = None,
+    progress=None,
+    cancel=None,
+    coalesce: str = "none",
+    chunk_pages: int | None = None,
+    max_memory_mb: float | None = None,
+) -> bytes | None:
+    """Grava em output_path o PDF com as marcações do plano, sem buscar de novo.
+
+    output_path: caminho, arquivo/fluxo binário (ex.: io.BytesIO, sys.stdout.buffer) ou None para
+    retornar os bytes do PDF marcado (sem arquivo intermediário).
+    save_mode: "compact" (coleta de lixo + compressão, o mais lento e menor), "fast" (regrava
+    sem limpar nem recomprimir) ou "incremental" (só acrescenta as anotações ao fim do arquivo;
+    com output_path igual à entrada, grava no próprio arquivo).
+    coalesce: "none" (uma anotação por ocorrência), "line" (uma por termo e linha) ou "page"
+    (uma por termo e página, com vários quads) — menos objetos no PDF, mesma área marcada.
+    progress/cancel: ver find_matches (fases "anotacao" e "gravacao"). Cancelado antes da
+    gravação, o arquivo de saída não é escrito; com erro ou Cancelado, a cópia da entrada feita
+    para a gravação incremental é removida.
+    chunk_pages / max_memory_mb: grava em blocos — cada bloco de páginas anotadas é acrescentado
+    à saída (gravação incremental) e o documento é reaberto, então a memória não acumula as
+    anotações do documento inteiro. Exige save_mode "incremental"; o resultado tem as mesmas
+    marcações da gravação única. Cancelado no meio, com saída igual à entrada, os blocos já
+    gravados ficam no arquivo.
+    """
+    if coalesce not in COALESCE_MODES:
+        raise ValueError(f"coalesce inválido: {coalesce!r} (use {', '.join(COALESCE_MODES)}).")
+    limites = _limites(chunk_pages, max_memory_mb)
+    if limites is not None and save_mode != "incremental":
+        raise ValueError("chunk_pages/max_memory_mb exigem save_mode 'incremental'.")
+    if isinstance(output_path, os.PathLike):
+        output_path = os.fspath(output_path)
+    numeros = list(plan.paginas)
+    acompanhar = _acompanhador("anotacao", len(numeros), progress, cancel)
+    t0 = time.perf_counter() if stats is not None else 0.0
+    copiou = (
+        save_mode == "incremental" and isinstance(plan.input_path, str) and isinstance(output_path, str)
+        and not _mesmo_arquivo(plan.input_path, output_path)
+    )
+    doc = _abrir_para_gravar(plan.input_path, output_path, save_mode)
+    if stats is not None:
+        stats.medir("abrir", time.perf_counter() - t0)
+    try:
+        feitas = _anotar(doc, plan, numeros, coalesce, stats, acompanhar, limites)
+        while feitas < len(numeros):
+            doc = _descarregar(doc, stats)
+            feitas += _anotar(doc, plan, numeros[feitas:], coalesce, stats, acompanhar, limites, feitas)
+        if progress is not None:
+            progress("gravacao", 0, 1)
+        t0 = time.perf_counter() if stats is not None else 0.0
+        dados = _salvar(doc, output_path, save_mode)
+    except BaseException:
+        _desfazer_gravacao(doc, output_path, copiou)
+        raise
+    _fechar(doc)
+    if stats is not None:
+        stats.medir("gravacao", time.perf_counter() - t0)
+    if progress is not None:
+        progress("gravacao", 1, 1)
+    return dados
+
+
+def _agrupar(rects: list[fitz.Rect], coalesce: str) -> list[list[fitz.Rect]]:
+    """Separa os retângulos de um termo em grupos; cada grupo vira uma anotação (multi-quad)."""
+    if coalesce == "page":
+        return [rects]
+    if coalesce == "none":
+        return [[r] for r in rects]
+    grupos: list[list[fitz.Rect]] = []
+    for r in rects:
+        if grupos:
+            ref = grupos[-1][0]
+            sobreposicao = min(ref.y1, r.y1) - max(ref.y0, r.y0)
+            if sobreposicao >= 0.5 * min(ref.height, r.height):
+                grupos[-1].append(r)
+                continue
+        grupos.append([r])
+    return grupos
+
+
+def _descarregar(doc: fitz.Document, stats) -> fitz.Document:
+    """Acrescenta o bloco anotado ao arquivo, libera a memória do MuPDF e reabre o documento."""
+    t0 = time.perf_counter() if stats is not None else 0.0
+    path = doc.name
+    _salvar(doc, path, "incremental")
     doc.close()
-    return total
+    fitz.TOOLS.store_shrink(_ESVAZIAR_STORE)
+    if stats is not None:
+        stats.medir("gravacao", time.perf_counter() - t0)
+        stats.contar("blocos", 1)
+    return fitz.open(path)
+
 
+def _anotar(
+    doc: fitz.Document,
+    plan: MatchPlan,
+    numeros: list[int],
+    coalesce: str,
+    stats,
+    acompanhar,
+    limites=None,
+    ja_feitas: int = 0,
+) -> int:
+    """Cria as anotações do plano nas páginas numeros (em ordem); retorna quantas páginas anotou.
 
-def destacar_pdf(input_path: str, output_path: str, termo_busca: str, hex_color: str) -> None:
+    Com limites (ver _bloco_cheio), para quando o bloco enche; ja_feitas soma ao progresso.
+    Cada página percorre só os termos encontrados nela (listas de termos podem ser enormes),
+    na ordem de plan.pares; um termo repetido em pares é marcado com cada uma das suas cores.
+    As anotações levam autor AUTOR_MARCAS e o termo no assunto.
+    """
+    cores: dict[str, list[str]] = {}
+    for termo_busca, hex_color in plan.pares:
+        cores.setdefault(termo_busca, []).append(hex_color)
+    ordem = {termo_busca: i for i, termo_busca in enumerate(cores)}
+    for i, numero in enumerate(numeros):
+        if _bloco_cheio(i, limites):
+            return i
+        t0 = time.perf_counter() if stats is not None else 0.0
+        pagina = doc[numero]
+        achados = plan.ocorrencias.da_pagina(numero)
+        n_anotacoes = 0
+        for termo_busca in sorted(achados, key=ordem.__getitem__):
+            rects = achados[termo_busca]
+            for hex_color in cores[termo_busca]:
+                rgb = hex_to_rgb_normalized(hex_color)
+                for grupo in _agrupar(rects, coalesce):
+                    annot = pagina.add_highlight_annot(grupo if len(grupo) > 1 else grupo[0])
+                    annot.set_colors(stroke=rgb)
+                    annot.set_info(title=AUTOR_MARCAS, subject=termo_busca)
+                    annot.update()
+                    n_anotacoes += 1
+        if stats is not None:
+            stats.medir("anotacao", time.perf_counter() - t0, numero)
+            stats.contar("anotacoes", n_anotacoes, numero)
+        if acompanhar is not None:
+            acompanhar(ja_feitas + i + 1)
+    return len(numeros)
+
+
+def renderizar_pagina(doc: fitz.Document, plan: MatchPlan | None, numero: int, zoom: float = 1.0) -> bytes:
+    """Imagem PPM da página numero com as marcações do plano, como ficarão no PDF gravado.
+
+    As anotações são criadas em doc só para a renderização e removidas em seguida; as que a
+    página já tinha continuam lá.
+    """
+    antes = {annot.xref for annot in doc[numero].annots()}
+    if plan is not None and numero in plan.paginas:
+        _anotar(doc, plan, [numero], "none", None, None)
+    pagina = doc[numero]
+    pixmap = pagina.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    for xref in [annot.xref for annot in pagina.annots()]:
+        if xref not in antes:
+            pagina.delete_annot(pagina.load_annot(xref))
+    return pixmap.tobytes("ppm")
+
+
+def contar_ocorrencias_multi(
+    input_path: FontePDF,
+    termos: list[str],
+    workers: int = 1,
+    cache_dir: str | CacheIndices | None = None,
+    stats: Estatisticas | None = None,
+    progress=None,
+    cancel=None,
+    dictionary: bool = False,
+    pages: PaginasPDF = None,
+) -> int:
+    """Retorna o total de ocorrências de todos os termos no PDF (nas páginas pedidas; ver find_matches).
+
+    Como sempre foi, cada termo da lista conta: um termo repetido soma as ocorrências de novo
+    (diferente de MatchPlan.total, que conta cada ocorrência uma vez).
+    """
+    pares = _normalizar_pares([(termo, "") for termo in termos])
+    if not pares:
+        return 0
+    plan = find_matches(
+        input_path, pares, workers=workers, cache_dir=cache_dir, stats=stats, progress=progress, cancel=cancel,
+        dictionary=dictionary, pages=pages,
+    )
+    contagens = plan.contagens
+    return sum(contagens.get(termo, 0) for termo, _ in pares)
+
+
+def destacar_pdf(input_path: FontePDF, output_path: DestinoPDF, termo_busca: str, hex_color: str) -> bytes | None:
     """Aplica marca-texto no PDF com o termo e cor indicados."""
-    destacar_pdf_multi(input_path, output_path, [(termo_busca, hex_color)])
+    return destacar_pdf_multi(input_path, output_path, [(termo_busca, hex_color)])
 
 
 def destacar_pdf_multi(
-    input_path: str,
-    output_path: str,
+    input_path: FontePDF,
+    output_path: DestinoPDF,
     pares: list[tuple[str, str]],
-) -> None:
-    """Aplica marca-texto no PDF para vários (termo, cor_hex). Cada termo com sua cor."""
-    pares = [(t.strip(), c) for t, c in pares if t and t.strip()]
-    if not pares:
-        raise ValueError("Nenhum termo informado.")
-    doc = fitz.open(input_path)
-    for pagina in doc:
-        for termo_busca, hex_color in pares:
-            rgb = hex_to_rgb_normalized(hex_color)
-            instancias = pagina.search_for(termo_busca)
-            for inst in instancias:
-                annot = pagina.add_highlight_annot(inst)
-                annot.set_colors(stroke=rgb)
+    workers: int = 1,
+    cache_dir: str | CacheIndices | None = None,
+    save_mode: str = "compact",
+    stats: Estatisticas | None = None,
+    progress=None,
+    cancel=None,
+    coalesce: str = "none",
+    chunk_pages: int | None = None,
+    max_memory_mb: float | None = None,
+    dictionary: bool = False,
+    pages: PaginasPDF = None,
+) -> bytes | None:
+    """Aplica marca-texto no PDF para vários (termo, cor_hex). Cada termo com sua cor.
+
+    input_path: caminho ou PDF em memória (ver FontePDF). output_path: caminho, fluxo binário ou
+    None para retornar os bytes do PDF marcado.
+    workers > 1 faz a busca em paralelo; as marcações são gravadas na ordem das páginas.
+    cache_dir, stats, progress e cancel: ver find_matches; save_mode e coalesce: ver apply_plan.
+    chunk_pages / max_memory_mb limitam a memória na busca e na gravação (exigem save_mode
+    "incremental"); ver find_matches e apply_plan. dictionary e pages (só estas páginas são
+    marcadas): ver find_matches.
+    """
+    limites = {"chunk_pages": chunk_pages, "max_memory_mb": max_memory_mb}
+    plan = find_matches(
+        input_path, pares, workers=workers, cache_dir=cache_dir, stats=stats, progress=progress, cancel=cancel,
+        dictionary=dictionary, pages=pages, **limites,
+    )
+    return apply_plan(
+        plan, output_path, save_mode=save_mode, stats=stats, progress=progress, cancel=cancel, coalesce=coalesce,
+        **limites,
+    )
+
+
+@dataclass
+class DiferencaMarcas:
+    """O que atualizar_pdf_multi mudou no PDF: termos por situação, na ordem de pares.
+
+    ocorrencias: quantas ocorrências (dos termos novos ou marcados de novo) foram anotadas.
+    dados: o PDF atualizado, quando output_path é None.
+    """
+    novos: list[str] = field(default_factory=list)
+    recoloridos: list[str] = field(default_factory=list)
+    removidos: list[str] = field(default_factory=list)
+    mantidos: list[str] = field(default_factory=list)
+    ocorrencias: int = 0
+    dados: bytes | None = None
+
+    @property
+    def mudou(self) -> bool:
+        return bool(self.novos or self.recoloridos or self.removidos)
+
+
+def _cor_hex(rgb) -> str:
+    """Cor normalizada para comparação: #rrggbb, como as cores gravadas nas anotações."""
+    return "#" + "".join(f"{round(c * 255):02x}" for c in rgb)
+
+
+def _termo_da_marca(annot: fitz.Annot) -> str | None:
+    """Termo de uma anotação criada pelo Mark.me; None para as demais."""
+    info = annot.info
+    return info["subject"] if info.get("title") == AUTOR_MARCAS else None
+
+
+def _marcas(doc: fitz.Document) -> dict[str, tuple[set[str], set[int]]]:
+    """Marcas do Mark.me no documento: {termo: (cores, páginas)}.
+
+    Só carrega as páginas que têm anotações (/Annots no dicionário da página).
+    """
+    marcas: dict[str, tuple[set[str], set[int]]] = {}
+    for numero in range(doc.page_count):
+        if doc.xref_get_key(doc.page_xref(numero), "Annots")[0] == "null":
+            continue
+        for annot in doc[numero].annots(types=(fitz.PDF_ANNOT_HIGHLIGHT,)):
+            termo = _termo_da_marca(annot)
+            if termo is not None:
+                cores, paginas = marcas.setdefault(termo, (set(), set()))
+                cores.add(_cor_hex(annot.colors["stroke"] or (1.0, 1.0, 0.0)))
+                paginas.add(numero)
+    return marcas
+
+
+def _alterar_marcas(doc: fitz.Document, paginas: Iterable[int], alterar: dict[str, tuple | None], stats) -> None:
+    """Nas páginas indicadas, remove (None) ou recolore (rgb) as marcas dos termos em alterar."""
+    for numero in sorted(paginas):
+        pagina = doc[numero]
+        remover = []
+        for annot in pagina.annots(types=(fitz.PDF_ANNOT_HIGHLIGHT,)):
+            termo = _termo_da_marca(annot)
+            if termo not in alterar:
+                continue
+            if alterar[termo] is None:
+                remover.append(annot.xref)
+            else:
+                annot.set_colors(stroke=alterar[termo])
                 annot.update()
-    doc.save(output_path, garbage=4, deflate=True, clean=True)
-    doc.close()
+        # Removidas depois de percorrer: apagar durante a iteração invalida a anotação seguinte
+        for xref in remover:
+            pagina.delete_annot(pagina.load_annot(xref))
+        if stats is not None and remover:
+            stats.contar("anotacoes_removidas", len(remover), numero)
+
+
+def atualizar_pdf_multi(
+    input_path: FontePDF,
+    output_path: DestinoPDF,
+    pares: list[tuple[str, str]],
+    workers: int = 1,
+    cache_dir: str | CacheIndices | None = None,
+    save_mode: str = "incremental",
+    stats: Estatisticas | None = None,
+    progress=None,
+    cancel=None,
+    coalesce: str = "none",
+    dictionary: bool = False,
+    pages: PaginasPDF = None,
+    require_marks: bool = False,
+) -> DiferencaMarcas:
+    """Leva um PDF já marcado pelo Mark.me às marcas de pares, refazendo só o que mudou.
+
+    As marcas existentes (anotações com autor AUTOR_MARCAS) são comparadas com pares: só os
+    termos novos são buscados e marcados, os de cor trocada são recoloridos e os que saíram da
+    lista têm as anotações removidas. Anotações de outras origens (ou de versões do Mark.me que
+    não gravavam o termo) não são tocadas. Um termo com várias cores que muda de cores é removido
+    e marcado de novo. Com dictionary, a regra de sobreposição vale entre os termos buscados.
+    save_mode: "incremental" (padrão) acrescenta ao arquivo só as mudanças — com output_path igual
+    à entrada, no próprio arquivo, e sem gravar nada se não houver mudança.
+    require_marks: levanta SemMarcas, sem gravar nada, se o PDF não tiver marcas do Mark.me (ex.:
+    para não regravar no lugar um PDF que nunca foi marcado).
+    Demais parâmetros: ver destacar_pdf_multi. Retorna o que mudou (DiferencaMarcas).
+    """
+    if coalesce not in COALESCE_MODES:
+        raise ValueError(f"coalesce inválido: {coalesce!r} (use {', '.join(COALESCE_MODES)}).")
+    if isinstance(output_path, os.PathLike):
+        output_path = os.fspath(output_path)
+    fonte = _fonte(input_path)
+    pedidas: dict[str, dict[str, str]] = {}  # termo -> {cor normalizada: cor pedida}
+    for termo_busca, hex_color in _normalizar_pares(pares):
+        pedidas.setdefault(termo_busca, {}).setdefault(_cor_hex(hex_to_rgb_normalized(hex_color)), hex_color)
+    copiou = (
+        save_mode == "incremental" and isinstance(fonte, str) and isinstance(output_path, str)
+        and not _mesmo_arquivo(fonte, output_path)
+    )
+    t0 = time.perf_counter() if stats is not None else 0.0
+    doc = _abrir_para_gravar(fonte, output_path, save_mode)
+    if stats is not None:
+        stats.medir("abrir", time.perf_counter() - t0)
+    try:
+        t0 = time.perf_counter() if stats is not None else 0.0
+        existentes = _marcas(doc)
+        if stats is not None:
+            stats.medir("marcas", time.perf_counter() - t0)
+        if require_marks and not existentes:
+            raise SemMarcas("o PDF não tem marcas do Mark.me para atualizar")
+        diferenca = DiferencaMarcas(removidos=[termo for termo in existentes if termo not in pedidas])
+        alterar: dict[str, tuple | None] = dict.fromkeys(diferenca.removidos)
+        buscar: list[str] = []
+        for termo_busca, cores in pedidas.items():
+            if termo_busca not in existentes:
+                diferenca.novos.append(termo_busca)
+                buscar.append(termo_busca)
+                continue
+            atuais = existentes[termo_busca][0]
+            if atuais == set(cores):
+                diferenca.mantidos.append(termo_busca)
+                continue
+            diferenca.recoloridos.append(termo_busca)
+            if len(cores) == 1 and len(atuais) == 1:
+                alterar[termo_busca] = hex_to_rgb_normalized(next(iter(cores.values())))
+            else:
+                alterar[termo_busca] = None
+                buscar.append(termo_busca)
+        if alterar:
+            paginas = set().union(*(existentes[termo][1] for termo in alterar))
+            _alterar_marcas(doc, paginas, alterar, stats)
+        if buscar:
+            plan = find_matches(
+                fonte, [(termo, cor) for termo in buscar for cor in pedidas[termo].values()], workers=workers,
+                cache_dir=cache_dir, stats=stats, progress=progress, cancel=cancel, dictionary=dictionary, pages=pages,
+            )
+            numeros = list(plan.paginas)
+            _anotar(doc, plan, numeros, coalesce, stats, _acompanhador("anotacao", len(numeros), progress, cancel))
+            diferenca.ocorrencias = plan.total
+        if diferenca.mudou or save_mode != "incremental":
+            if progress is not None:
+                progress("gravacao", 0, 1)
+            t0 = time.perf_counter() if stats is not None else 0.0
+            diferenca.dados = _salvar(doc, output_path, save_mode)
+            if stats is not None:
+                stats.medir("gravacao", time.perf_counter() - t0)
+            if progress is not None:
+                progress("gravacao", 1, 1)
+    except BaseException:
+        _desfazer_gravacao(doc, output_path, copiou)
+        raise
+    _fechar(doc)
+    return diferenca
@@ -0,0 +1,139 @@
+"""
+Mark.me - Listas grandes de termos (glossários): leitura do arquivo de termos e busca de todos
+os termos numa única passada pelo texto de cada página (autômato de Aho-Corasick).
+
+A comparação é a mesma da busca normal (ver mark_me.index): sem diferenciar maiúsculas ASCII e
+com espaços em sequência contando como um só. O tempo por página praticamente não depende do
+número de termos.
+
+Regra para ocorrências sobrepostas ou aninhadas: vence a que começa mais à esquerda e, entre as
+que começam no mesmo ponto, a mais longa; o texto coberto por ela não é usado por outros termos.
+Ex.: com "nova york" e "york", em "nova york" só "nova york" é marcado. Termos iguais depois da
+normalização (ex.: "ABC" e "abc") contam como o primeiro da lista.
+"""
+import csv
+from collections import deque
+
+import fitz  # PyMuPDF
+
+try:
+    from mark_me.index import IndicePagina, _canon
+except ImportError:
+    from index import IndicePagina, _canon
+
+COR_PADRAO = "#ffff00"
+_CABECALHOS = {("term", "color"), ("termo", "cor"), ("term",), ("termo",)}
+
+
+def ler_termos(path: str, cor_padrao: str = COR_PADRAO) -> list[tuple[str, str]]:
+    """Lê um CSV de termos (termo[,cor hex]) e retorna [(termo, cor)].
+
+    Linhas vazias são ignoradas; a primeira linha pode ser o cabeçalho term,color (ou termo,cor).
+    Termos com vírgula vão entre aspas. Sem cor, usa cor_padrao.
+    """
+    pares: list[tuple[str, str]] = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for n, linha in enumerate(csv.reader(f)):
+            colunas = [c.strip() for c in linha]
+            if n == 0 and tuple(c.lower() for c in colunas if c) in _CABECALHOS:
+                continue
+            if not colunas or not colunas[0]:
+                continue
+            cor = colunas[1] if len(colunas) > 1 and colunas[1] else cor_padrao
+            if not cor.startswith("#"):
+                cor = "#" + cor
+            pares.append((colunas[0], cor))
+    return pares
+
+
+def _chave(termo: str) -> str:
+    """Forma normalizada do termo: caracteres como a busca compara e espaços simples."""
+    return " ".join("".join(_canon(c) for c in termo).split())
+
+
+class Automato:
+    """Autômato de Aho-Corasick com todos os termos; buscar() percorre cada página uma vez."""
+
+    def __init__(self, termos):
+        self.termos: list[str] = []
+        self._comprimentos: list[int] = []
+        self._proximo: list[dict[str, int]] = [{}]
+        self._termo: list[int] = [-1]  # id do termo que termina no estado, ou -1
+        for termo in termos:
+            chave = _chave(termo)
+            if not chave:
+                continue
+            estado = 0
+            for c in chave:
+                seguinte = self._proximo[estado].get(c)
+                if seguinte is None:
+                    seguinte = len(self._proximo)
+                    self._proximo[estado][c] = seguinte
+                    self._proximo.append({})
+                    self._termo.append(-1)
+                estado = seguinte
+            if self._termo[estado] == -1:
+                self._termo[estado] = len(self.termos)
+                self.termos.append(termo)
+                self._comprimentos.append(len(chave))
+        self._falha, self._saida = self._ligar()
+
+    def _ligar(self) -> tuple[list[int], list[int]]:
+        """Liga cada estado ao maior sufixo próprio (falha) e ao maior sufixo que é termo (saída)."""
+        n = len(self._proximo)
+        falha, saida = [0] * n, [-1] * n
+        fila = deque(self._proximo[0].values())
+        while fila:
+            estado = fila.popleft()
+            for c, filho in self._proximo[estado].items():
+                f = falha[estado]
+                while f and c not in self._proximo[f]:
+                    f = falha[f]
+                destino = self._proximo[f].get(c, 0)
+                falha[filho] = destino
+                saida[filho] = destino if self._termo[destino] != -1 else saida[destino]
+                fila.append(filho)
+        return falha, saida
+
+    def trechos(self, canonico: str) -> dict[int, list[tuple[int, int]]]:
+        """Ocorrências no texto canônico: {id do termo: [(inicio, fim)]}, já com a regra de sobreposição."""
+        proximo, falha, saida, termo_em, comprimentos = (
+            self._proximo, self._falha, self._saida, self._termo, self._comprimentos,
+        )
+        posicoes: list[int] = []  # índice em canonico de cada caractere após juntar os espaços
+        candidatos: list[tuple[int, int, int]] = []  # (inicio, -comprimento, id), no texto juntado
+        estado = 0
+        espaco = False
+        for i, c in enumerate(canonico):
+            if c == " ":
+                if espaco:
+                    continue
+                espaco = True
+            else:
+                espaco = False
+            j = len(posicoes)
+            posicoes.append(i)
+            while estado and c not in proximo[estado]:
+                estado = falha[estado]
+            estado = proximo[estado].get(c, 0)
+            achado = estado if termo_em[estado] != -1 else saida[estado]
+            while achado != -1:
+                k = termo_em[achado]
+                candidatos.append((j - comprimentos[k] + 1, -comprimentos[k], k))
+                achado = saida[achado]
+
+        resultado: dict[int, list[tuple[int, int]]] = {}
+        livre = 0  # primeiro caractere ainda não coberto por uma ocorrência aceita
+        for inicio, menos_comprimento, k in sorted(candidatos):
+            if inicio < livre:
+                continue
+            livre = inicio - menos_comprimento
+            resultado.setdefault(k, []).append((posicoes[inicio], posicoes[livre - 1] + 1))
+        return resultado
+
+    def buscar(self, indice: IndicePagina) -> dict[str, list[fitz.Rect]]:
+        """{termo: [retângulos]} da página, só com os termos encontrados."""
+        return {
+            self.termos[k]: indice.retangulos(trechos)
+            for k, trechos in self.trechos(indice.canonico).items()
+        }
@@ -0,0 +1,541 @@
+"""
+Mark.me - Pasta monitorada com fila de trabalhos durável em SQLite (sem broker externo):
+  mark watch PASTA -t "termo" ...   registra na fila cada PDF novo da pasta (com os termos e opções)
+  mark worker [-j N]                processos que pegam os trabalhos da fila e marcam os PDFs
+  mark status                       pendentes, em andamento, concluídos, vazão e a fila de mortos
+
+A fila é um arquivo SQLite (--db, MARKME_FILA ou markme-fila.db na pasta atual) em modo WAL,
+usado ao mesmo tempo por qualquer número de watchers e workers:
+- O mesmo arquivo (caminho, tamanho e data) com os mesmos termos entra na fila uma vez só.
+- Um worker pega o trabalho numa transação (BEGIN IMMEDIATE), com um prazo que ele renova
+  enquanto processa; se o worker ou a máquina cair, o prazo vence e outro worker retoma.
+- Falhas voltam para a fila com espera crescente até --max-attempts; depois ficam como "dead"
+  (mark status --dead lista, --requeue-dead devolve à fila).
+Vários hosts só podem dividir a fila se o arquivo SQLite estiver num disco local a todos eles
+com travas confiáveis (o SQLite não garante isso em pastas de rede).
+"""
+import argparse
+import contextlib
+import json
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+try:
+    from mark_me.batch import ATUALIZADO, ERRO, OK, SEM_OCORRENCIA, caminho_saida, expandir_entradas
+    from mark_me.cli import pares_dos_argumentos
+    from mark_me.modos import COALESCE_MODES, SAVE_MODES, tipo_paginas
+except ImportError:
+    from batch import ATUALIZADO, ERRO, OK, SEM_OCORRENCIA, caminho_saida, expandir_entradas
+    from cli import pares_dos_argumentos
+    from modos import COALESCE_MODES, SAVE_MODES, tipo_paginas
+
+ENV_FILA = "MARKME_FILA"
+ARQUIVO_FILA = "markme-fila.db"
+
+# Status de um trabalho; os concluídos usam os status do lote (ok, no_match, skipped)
+PENDENTE = "pending"
+EM_ANDAMENTO = "running"
+MORTO = "dead"
+PERDIDO = "lost"  # só no relato do worker: o prazo venceu, outro worker pegou e o resultado foi descartado
+CONCLUIDOS = (OK, SEM_OCORRENCIA, ATUALIZADO)
+
+MAX_TENTATIVAS_PADRAO = 3
+PRAZO_PADRAO = 300.0  # s que um trabalho fica reservado ao worker sem renovação
+ESPERA_FALHA_PADRAO = 30.0  # s antes da 2ª tentativa; dobra a cada falha
+ESPERA_MAXIMA_FALHA = 3600.0
+INTERVALO_PADRAO = 2.0  # s entre varreduras da pasta / consultas de um worker ocioso
+_TEMPO_TRAVA = 30.0  # s esperando outro processo liberar o SQLite
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    id INTEGER PRIMARY KEY,
+    pares TEXT NOT NULL,     -- JSON [[termo, cor], ...]
+    opcoes TEXT NOT NULL,    -- JSON: dictionary, pages, save_mode, coalesce
+    UNIQUE (pares, opcoes)
+);
+CREATE TABLE IF NOT EXISTS trabalhos (
+    id INTEGER PRIMARY KEY,
+    entrada TEXT NOT NULL,
+    saida TEXT NOT NULL,
+    tamanho INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    config INTEGER NOT NULL REFERENCES configs (id),
+    status TEXT NOT NULL DEFAULT 'pending',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    disponivel REAL NOT NULL,  -- pendente: não antes de; em andamento: prazo do worker
+    worker TEXT,
+    erro TEXT,
+    ocorrencias INTEGER,
+    criado REAL NOT NULL,
+    iniciado REAL,
+    concluido REAL,
+    segundos REAL,
+    UNIQUE (entrada, tamanho, mtime, config)
+);
+CREATE INDEX IF NOT EXISTS trabalhos_fila ON trabalhos (status, disponivel);
+CREATE INDEX IF NOT EXISTS trabalhos_concluido ON trabalhos (concluido);
+"""
+
+
+def caminho_fila(caminho: str | None = None) -> str:
+    """Fila a usar: a informada, MARKME_FILA ou markme-fila.db na pasta atual."""
+    return os.path.abspath(caminho or os.environ.get(ENV_FILA) or ARQUIVO_FILA)
+
+
+@dataclass
+class Trabalho:
+    """Um trabalho reservado por um worker (ver FilaTrabalhos.pegar)."""
+    id: int
+    entrada: str
+    saida: str
+    pares: list[tuple[str, str]]
+    opcoes: dict
+    tentativas: int
+    worker: str
+
+
+class FilaTrabalhos:
+    """Acesso à fila SQLite. Uma instância por processo/thread (conexões SQLite não são divididas)."""
+
+    def __init__(self, caminho: str | None = None):
+        self.caminho = caminho_fila(caminho)
+        self._con = sqlite3.connect(self.caminho, timeout=_TEMPO_TRAVA, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.executescript(_ESQUEMA)
+
+    def close(self) -> None:
+        self._con.close()
+
+    def __enter__(self) -> "FilaTrabalhos":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @contextlib.contextmanager
+    def _transacao(self):
+        # BEGIN IMMEDIATE: a trava de escrita é pega já no início, então dois workers nunca
+        # leem o mesmo trabalho como livre
+        self._con.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._con
+        except BaseException:
+            self._con.execute("ROLLBACK")
+            raise
+        self._con.execute("COMMIT")
+
+    def config(self, pares: list[tuple[str, str]], opcoes: dict) -> int:
+        """Id da configuração (termos e opções), criando-a se for nova."""
+        chave = (json.dumps([list(par) for par in pares], ensure_ascii=False), json.dumps(opcoes, sort_keys=True))
+        with self._transacao() as con:
+            con.execute("INSERT OR IGNORE INTO configs (pares, opcoes) VALUES (?, ?)", chave)
+            return con.execute("SELECT id FROM configs WHERE pares = ? AND opcoes = ?", chave).fetchone()[0]
+
+    def enfileirar(self, entrada: str, saida: str, tamanho: int, mtime: float, config: int) -> bool:
+        """Registra o arquivo; False se essa versão dele já estava na fila com essa configuração."""
+        agora = time.time()
+        with self._transacao() as con:
+            cursor = con.execute(
+                "INSERT OR IGNORE INTO trabalhos (entrada, saida, tamanho, mtime, config, disponivel, criado) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entrada, saida, tamanho, mtime, config, agora, agora),
+            )
+        return cursor.rowcount == 1
+
+    def pegar(self, worker: str, prazo: float = PRAZO_PADRAO, max_tentativas: int = MAX_TENTATIVAS_PADRAO) -> Trabalho | None:
+        """Reserva o trabalho disponível mais antigo para worker por prazo segundos (None: fila vazia).
+
+        Um trabalho em andamento cujo prazo venceu (worker caiu) conta como disponível; se ele já
+        gastou as max_tentativas, vai para os mortos.
+        """
+        agora = time.time()
+        with self._transacao() as con:
+            con.execute(
+                "UPDATE trabalhos SET status = ?, erro = 'prazo do worker ' || worker || ' venceu', concluido = ? "
+                "WHERE status = ? AND disponivel <= ? AND tentativas >= ?",
+                (MORTO, agora, EM_ANDAMENTO, agora, max_tentativas),
+            )
+            linha = con.execute(
+                "SELECT t.id, t.entrada, t.saida, c.pares, c.opcoes, t.tentativas FROM trabalhos t "
+                "JOIN configs c ON c.id = t.config WHERE t.status IN (?, ?) AND t.disponivel <= ? "
+                "ORDER BY t.status = ? DESC, t.id LIMIT 1",
+                (PENDENTE, EM_ANDAMENTO, agora, EM_ANDAMENTO),
+            ).fetchone()
+            if linha is None:
+                return None
+            id_, entrada, saida, pares, opcoes, tentativas = linha
+            con.execute(
+                "UPDATE trabalhos SET status = ?, tentativas = ?, disponivel = ?, worker = ?, iniciado = ? WHERE id = ?",
+                (EM_ANDAMENTO, tentativas + 1, agora + prazo, worker, agora, id_),
+            )
+        return Trabalho(
+            id=id_, entrada=entrada, saida=saida, pares=[tuple(par) for par in json.loads(pares)],
+            opcoes=json.loads(opcoes), tentativas=tentativas + 1, worker=worker,
+        )
+
+    def renovar(self, trabalho: Trabalho, prazo: float = PRAZO_PADRAO) -> bool:
+        """Estende o prazo; False se o trabalho não é mais deste worker (prazo venceu e outro pegou)."""
+        with self._transacao() as con:
+            cursor = con.execute(
+                "UPDATE trabalhos SET disponivel = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time() + prazo, trabalho.id, trabalho.worker, EM_ANDAMENTO),
+            )
+        return cursor.rowcount == 1
+
+    def concluir(self, trabalho: Trabalho, status: str, ocorrencias: int = 0, segundos: float = 0.0) -> bool:
+        """Marca o trabalho como concluído (status: ok, no_match ou skipped); False se ele não é
+        mais deste worker."""
+        with self._transacao() as con:
+            cursor = con.execute(
+                "UPDATE trabalhos SET status = ?, ocorrencias = ?, segundos = ?, concluido = ?, erro = NULL "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (status, ocorrencias, segundos, time.time(), trabalho.id, trabalho.worker, EM_ANDAMENTO),
+            )
+        return cursor.rowcount == 1
+
+    def falhar(
+        self,
+        trabalho: Trabalho,
+        erro: str,
+        max_tentativas: int = MAX_TENTATIVAS_PADRAO,
+        espera: float = ESPERA_FALHA_PADRAO,
+        segundos: float = 0.0,
+    ) -> str | None:
+        """Devolve o trabalho à fila após espera * 2^(tentativas - 1) s, ou o manda para os mortos
+        se já foram max_tentativas. Retorna o novo status (None: o trabalho não é mais deste worker)."""
+        agora = time.time()
+        if trabalho.tentativas >= max_tentativas:
+            status, disponivel, concluido = MORTO, agora, agora
+        else:
+            atraso = min(espera * 2 ** (trabalho.tentativas - 1), ESPERA_MAXIMA_FALHA)
+            status, disponivel, concluido = PENDENTE, agora + atraso, None
+        with self._transacao() as con:
+            cursor = con.execute(
+                "UPDATE trabalhos SET status = ?, disponivel = ?, concluido = ?, erro = ?, segundos = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (status, disponivel, concluido, erro, segundos, trabalho.id, trabalho.worker, EM_ANDAMENTO),
+            )
+        return status if cursor.rowcount == 1 else None
+
+    def devolver_mortos(self) -> int:
+        """Devolve à fila os trabalhos mortos, com as tentativas zeradas; retorna quantos."""
+        with self._transacao() as con:
+            cursor = con.execute(
+                "UPDATE trabalhos SET status = ?, tentativas = 0, disponivel = ?, concluido = NULL WHERE status = ?",
+                (PENDENTE, time.time(), MORTO),
+            )
+        return cursor.rowcount
+
+    def situacao(self, janela: float = 3600.0, mortos: int = 0) -> dict:
+        """Backlog e vazão: trabalhos por status, idade do pendente mais antigo, concluídos e tempo
+        médio de processamento nos últimos janela segundos; mortos > 0 lista os últimos mortos."""
+        agora = time.time()
+        con = self._con
+        por_status = dict(con.execute("SELECT status, COUNT(*) FROM trabalhos GROUP BY status"))
+        (mais_antigo,) = con.execute("SELECT MIN(criado) FROM trabalhos WHERE status = ?", (PENDENTE,)).fetchone()
+        marcadores = ", ".join("?" * len(CONCLUIDOS))
+        concluidos, media, ocorrencias = con.execute(
+            f"SELECT COUNT(*), AVG(segundos), SUM(ocorrencias) FROM trabalhos "
+            f"WHERE status IN ({marcadores}) AND concluido >= ?",
+            (*CONCLUIDOS, agora - janela),
+        ).fetchone()
+        dados = {
+            "fila": self.caminho,
+            "por_status": por_status,
+            "backlog": por_status.get(PENDENTE, 0) + por_status.get(EM_ANDAMENTO, 0),
+            "pendente_mais_antigo_s": round(agora - mais_antigo, 1) if mais_antigo else None,
+            "janela_s": janela,
+            "concluidos_na_janela": concluidos,
+            "por_minuto": round(concluidos * 60 / janela, 2),
+            "segundos_medio": round(media, 4) if media is not None else None,
+            "ocorrencias_na_janela": ocorrencias or 0,
+        }
+        if mortos:
+            dados["mortos"] = [
+                {"entrada": entrada, "tentativas": tentativas, "erro": erro}
+                for entrada, tentativas, erro in con.execute(
+                    "SELECT entrada, tentativas, erro FROM trabalhos WHERE status = ? ORDER BY concluido DESC LIMIT ?",
+                    (MORTO, mortos),
+                )
+            ]
+        return dados
+
+
+# --- Worker ------------------------------------------------------------------
+
+class _Renovacao(threading.Thread):
+    """Renova o prazo do trabalho (conexão própria) enquanto o worker processa o PDF; perdido fica
+    ligado se o trabalho deixou de ser deste worker (prazo venceu e outro pegou)."""
+
+    def __init__(self, caminho: str, trabalho: Trabalho, prazo: float):
+        super().__init__(daemon=True)
+        self._caminho = caminho
+        self._trabalho = trabalho
+        self._prazo = prazo
+        self._fim = threading.Event()
+        self.perdido = threading.Event()
+
+    def run(self) -> None:
+        with FilaTrabalhos(self._caminho) as fila:
+            while not self._fim.wait(self._prazo / 3):
+                if not fila.renovar(self._trabalho, self._prazo):
+                    self.perdido.set()
+                    return
+
+    def __enter__(self) -> "_Renovacao":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._fim.set()
+        self.join()
+
+
+def trabalhar(
+    caminho: str | None = None,
+    parar: threading.Event | None = None,
+    max_tentativas: int = MAX_TENTATIVAS_PADRAO,
+    prazo: float = PRAZO_PADRAO,
+    espera_falha: float = ESPERA_FALHA_PADRAO,
+    intervalo: float = INTERVALO_PADRAO,
+    uma_vez: bool = False,
+    ao_concluir=None,
+) -> int:
+    """Loop de um worker: pega um trabalho, marca o PDF (batch.processar_arquivo), registra o
+    resultado e repete até parar.is_set() (ou, com uma_vez, até a fila não ter trabalho
+    disponível). ao_concluir(trabalho, status, resultado) a cada trabalho. Retorna quantos fez.
+
+    Se o trabalho deixar de ser deste worker no meio (prazo vencido e retomado por outro), o
+    processamento é cancelado e o resultado descartado (status PERDIDO, não gravado na fila).
+    """
+    try:
+        from mark_me.batch import processar_arquivo
+    except ImportError:
+        from batch import processar_arquivo
+
+    parar = parar or threading.Event()
+    nome = f"{socket.gethostname()}:{os.getpid()}"
+    feitos = 0
+    with FilaTrabalhos(caminho) as fila:
+        while not parar.is_set():
+            trabalho = fila.pegar(nome, prazo, max_tentativas)
+            if trabalho is None:
+                if uma_vez:
+                    break
+                parar.wait(intervalo)
+                continue
+            opcoes = trabalho.opcoes
+            # A saída já gerada com esta configuração é pulada (batch.saida_atualizada compara a
+            # assinatura); com outros termos ou opções, o PDF é marcado de novo
+            with _Renovacao(fila.caminho, trabalho, prazo) as renovacao:
+                resultado = processar_arquivo(
+                    trabalho.entrada, trabalho.saida, trabalho.pares,
+                    opcoes_gravacao={"save_mode": opcoes["save_mode"], "coalesce": opcoes["coalesce"]},
+                    dicionario=opcoes["dictionary"], paginas=opcoes["pages"], cancel=renovacao.perdido,
+                )
+            if renovacao.perdido.is_set():
+                status = PERDIDO
+            elif resultado.status == ERRO:
+                status = fila.falhar(trabalho, resultado.erro, max_tentativas, espera_falha, resultado.segundos) or PERDIDO
+            elif fila.concluir(trabalho, resultado.status, resultado.ocorrencias, resultado.segundos):
+                status = resultado.status
+            else:
+                status = PERDIDO
+            if status != PERDIDO:
+                feitos += 1
+            if ao_concluir:
+                ao_concluir(trabalho, status, resultado)
+    return feitos
+
+
+def _relatar_trabalho(trabalho: Trabalho, status: str, resultado) -> None:
+    if status in CONCLUIDOS:
+        print(f"[{status}] {trabalho.entrada} ({resultado.ocorrencias} ocorrências, {resultado.segundos:.2f}s)", flush=True)
+    elif status == PERDIDO:
+        print(f"[{status}] {trabalho.entrada}: prazo vencido e trabalho retomado por outro worker; resultado descartado",
+              file=sys.stderr, flush=True)
+    else:
+        print(f"[{status}] {trabalho.entrada} (tentativa {trabalho.tentativas}): {resultado.erro}", file=sys.stderr, flush=True)
+
+
+def _trabalhar_em_processo(caminho: str, parar, opcoes: dict) -> None:
+    # Ctrl+C chega a todo o grupo de processos: quem decide parar é o processo principal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    trabalhar(caminho, parar, ao_concluir=_relatar_trabalho, **opcoes)
+
+
+# --- Linha de comando ----------------------------------------------------------
+
+def _argumento_fila(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--db", metavar="ARQUIVO", help=f"Arquivo SQLite da fila (padrão: {ENV_FILA} ou ./{ARQUIVO_FILA})")
+
+
+def _ao_sinal(parar: threading.Event) -> None:
+    def parar_agora(*_):
+        parar.set()
+    signal.signal(signal.SIGTERM, parar_agora)
+    signal.signal(signal.SIGINT, parar_agora)
+
+
+def main_watch(argv: list[str] | None = None) -> int:
+    """mark watch: registra na fila os PDFs que aparecem na pasta, até Ctrl+C / SIGTERM."""
+    parser = argparse.ArgumentParser(
+        prog="mark watch",
+        description="Monitora uma pasta e registra cada PDF novo na fila do Mark.me (processado por mark worker).",
+    )
+    parser.add_argument("pasta", metavar="PASTA")
+    parser.add_argument("-t", "--term", action="append", default=None, metavar="TERMO", help="Termo a destacar (pode repetir)")
+    parser.add_argument("-c", "--color", action="append", default=None, metavar="HEX", help="Cor em hex por termo")
+    parser.add_argument("--terms-file", metavar="ARQUIVO", help="CSV com um termo por linha e cor opcional (termo,#hex)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Incluir subpastas")
+    parser.add_argument("--output-dir", metavar="MODELO", help="Pasta de saída; aceita {dir} e {reldir} (como no lote)")
+    parser.add_argument("--pages", type=tipo_paginas, default=None, metavar="INTERVALOS", help="Só estas páginas (ex: 1-20,45)")
+    parser.add_argument("--save-mode", choices=SAVE_MODES, default="compact")
+    parser.add_argument("--coalesce", choices=COALESCE_MODES, default="none")
+    parser.add_argument(
+        "--interval", type=float, default=INTERVALO_PADRAO, metavar="S",
+        help="Segundos entre varreduras; um arquivo entra na fila quando não muda entre duas varreduras",
+    )
+    parser.add_argument("--once", action="store_true", help="Registrar os PDFs já presentes e sair (sem esperar estabilizarem)")
+    _argumento_fila(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.pasta):
+        print(f"Erro: pasta não encontrada: {args.pasta}", file=sys.stderr)
+        return 1
+    pares = pares_dos_argumentos(args)
+    if pares is None:
+        return 1
+    opcoes = {
+        "dictionary": bool(args.terms_file), "pages": args.pages, "save_mode": args.save_mode, "coalesce": args.coalesce,
+    }
+
+    parar = threading.Event()
+    _ao_sinal(parar)
+    with FilaTrabalhos(args.db) as fila:
+        config = fila.config(pares, opcoes)
+        print(f"Monitorando {os.path.abspath(args.pasta)} -> fila {fila.caminho} (Ctrl+C para parar)", file=sys.stderr)
+        anteriores: dict[str, tuple[int, float]] = {}
+        # Última versão (tamanho, data) já registrada de cada arquivo presente; só evita consultas
+        # repetidas ao SQLite, que é quem garante que a mesma versão entra na fila uma vez só
+        registrados: dict[str, tuple[int, float]] = {}
+        while True:
+            atuais = {}
+            for entrada, raiz in expandir_entradas([args.pasta], recursivo=args.recursive):
+                try:
+                    info = os.stat(entrada)
+                except OSError:
+                    continue  # removido durante a varredura
+                versao = atuais[entrada] = (info.st_size, info.st_mtime)
+                # Arquivo ainda sendo copiado muda entre as varreduras: espera estabilizar
+                pronto = args.once or anteriores.get(entrada) == versao
+                if pronto and registrados.get(entrada) != versao:
+                    registrados[entrada] = versao
+                    saida = caminho_saida(entrada, raiz, args.output_dir)
+                    if fila.enfileirar(entrada, saida, *versao, config):
+                        print(f"[{PENDENTE}] {entrada}", flush=True)
+            anteriores = atuais
+            # Arquivos que saíram da pasta (ex.: caixa de entrada de scanner) não ficam na memória
+            registrados = {entrada: versao for entrada, versao in registrados.items() if entrada in atuais}
+            if args.once or parar.wait(args.interval):
+                break
+    return 0
+
+
+def main_worker(argv: list[str] | None = None) -> int:
+    """mark worker: processa os trabalhos da fila até Ctrl+C / SIGTERM (ou, com --once, até esvaziar)."""
+    parser = argparse.ArgumentParser(prog="mark worker", description="Processa os PDFs registrados na fila do Mark.me.")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N", help="Processos de trabalho (0 = todos os núcleos)")
+    parser.add_argument(
+        "--max-attempts", type=int, default=MAX_TENTATIVAS_PADRAO, metavar="N",
+        help="Tentativas por arquivo antes de ir para os mortos (dead)",
+    )
+    parser.add_argument(
+        "--retry-delay", type=float, default=ESPERA_FALHA_PADRAO, metavar="S",
+        help="Espera antes da 2ª tentativa; dobra a cada falha",
+    )
+    parser.add_argument(
+        "--lease", type=float, default=PRAZO_PADRAO, metavar="S",
+        help="Prazo da reserva de um trabalho, renovado enquanto ele roda; vencido, outro worker retoma",
+    )
+    parser.add_argument("--poll", type=float, default=INTERVALO_PADRAO, metavar="S", help="Espera com a fila vazia")
+    parser.add_argument("--once", action="store_true", help="Sair quando não houver trabalho disponível")
+    _argumento_fila(parser)
+    args = parser.parse_args(argv)
+
+    opcoes = {
+        "max_tentativas": max(1, args.max_attempts),
+        "prazo": max(1.0, args.lease),
+        "espera_falha": args.retry_delay,
+        "intervalo": args.poll,
+        "uma_vez": args.once,
+    }
+    caminho = caminho_fila(args.db)
+    FilaTrabalhos(caminho).close()  # cria a fila e o esquema antes dos processos
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if jobs == 1:
+        parar = threading.Event()
+        _ao_sinal(parar)
+        trabalhar(caminho, parar, ao_concluir=_relatar_trabalho, **opcoes)
+        return 0
+
+    import multiprocessing
+    ctx = multiprocessing.get_context("spawn")
+    parar = ctx.Event()
+    processos = [ctx.Process(target=_trabalhar_em_processo, args=(caminho, parar, opcoes)) for _ in range(jobs)]
+    for processo in processos:
+        processo.start()
+    _ao_sinal(parar)
+    print(f"{jobs} workers na fila {caminho} (Ctrl+C para parar depois dos arquivos em andamento)", file=sys.stderr)
+    for processo in processos:
+        while processo.is_alive():
+            processo.join(0.5)
+    return 1 if any(processo.exitcode for processo in processos) else 0
+
+
+def main_status(argv: list[str] | None = None) -> int:
+    """mark status: backlog e vazão da fila."""
+    parser = argparse.ArgumentParser(prog="mark status", description="Situação da fila do Mark.me: backlog, vazão e mortos.")
+    parser.add_argument("--window", type=float, default=3600.0, metavar="S", help="Janela da vazão em segundos (padrão: 1 h)")
+    parser.add_argument("--dead", type=int, nargs="?", const=20, default=0, metavar="N", help="Listar os N últimos mortos")
+    parser.add_argument("--requeue-dead", action="store_true", help="Devolver os mortos à fila, com as tentativas zeradas")
+    parser.add_argument("--json", action="store_true", help="Situação em JSON na saída padrão")
+    _argumento_fila(parser)
+    args = parser.parse_args(argv)
+
+    caminho = caminho_fila(args.db)
+    if not os.path.isfile(caminho):
+        print(f"Erro: fila não encontrada: {caminho}", file=sys.stderr)
+        return 1
+    with FilaTrabalhos(caminho) as fila:
+        if args.requeue_dead:
+            print(f"{fila.devolver_mortos()} trabalhos mortos devolvidos à fila", file=sys.stderr)
+        dados = fila.situacao(max(args.window, 1.0), args.dead)
+    if args.json:
+        print(json.dumps(dados, ensure_ascii=False, indent=2))
+        return 0
+    por_status = dados["por_status"]
+    antigo = dados["pendente_mais_antigo_s"]
+    print(f"Fila: {dados['fila']}")
+    print(
+        f"  backlog: {dados['backlog']} ({por_status.get(PENDENTE, 0)} pendentes, "
+        f"{por_status.get(EM_ANDAMENTO, 0)} em andamento)" + (f"; mais antigo há {antigo:.0f}s" if antigo else "")
+    )
+    concluidos = ", ".join(f"{por_status[s]} {s}" for s in CONCLUIDOS if por_status.get(s))
+    print(f"  concluídos: {sum(por_status.get(s, 0) for s in CONCLUIDOS)}" + (f" ({concluidos})" if concluidos else ""))
+    print(f"  mortos: {por_status.get(MORTO, 0)}")
+    media = dados["segundos_medio"]
+    print(
+        f"  últimos {dados['janela_s']:.0f}s: {dados['concluidos_na_janela']} arquivos ({dados['por_minuto']}/min)"
+        + (f", {media:.2f}s por arquivo" if media is not None else "")
+    )
+    for morto in dados.get("mortos", []):
+        print(f"  [{MORTO}] {morto['entrada']} ({morto['tentativas']} tentativas): {morto['erro']}")
+    return 0
@@ -1,11 +1,16 @@
 """
 Mark.me - Interface gráfica (Tkinter).
 """
+import multiprocessing
 import os
+import queue
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import accumulate
 import tkinter as tk
-from tkinter import filedialog, messagebox, colorchooser
+from tkinter import filedialog, messagebox, colorchooser, ttk
 
-from mark_me.core import contar_ocorrencias_multi, destacar_pdf_multi
 from mark_me.i18n import t, set_lang, get_lang
 
 
@@ -16,9 +21,18 @@ BORDER = "#2a2a30"
 TEXT = "#e4e4e7"
 TEXT_MUTED = "#71717a"
 BTN_BG = "#000000"
+ZERO = "#f87171"  # contagem zero ao lado do termo
 
 CORES_PADRAO = ("#ffff00", "#00ff00", "#00bfff", "#ff69b4", "#ffa500")
 
+# Espera após a última tecla antes de contar as ocorrências dos termos
+CONTAGEM_ESPERA_MS = 250
+# Memória máxima das páginas renderizadas guardadas pela pré-visualização
+CACHE_PREVIA_MB = 96
+
+# Pedidos ao processo do documento (ver _documento_em_processo)
+PEDIDOS_DOCUMENTO = ("indexar", "contar", "plano", "renderizar")
+
 # (display name, locale code) for language switcher
 LANGUAGES = [
     ("English", "en"),
@@ -41,6 +55,458 @@ def _make_btn(parent, text, command, padx=14, pady=8, font=("Helvetica", 10), bo
     return f
 
 
+def _executar_em_processo(fila, cancelar, funcao, args) -> None:
+    """Alvo do processo de trabalho: roda funcao(*args) do core e devolve tudo pela fila.
+
+    Mensagens: ("progresso", fase, feitas, total) (ver core.executar_com_progresso), depois uma
+    final ("ok", resultado), ("cancelado", None) ou ("erro", mensagem).
+    """
+    from mark_me.core import Cancelado, executar_com_progresso
+
+    try:
+        fila.put(("ok", executar_com_progresso(funcao, args, {}, cancelar, fila)))
+    except Cancelado:
+        fila.put(("cancelado", None))
+    except Exception as e:
+        fila.put(("erro", str(e)))
+
+
+class _TarefaEmProcesso:
+    """Roda uma função do core em outro processo (o Tk e o MuPDF não dividem a thread principal).
+
+    ao_progresso(fase, feitas, total) e ao_terminar(status, valor) são chamados na thread do Tk.
+    """
+    INTERVALO_MS = 50
+
+    def __init__(self, root: tk.Tk, funcao, args: tuple, ao_progresso, ao_terminar):
+        ctx = multiprocessing.get_context("spawn")
+        self._root = root
+        self._fila = ctx.Queue()
+        self._cancelar = ctx.Event()
+        self._ao_progresso = ao_progresso
+        self._ao_terminar = ao_terminar
+        self._prazo_cancelamento: float | None = None
+        self._proc = ctx.Process(target=_executar_em_processo, args=(self._fila, self._cancelar, funcao, args), daemon=True)
+        self._proc.start()
+        self._root.after(self.INTERVALO_MS, self._verificar)
+
+    def cancelar(self) -> None:
+        """Pede o cancelamento (o core para na próxima página); encerra o processo se demorar."""
+        self._cancelar.set()
+        self._prazo_cancelamento = time.monotonic() + 3.0
+
+    def encerrar(self) -> None:
+        """Encerra o processo imediatamente (ex.: janela fechada)."""
+        if self._proc.is_alive():
+            self._proc.terminate()
+
+    def _drenar(self) -> bool:
+        """Repassa as mensagens já na fila; True se chegou a final (e ao_terminar foi chamado)."""
+        try:
+            while True:
+                msg = self._fila.get_nowait()
+                if msg[0] == "progresso":
+                    self._ao_progresso(*msg[1:])
+                else:
+                    self._proc.join()
+                    self._ao_terminar(*msg)
+                    return True
+        except queue.Empty:
+            return False
+
+    def _verificar(self) -> None:
+        if self._drenar():
+            return
+        if not self._proc.is_alive():
+            # A mensagem final pode ter chegado entre a leitura acima e a saída do processo
+            if not self._drenar():
+                self._ao_terminar("erro", f"exit code {self._proc.exitcode}")
+            return
+        if self._prazo_cancelamento is not None and time.monotonic() > self._prazo_cancelamento:
+            self._proc.terminate()
+            self._proc.join()
+            self._ao_terminar("cancelado", None)
+            return
+        self._root.after(self.INTERVALO_MS, self._verificar)
+
+
+class _Versao:
+    """cancel= do core para um pedido: acionado quando chega um pedido mais novo do mesmo tipo."""
+
+    def __init__(self, contador, versao: int):
+        self._contador = contador
+        self._versao = versao
+
+    def is_set(self) -> bool:
+        return self._contador.value != self._versao
+
+
+def _documento_em_processo(pedidos, respostas, versoes) -> None:
+    """Alvo do processo do documento: indexa o PDF escolhido uma vez e responde às consultas sobre ele.
+
+    Pedidos (tipo, versão, dado); None encerra:
+      ("indexar", v, caminho)             -> [(largura, altura)] de cada página
+      ("contar", v, termos)               -> {termo: total}
+      ("plano", v, pares)                 -> {página: ocorrências} das marcações pendentes
+      ("renderizar", v, [(página, zoom)]) -> None, depois de um ("imagem", v, (página, zoom,
+                                             versão do plano, ppm)) por página
+    Cada pedido tem uma resposta (tipo, versão, valor); ("cancelado", versão, None) se ficou velho
+    (chegou outro do mesmo tipo) antes ou durante o trabalho; ou ("erro", versão, (tipo, mensagem)).
+    """
+    import fitz
+
+    from mark_me.core import Cancelado, contar_nos_indices, indexar_pdf, plano_nos_indices, renderizar_pagina
+
+    indices, doc, plan, versao_plano = [], None, None, 0
+    for tipo, versao, dado in iter(pedidos.get, None):
+        cancel = _Versao(versoes[tipo], versao)
+        try:
+            if cancel.is_set():
+                raise Cancelado()
+            if tipo == "indexar":
+                # Libera o documento anterior antes de montar o novo
+                indices, plan = [], None
+                if doc is not None:
+                    doc.close()
+                    doc = None
+                indices = indexar_pdf(dado, cancel=cancel)
+                # Texto normalizado já montado: a primeira contagem não paga esse custo
+                for indice in indices:
+                    indice.canonico
+                doc = fitz.open(dado)
+                valor = [(pagina.rect.width, pagina.rect.height) for pagina in doc]
+            elif tipo == "contar":
+                valor = contar_nos_indices(indices, dado, cancel=cancel)
+            elif tipo == "plano":
+                plan = plano_nos_indices(doc.name, indices, dado, cancel=cancel)
+                versao_plano = versao
+                valor = plan.ocorrencias.por_pagina()
+            else:
+                for numero, zoom in dado:
+                    if cancel.is_set():
+                        raise Cancelado()
+                    ppm = renderizar_pagina(doc, plan, numero, zoom)
+                    respostas.put(("imagem", versao, (numero, zoom, versao_plano, ppm)))
+                valor = None
+            respostas.put((tipo, versao, valor))
+        except Cancelado:
+            respostas.put(("cancelado", versao, None))
+        except Exception as e:
+            respostas.put(("erro", versao, (tipo, str(e))))
+
+
+class _ProcessoDocumento:
+    """Processo que mantém o PDF escolhido aberto e indexado, para as consultas rápidas da GUI
+    (contagens ao digitar, pré-visualização); ver _documento_em_processo.
+
+    Só a resposta do pedido mais recente de cada tipo chega a ao_responder(tipo, versão, valor),
+    na thread do Tk; os antigos são abandonados no processo, mesmo no meio do trabalho.
+    ao_imagem(página, zoom, versão do plano, ppm) recebe as páginas renderizadas e
+    ao_errar(tipo, mensagem), as falhas (tipo do pedido; None se o processo morreu).
+    """
+    INTERVALO_MS = 50
+
+    def __init__(self, root: tk.Tk, ao_responder, ao_imagem, ao_errar):
+        ctx = multiprocessing.get_context("spawn")
+        self._root = root
+        self._pedidos = ctx.Queue()
+        self._respostas = ctx.Queue()
+        self._versoes = {tipo: ctx.Value("i", 0, lock=False) for tipo in PEDIDOS_DOCUMENTO}
+        self._ao_responder = ao_responder
+        self._ao_imagem = ao_imagem
+        self._ao_errar = ao_errar
+        self._pendentes = 0
+        self._proc = ctx.Process(
+            target=_documento_em_processo, args=(self._pedidos, self._respostas, self._versoes), daemon=True,
+        )
+        self._proc.start()
+
+    def pedir(self, tipo: str, dado) -> None:
+        """Envia um pedido; "indexar" troca o documento e cancela os pedidos em andamento de todos os tipos."""
+        for velho in PEDIDOS_DOCUMENTO if tipo == "indexar" else (tipo,):
+            self._versoes[velho].value += 1
+        self._pedidos.put((tipo, self._versoes[tipo].value, dado))
+        self._pendentes += 1
+        if self._pendentes == 1:
+            self._root.after(self.INTERVALO_MS, self._verificar)
+
+    @property
+    def ativo(self) -> bool:
+        return self._proc.is_alive()
+
+    def encerrar(self) -> None:
+        if self._proc.is_alive():
+            self._proc.terminate()
+
+    def _drenar(self) -> None:
+        try:
+            while True:
+                tipo, versao, valor = self._respostas.get_nowait()
+                if tipo == "imagem":
+                    self._ao_imagem(*valor)
+                    continue
+                self._pendentes -= 1
+                if tipo == "erro":
+                    self._ao_errar(*valor)
+                elif tipo in self._versoes and versao == self._versoes[tipo].value:
+                    self._ao_responder(tipo, versao, valor)
+        except queue.Empty:
+            pass
+
+    def _verificar(self) -> None:
+        self._drenar()
+        if self._pendentes and not self._proc.is_alive():
+            # Respostas enviadas entre a leitura acima e a saída do processo ainda estão na fila
+            self._drenar()
+            if self._pendentes:
+                self._pendentes = 0
+                self._ao_errar(None, f"exit code {self._proc.exitcode}")
+            return
+        if self._pendentes:
+            self._root.after(self.INTERVALO_MS, self._verificar)
+
+
+class _LRUImagens:
+    """Imagens (tk.PhotoImage) por chave até max_bytes (4 bytes por pixel): guardar descarta as
+    usadas há mais tempo, avisando ao_descartar(chave)."""
+
+    def __init__(self, max_bytes: int, ao_descartar=None):
+        self.max_bytes = max_bytes
+        self._itens: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._ao_descartar = ao_descartar
+
+    def obter(self, chave):
+        imagem = self._itens.get(chave)
+        if imagem is not None:
+            self._itens.move_to_end(chave)
+        return imagem
+
+    def guardar(self, chave, imagem) -> None:
+        if chave in self._itens:
+            self._remover(chave)
+        self._itens[chave] = imagem
+        self._bytes += self._tamanho(imagem)
+        while self._bytes > self.max_bytes and len(self._itens) > 1:
+            self._remover(next(iter(self._itens)))
+
+    def limpar(self) -> None:
+        for chave in list(self._itens):
+            self._remover(chave)
+
+    def _remover(self, chave) -> None:
+        self._bytes -= self._tamanho(self._itens.pop(chave))
+        if self._ao_descartar is not None:
+            self._ao_descartar(chave)
+
+    @staticmethod
+    def _tamanho(imagem) -> int:
+        return imagem.width() * imagem.height() * 4
+
+
+class _PreVisualizacao:
+    """Janela com as páginas do PDF e as marcações pendentes desenhadas, mais uma faixa com as
+    miniaturas das páginas que têm ocorrência (clique para ir até a página).
+
+    Só as páginas visíveis (e uma vizinha de cada lado) são pedidas ao processo do documento, no
+    zoom atual; as imagens ficam num LRU limitado por memória e são reaproveitadas ao rolar.
+    pedir_paginas([(página, zoom)]) faz o pedido; ao_fechar() avisa que a janela foi fechada.
+    """
+    ZOOMS = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0)
+    ZOOM_MINIATURA = 0.15
+    MARGEM = 8  # px em volta das páginas
+    ESPERA_MS = 30  # junta os eventos de rolagem antes de pedir as páginas visíveis
+
+    def __init__(self, root: tk.Tk, pedir_paginas, ao_fechar):
+        self._pedir_paginas = pedir_paginas
+        self._ao_fechar = ao_fechar
+        self._imagens = _LRUImagens(CACHE_PREVIA_MB * 1024 * 1024, self._descartada)
+        self._itens: dict[tuple[int, float], tuple[tk.Canvas, int]] = {}  # chave da imagem -> item desenhado
+        self._pedidas: set[tuple[int, float]] = set()
+        self._tamanhos: list[tuple[float, float]] = []
+        self._com_ocorrencia: list[int] = []
+        self._versao_plano: int | None = None
+        self._zoom = 1.0
+        self._topos: list[float] = [self.MARGEM]  # y de cada página (e o fim) no zoom atual
+        self._esquerdas: list[float] = [self.MARGEM]  # x de cada miniatura (e o fim)
+        self._agendado: str | None = None
+        self._info: tuple = ("preview.waiting", {})
+
+        self.janela = tk.Toplevel(root)
+        self.janela.geometry("760x900")
+        self.janela.configure(bg=BG)
+        self.janela.protocol("WM_DELETE_WINDOW", self.fechar)
+        barra = tk.Frame(self.janela, bg=BG)
+        barra.grid(row=0, column=0, columnspan=2, sticky="ew", padx=8, pady=6)
+        _make_btn(barra, "−", lambda: self._mudar_zoom(-1), padx=10, pady=4).pack(side="left")
+        self._zoom_var = tk.StringVar()
+        tk.Label(barra, textvariable=self._zoom_var, width=6, fg=TEXT, bg=BG, font=("Helvetica", 10)).pack(side="left")
+        _make_btn(barra, "+", lambda: self._mudar_zoom(1), padx=10, pady=4).pack(side="left")
+        self._info_var = tk.StringVar()
+        tk.Label(barra, textvariable=self._info_var, fg=TEXT_MUTED, bg=BG, font=("Helvetica", 10)).pack(side="left", padx=12)
+
+        altura_faixa = int(842 * self.ZOOM_MINIATURA) + 2 * self.MARGEM
+        self._faixa = tk.Canvas(self.janela, bg=SURFACE, highlightthickness=0, height=altura_faixa, cursor="hand2")
+        self._faixa.grid(row=1, column=0, columnspan=2, sticky="ew")
+        rolagem_faixa = tk.Scrollbar(self.janela, orient="horizontal", command=self._faixa.xview, bg=BORDER)
+        rolagem_faixa.grid(row=2, column=0, columnspan=2, sticky="ew")
+        self._faixa.configure(xscrollcommand=self._ao_rolar(rolagem_faixa))
+        self._faixa.bind("<Button-1>", self._ir_para_miniatura)
+
+        self._paginas = tk.Canvas(self.janela, bg=BG, highlightthickness=0)
+        self._paginas.grid(row=3, column=0, sticky="nsew")
+        rolagem = tk.Scrollbar(self.janela, orient="vertical", command=self._paginas.yview, bg=BORDER)
+        rolagem.grid(row=3, column=1, sticky="ns")
+        self._paginas.configure(yscrollcommand=self._ao_rolar(rolagem))
+        for evento in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self._paginas.bind(evento, self._roda)
+        for canvas in (self._faixa, self._paginas):
+            canvas.bind("<Configure>", lambda e: self._agendar())
+        self.janela.columnconfigure(0, weight=1)
+        self.janela.rowconfigure(3, weight=1)
+        self.atualizar_textos()
+
+    def atualizar_textos(self) -> None:
+        self.janela.title(t("preview.title"))
+        self._zoom_var.set(f"{round(self._zoom * 100)}%")
+        chave, kwargs = self._info
+        self._info_var.set(t(chave, **kwargs))
+
+    def novo_documento(self, tamanhos: list[tuple[float, float]]) -> None:
+        """Outro PDF (lista vazia: ainda sendo lido); as marcações chegam depois, por mostrar_plano."""
+        self._tamanhos = tamanhos
+        self._com_ocorrencia = []
+        self._versao_plano = None
+        self._info = ("preview.waiting", {})
+        self.atualizar_textos()
+        self._imagens.limpar()
+        self._layout()
+
+    def mostrar_plano(self, versao: int, ocorrencias: dict[int, int]) -> None:
+        """Marcações pendentes mudaram: descarta as imagens antigas e pede de novo as visíveis."""
+        self._versao_plano = versao
+        self._com_ocorrencia = sorted(ocorrencias)
+        self._info = ("preview.pages_with_hits", {"n": len(ocorrencias), "total": sum(ocorrencias.values())})
+        self.atualizar_textos()
+        self._imagens.limpar()
+        self._pedidas.clear()
+        self._layout_miniaturas()
+        self._agendar()
+
+    def imagem_recebida(self, numero: int, zoom: float, versao_plano: int, ppm: bytes) -> None:
+        if versao_plano != self._versao_plano:
+            return
+        self._pedidas.discard((numero, zoom))
+        self._imagens.guardar((numero, zoom), tk.PhotoImage(master=self.janela, data=ppm))
+        self._agendar()
+
+    def fechar(self) -> None:
+        self._imagens.limpar()
+        self.janela.destroy()
+        self._ao_fechar()
+
+    def _layout(self) -> None:
+        """Posições das páginas no zoom atual, com um retângulo vazio no lugar de cada uma."""
+        self._paginas.delete("all")
+        self._itens = {chave: item for chave, item in self._itens.items() if item[0] is self._faixa}
+        self._pedidas.clear()
+        self._topos = list(accumulate((h * self._zoom + self.MARGEM for _, h in self._tamanhos), initial=self.MARGEM))
+        largura = max((w for w, _ in self._tamanhos), default=0) * self._zoom + 2 * self.MARGEM
+        for numero, (w, h) in enumerate(self._tamanhos):
+            y = self._topos[numero]
+            self._paginas.create_rectangle(
+                self.MARGEM, y, self.MARGEM + w * self._zoom, y + h * self._zoom, fill=SURFACE, outline=BORDER,
+            )
+        self._paginas.configure(scrollregion=(0, 0, largura, self._topos[-1]))
+        self._layout_miniaturas()
+        self._agendar()
+
+    def _layout_miniaturas(self) -> None:
+        self._faixa.delete("all")
+        self._itens = {chave: item for chave, item in self._itens.items() if item[0] is self._paginas}
+        larguras = (self._tamanhos[n][0] * self.ZOOM_MINIATURA + self.MARGEM for n in self._com_ocorrencia)
+        self._esquerdas = list(accumulate(larguras, initial=self.MARGEM))
+        for i, numero in enumerate(self._com_ocorrencia):
+            x = self._esquerdas[i]
+            w, h = self._tamanhos[numero]
+            self._faixa.create_rectangle(
+                x, self.MARGEM, x + w * self.ZOOM_MINIATURA, self.MARGEM + h * self.ZOOM_MINIATURA,
+                fill=BG, outline=BORDER,
+            )
+            self._faixa.create_text(x + 3, self.MARGEM + 2, text=str(numero + 1), anchor="nw", fill=TEXT_MUTED, tags="rotulo")
+        self._faixa.configure(scrollregion=(0, 0, self._esquerdas[-1], int(self._faixa["height"])))
+
+    def _ao_rolar(self, barra: tk.Scrollbar):
+        def ao_rolar(primeiro, ultimo) -> None:
+            barra.set(primeiro, ultimo)
+            self._agendar()
+        return ao_rolar
+
+    def _roda(self, event) -> None:
+        if getattr(event, "num", None) == 5:
+            self._paginas.yview_scroll(1, "units")
+        elif getattr(event, "num", None) == 4:
+            self._paginas.yview_scroll(-1, "units")
+        else:
+            self._paginas.yview_scroll(int(-1 * (getattr(event, "delta", 0) / 120)), "units")
+
+    def _mudar_zoom(self, passo: int) -> None:
+        i = min(max(self.ZOOMS.index(self._zoom) + passo, 0), len(self.ZOOMS) - 1)
+        if self.ZOOMS[i] != self._zoom:
+            posicao = self._paginas.yview()[0]
+            self._zoom = self.ZOOMS[i]
+            self.atualizar_textos()
+            self._layout()
+            self._paginas.yview_moveto(posicao)
+
+    def _ir_para_miniatura(self, event) -> None:
+        i = bisect_right(self._esquerdas, self._faixa.canvasx(event.x)) - 1
+        if 0 <= i < len(self._com_ocorrencia) and self._topos[-1]:
+            self._paginas.yview_moveto(self._topos[self._com_ocorrencia[i]] / self._topos[-1])
+
+    def _agendar(self) -> None:
+        if self._agendado is None:
+            self._agendado = self.janela.after(self.ESPERA_MS, self._atualizar)
+
+    @staticmethod
+    def _visiveis(posicoes: list[float], inicio: float, fim: float, total: int) -> range:
+        """Índices dos itens que cruzam [inicio, fim), mais um vizinho de cada lado."""
+        primeiro = bisect_right(posicoes, inicio) - 2
+        ultimo = bisect_left(posicoes, fim) + 1
+        return range(max(primeiro, 0), min(ultimo, total))
+
+    def _atualizar(self) -> None:
+        """Desenha as imagens das páginas e miniaturas visíveis que já estão no LRU e pede as que faltam."""
+        self._agendado = None
+        if self._versao_plano is None:
+            return
+        faltando = []
+        y0 = self._paginas.canvasy(0)
+        for numero in self._visiveis(self._topos, y0, y0 + self._paginas.winfo_height(), len(self._tamanhos)):
+            self._desenhar(self._paginas, (numero, self._zoom), self.MARGEM, self._topos[numero], faltando)
+        x0 = self._faixa.canvasx(0)
+        for i in self._visiveis(self._esquerdas, x0, x0 + self._faixa.winfo_width(), len(self._com_ocorrencia)):
+            self._desenhar(self._faixa, (self._com_ocorrencia[i], self.ZOOM_MINIATURA), self._esquerdas[i], self.MARGEM, faltando)
+        self._faixa.tag_raise("rotulo")
+        novas = [chave for chave in faltando if chave not in self._pedidas]
+        if novas:
+            # Um pedido novo cancela o anterior no processo: repete as que ainda faltam
+            self._pedidas = set(faltando)
+            self._pedir_paginas(faltando)
+
+    def _desenhar(self, canvas: tk.Canvas, chave: tuple[int, float], x: float, y: float, faltando: list) -> None:
+        imagem = self._imagens.obter(chave)
+        if imagem is None:
+            faltando.append(chave)
+        elif chave not in self._itens:
+            self._itens[chave] = (canvas, canvas.create_image(x, y, image=imagem, anchor="nw"))
+
+    def _descartada(self, chave: tuple[int, float]) -> None:
+        canvas, item = self._itens.pop(chave, (None, None))
+        if canvas is not None:
+            canvas.delete(item)
+
+
 class MarkMeApp:
     def __init__(self):
         self.root = tk.Tk()
@@ -51,12 +517,23 @@ class MarkMeApp:
 
         self.pdf_path: str = ""
         self.pdf_label_var = tk.StringVar(value=t("ui.no_file"))
-        self.termo_rows: list[dict] = []  # {"frame", "entry", "patch", "color"}
+        self.termo_rows: list[dict] = []  # {"frame", "entry", "var", "badge", "patch", "color"}
         self.max_termos = 32
         self.scroll_canvas = None
         self.scroll_inner = None
+        self._tarefa: _TarefaEmProcesso | None = None
+        self._status: tuple | None = None  # (chave i18n, kwargs) do texto de status atual
+        self._documento: _ProcessoDocumento | None = None  # criado ao escolher o primeiro PDF
+        self._contagem_ativa = False  # há PDF escolhido e o processo do documento está de pé
+        self._indice_pronto = False
+        self._tamanhos: list[tuple[float, float]] = []  # tamanho de cada página do PDF indexado
+        self._ocorrencias: dict[str, int] = {}  # contagens já recebidas para o PDF atual
+        self._contagem_agendada: str | None = None
+        self._previa: _PreVisualizacao | None = None
+        self._pares_plano: list[tuple[str, str]] | None = None  # pares do último plano pedido para a prévia
 
         self._build_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self._ao_fechar)
 
     def _build_ui(self):
         pad_label = {"padx": 16, "pady": 6}
@@ -132,7 +609,9 @@ class MarkMeApp:
             self.scroll_inner.columnconfigure(c, weight=1)
 
         self._btn_add = _make_btn(card, t("ui.add_term"), self._adicionar_termo, padx=10, pady=6)
-        self._btn_add.grid(row=row_inner, column=0, columnspan=2, **pad_label, sticky="w")
+        self._btn_add.grid(row=row_inner, column=0, **pad_label, sticky="w")
+        self._btn_previa = _make_btn(card, t("ui.preview"), self._abrir_previa, padx=10, pady=6)
+        self._btn_previa.grid(row=row_inner, column=1, **pad_label, sticky="e")
         row_inner += 1
 
         card.columnconfigure(1, weight=1)
@@ -142,11 +621,26 @@ class MarkMeApp:
         # Botão principal (sempre visível: card row absorve espaço extra)
         row += 1
         self._btn_gerar = _make_btn(self.root, t("ui.generate"), self._gerar, padx=24, pady=12, font=("Helvetica", 12), bold=True)
-        self._btn_gerar.grid(row=row, column=0, columnspan=2, pady=20, padx=16, sticky="ew")
+        self._btn_gerar.grid(row=row, column=0, columnspan=2, pady=(20, 8), padx=16, sticky="ew")
+        row += 1
+
+        # Progresso da tarefa em segundo plano (visível só durante a tarefa)
+        self._frame_progresso = tk.Frame(self.root, bg=BG)
+        self._frame_progresso.grid(row=row, column=0, columnspan=2, padx=16, pady=(0, 16), sticky="ew")
+        self._frame_progresso.columnconfigure(0, weight=1)
+        self._barra = ttk.Progressbar(self._frame_progresso, mode="determinate", maximum=1.0)
+        self._barra.grid(row=0, column=0, sticky="ew", padx=(0, 8))
+        self._btn_cancelar = _make_btn(self._frame_progresso, t("ui.cancel"), self._cancelar_tarefa, padx=10, pady=4)
+        self._btn_cancelar.grid(row=0, column=1)
+        self._status_var = tk.StringVar()
+        tk.Label(self._frame_progresso, textvariable=self._status_var, fg=TEXT_MUTED, bg=BG, font=("Helvetica", 10)).grid(
+            row=1, column=0, columnspan=2, sticky="w", pady=(4, 0)
+        )
+        self._frame_progresso.grid_remove()
         row += 1
 
         self.root.columnconfigure(1, weight=1)
-        self.root.rowconfigure(row - 2, weight=1)
+        self.root.rowconfigure(row - 3, weight=1)
 
     def _sync_lang_dropdown(self) -> None:
         """Set dropdown to current language display name."""
@@ -173,7 +667,12 @@ class MarkMeApp:
         self._btn_pdf.winfo_children()[0].config(text=t("ui.select_pdf"))
         self._label_terms.config(text=t("ui.terms_and_colors"))
         self._btn_add.winfo_children()[0].config(text=t("ui.add_term"))
+        self._btn_previa.winfo_children()[0].config(text=t("ui.preview"))
+        if self._previa is not None:
+            self._previa.atualizar_textos()
         self._btn_gerar.winfo_children()[0].config(text=t("ui.generate"))
+        self._btn_cancelar.winfo_children()[0].config(text=t("ui.cancel"))
+        self._mostrar_status()
         # Update "Language" label next to dropdown
         for w in self._lang_menu.master.winfo_children():
             if isinstance(w, tk.Label):
@@ -220,11 +719,19 @@ class MarkMeApp:
         row_frame.grid(row=idx // 4, column=idx % 4, sticky="ew", pady=2, padx=(0, 6))
         row_frame.columnconfigure(0, weight=1)
 
-        entry = tk.Entry(row_frame, width=14, bg=BG, fg=TEXT, insertbackground=TEXT, relief="flat", font=("Menlo", 10))
-        entry.grid(row=0, column=0, sticky="ew", padx=(0, 6), pady=4)
+        var = tk.StringVar()
+        entry = tk.Entry(
+            row_frame, textvariable=var, width=12, bg=BG, fg=TEXT, insertbackground=TEXT, relief="flat", font=("Menlo", 10),
+        )
+        entry.grid(row=0, column=0, sticky="ew", padx=(0, 4), pady=4)
+        var.trace_add("write", lambda *_: self._agendar_contagem())
+
+        # Ocorrências do termo no PDF escolhido, atualizadas enquanto se digita
+        badge = tk.Label(row_frame, width=4, anchor="e", fg=TEXT_MUTED, bg=SURFACE, font=("Helvetica", 9))
+        badge.grid(row=0, column=1, padx=(0, 4))
 
         patch = tk.Canvas(row_frame, width=32, height=32, bg=SURFACE, highlightthickness=0, cursor="hand2")
-        patch.grid(row=0, column=1, padx=(0, 4))
+        patch.grid(row=0, column=2, padx=(0, 4))
         self._atualizar_patch(patch, cor)
 
         def pick_color() -> None:
@@ -232,6 +739,7 @@ class MarkMeApp:
             if hex_str:
                 data["color"] = hex_str.strip()
                 self._atualizar_patch(patch, data["color"])
+                self._agendar_contagem()
 
         patch.bind("<Button-1>", lambda e: pick_color())
 
@@ -242,13 +750,14 @@ class MarkMeApp:
                     self.termo_rows.pop(i)
                     break
             self._reindex_rows()
+            self._agendar_contagem()
 
         lbl_remove = tk.Label(row_frame, text="×", fg=TEXT_MUTED, bg=SURFACE, font=("Helvetica", 14), cursor="hand2")
-        lbl_remove.grid(row=0, column=2)
+        lbl_remove.grid(row=0, column=3)
         lbl_remove.bind("<Button-1>", lambda e: remove_row())
         row_frame.columnconfigure(0, weight=1)
 
-        data = {"frame": row_frame, "entry": entry, "patch": patch, "color": cor}
+        data = {"frame": row_frame, "entry": entry, "var": var, "badge": badge, "patch": patch, "color": cor}
         self.termo_rows.append(data)
 
     def _reindex_rows(self) -> None:
@@ -269,37 +778,153 @@ class MarkMeApp:
                 nome = nome[:37] + "..."
             self.pdf_label_var.set(nome)
             self.root.update_idletasks()
+            self._indexar_pdf(path)
 
-    def _gerar(self) -> None:
+    def _indexar_pdf(self, path: str) -> None:
+        """Monta em segundo plano o índice de texto do PDF para as contagens ao vivo e a prévia."""
+        if self._documento is None:
+            self._documento = _ProcessoDocumento(
+                self.root, self._resposta_documento, self._imagem_recebida, self._documento_falhou,
+            )
+        self._contagem_ativa = True
+        self._indice_pronto = False
+        self._tamanhos = []
+        self._ocorrencias = {}
+        self._pares_plano = None
+        self._mostrar_contagens()
+        if self._previa is not None:
+            self._previa.novo_documento([])
+        self._documento.pedir("indexar", path)
+
+    def _resposta_documento(self, tipo: str, versao: int, valor) -> None:
+        if tipo == "indexar":
+            self._pdf_indexado(valor)
+        elif tipo == "contar":
+            self._contagens_recebidas(valor)
+        elif tipo == "plano" and self._previa is not None:
+            self._previa.mostrar_plano(versao, valor)
+
+    def _pdf_indexado(self, tamanhos: list[tuple[float, float]]) -> None:
+        self._contagem_ativa = self._indice_pronto = True
+        self._tamanhos = tamanhos
+        if self._previa is not None:
+            self._previa.novo_documento(tamanhos)
+        self._pedir_contagem()
+
+    def _agendar_contagem(self) -> None:
+        """Conta os termos (e atualiza a prévia) só quando a digitação para por CONTAGEM_ESPERA_MS."""
+        self._mostrar_contagens()
+        if self._contagem_agendada is not None:
+            self.root.after_cancel(self._contagem_agendada)
+        self._contagem_agendada = self.root.after(CONTAGEM_ESPERA_MS, self._pedir_contagem)
+
+    def _pedir_contagem(self) -> None:
+        self._contagem_agendada = None
+        if not self._indice_pronto:
+            return
+        faltando = {d["var"].get().strip() for d in self.termo_rows} - self._ocorrencias.keys() - {""}
+        if faltando:
+            self._documento.pedir("contar", sorted(faltando))
+        self._pedir_plano()
+
+    def _pedir_plano(self) -> None:
+        """Marcações pendentes para a prévia, se ela está aberta e os termos ou cores mudaram."""
+        pares = self._pares()
+        if self._previa is not None and self._indice_pronto and pares != self._pares_plano:
+            self._pares_plano = pares
+            self._documento.pedir("plano", pares)
+
+    def _pedir_paginas(self, paginas: list[tuple[int, float]]) -> None:
+        if self._indice_pronto:
+            self._documento.pedir("renderizar", paginas)
+
+    def _imagem_recebida(self, numero: int, zoom: float, versao_plano: int, ppm: bytes) -> None:
+        if self._previa is not None:
+            self._previa.imagem_recebida(numero, zoom, versao_plano, ppm)
+
+    def _contagens_recebidas(self, contagens: dict[str, int]) -> None:
+        self._ocorrencias.update(contagens)
+        self._mostrar_contagens()
+
+    def _documento_falhou(self, tipo: str | None, mensagem: str) -> None:
+        if tipo == "plano":
+            self._pares_plano = None  # a prévia pede de novo na próxima mudança dos termos
+        elif tipo != "renderizar":
+            self._contagem_falhou()
+
+    def _contagem_falhou(self) -> None:
+        # Índice ou contagem falhou (ou o processo morreu): sem contagens ao vivo nem prévia para
+        # este PDF; o erro aparece ao gerar
+        self._contagem_ativa = False
+        self._indice_pronto = False
+        self._ocorrencias = {}
+        if self._documento is not None and not self._documento.ativo:
+            self._documento = None
+        self._mostrar_contagens()
+
+    def _abrir_previa(self) -> None:
         if not self.pdf_path or not os.path.isfile(self.pdf_path):
             messagebox.showerror(t("error.title"), t("error.no_pdf"))
             return
+        if self._previa is not None:
+            self._previa.janela.lift()
+            return
+        self._previa = _PreVisualizacao(self.root, self._pedir_paginas, self._previa_fechada)
+        self._previa.novo_documento(self._tamanhos)
+        self._pares_plano = None
+        self._pedir_plano()
+
+    def _previa_fechada(self) -> None:
+        self._previa = None
 
-        pares = []
+    def _mostrar_contagens(self) -> None:
+        """Número ao lado de cada termo: contagem já conhecida, "…" enquanto é calculada."""
         for data in self.termo_rows:
-            termo = data["entry"].get().strip()
-            if termo:
-                pares.append((termo, data["color"]))
+            termo = data["var"].get().strip()
+            if not termo or not self._contagem_ativa:
+                data["badge"].config(text="")
+            elif termo in self._ocorrencias:
+                n = self._ocorrencias[termo]
+                data["badge"].config(text=str(n), fg=ZERO if n == 0 else TEXT_MUTED)
+            else:
+                data["badge"].config(text="…", fg=TEXT_MUTED)
 
+    def _gerar(self) -> None:
+        if self._tarefa is not None:
+            return
+        if not self.pdf_path or not os.path.isfile(self.pdf_path):
+            messagebox.showerror(t("error.title"), t("error.no_pdf"))
+            return
+
+        pares = self._pares()
         if not pares:
             messagebox.showerror(t("error.title"), t("error.no_term"))
             return
 
-        termos = [t for t, _ in pares]
-        try:
-            n = contar_ocorrencias_multi(self.pdf_path, termos)
-        except Exception as e:
-            messagebox.showerror(t("error.title"), t("error.read_pdf", e=str(e)))
+        # Importado aqui: a janela abre sem esperar o PyMuPDF carregar
+        from mark_me.core import find_matches
+        self._iniciar_tarefa(find_matches, (self.pdf_path, pares), self._busca_concluida)
+
+    def _pares(self) -> list[tuple[str, str]]:
+        """(termo, cor) de cada linha preenchida."""
+        return [(data["var"].get().strip(), data["color"]) for data in self.termo_rows if data["var"].get().strip()]
+
+    def _busca_concluida(self, status: str, valor) -> None:
+        if status == "erro":
+            messagebox.showerror(t("error.title"), t("error.read_pdf", e=valor))
+            return
+        if status != "ok":
             return
-        if n == 0:
+        plan = valor
+        if plan.total == 0:
             messagebox.showwarning(
                 t("warn.no_occurrence_title"),
                 t("warn.no_occurrence_body"),
             )
             return
 
-        nome_base = os.path.splitext(os.path.basename(self.pdf_path))[0]
-        dir_base = os.path.dirname(self.pdf_path)
+        nome_base = os.path.splitext(os.path.basename(plan.input_path))[0]
+        dir_base = os.path.dirname(plan.input_path)
         sugestao = os.path.join(dir_base, f"{nome_base}_marcado.pdf")
 
         out_path = filedialog.asksaveasfilename(
@@ -312,11 +937,60 @@ class MarkMeApp:
         if not out_path:
             return
 
-        try:
-            destacar_pdf_multi(self.pdf_path, out_path, pares)
-            messagebox.showinfo(t("info.done_title"), t("info.done_body", path=out_path))
-        except Exception as e:
-            messagebox.showerror(t("error.title"), t("error.process", e=str(e)))
+        def gravacao_concluida(status: str, valor) -> None:
+            if status == "ok":
+                messagebox.showinfo(t("info.done_title"), t("info.done_body", path=out_path))
+            elif status == "erro":
+                messagebox.showerror(t("error.title"), t("error.process", e=valor))
+
+        from mark_me.core import apply_plan
+        self._iniciar_tarefa(apply_plan, (plan, out_path), gravacao_concluida)
+
+    def _iniciar_tarefa(self, funcao, args: tuple, ao_terminar) -> None:
+        """Roda funcao em segundo plano mostrando progresso; ao_terminar(status, valor) no fim."""
+        def terminar(status: str, valor) -> None:
+            self._tarefa = None
+            self._barra["value"] = 0
+            self._btn_cancelar.grid_remove()
+            if status == "cancelado":
+                self._status = ("status.cancelled", {})
+            else:
+                self._status = None
+                self._frame_progresso.grid_remove()
+            self._mostrar_status()
+            ao_terminar(status, valor)
+
+        self._barra["value"] = 0
+        self._status = None
+        self._mostrar_status()
+        self._btn_cancelar.grid()
+        self._frame_progresso.grid()
+        self._tarefa = _TarefaEmProcesso(self.root, funcao, args, self._ao_progresso, terminar)
+
+    def _ao_progresso(self, fase: str, feitas: int, total: int) -> None:
+        self._barra["value"] = feitas / total if total else 0
+        self._status = (f"status.{fase}", {"n": feitas, "total": total})
+        self._mostrar_status()
+
+    def _mostrar_status(self) -> None:
+        if self._status is None:
+            self._status_var.set("")
+        else:
+            chave, kwargs = self._status
+            self._status_var.set(t(chave, **kwargs))
+
+    def _cancelar_tarefa(self) -> None:
+        if self._tarefa is not None:
+            self._status = ("status.cancelling", {})
+            self._mostrar_status()
+            self._tarefa.cancelar()
+
+    def _ao_fechar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.encerrar()
+        if self._documento is not None:
+            self._documento.encerrar()
+        self.root.destroy()
 
     def run(self) -> None:
         self.root.mainloop()
@@ -1,34 +1,89 @@
 """
 Mark.me - Internationalization (i18n). Default language: English.
+
+All catalogs in locales/*.json are loaded once, on first use, and merged per language over the
+default one, so t() is a single dict lookup (fallback chain: current → default → key).
+`python -m mark_me.i18n --compile` writes them to _catalogs.py (and its bytecode), which is
+imported instead of parsing JSON while it is newer than every locales/*.json file.
 """
-import json
 import os
+import sys
 
 _DEFAULT_LANG = "en"
-_TRANSLATIONS: dict[str, dict[str, str]] = {}
 _CURRENT_LANG = _DEFAULT_LANG
+_CATALOGS: dict[str, dict[str, str]] | None = None  # lang -> merged catalog
+_current: dict[str, str] = {}
 
-_LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_LOCALES_DIR = os.path.join(_HERE, "locales")
+_COMPILED = os.path.join(_HERE, "_catalogs.py")
 
 
 def _load(lang: str) -> dict[str, str]:
+    import json  # only needed without the compiled catalogs
     path = os.path.join(_LOCALES_DIR, f"{lang}.json")
     if not os.path.isfile(path):
         return {}
     try:
         with open(path, encoding="utf-8") as f:
             return json.load(f)
-    except (json.JSONDecodeError, OSError):
+    except (ValueError, OSError):  # json.JSONDecodeError is a ValueError
         return {}
 
 
+def _locale_files() -> list[str]:
+    try:
+        return sorted(n for n in os.listdir(_LOCALES_DIR) if n.endswith(".json"))
+    except OSError:
+        return []
+
+
+def _build() -> dict[str, dict[str, str]]:
+    """Read every locales/*.json and merge each language over the default one."""
+    raw = {name[:-len(".json")]: _load(name[:-len(".json")]) for name in _locale_files()}
+    default = raw.get(_DEFAULT_LANG, {})
+    return {lang: {**default, **catalog} for lang, catalog in raw.items()}
+
+
+def _compiled_is_fresh() -> bool:
+    try:
+        built = os.path.getmtime(_COMPILED)
+        return all(os.path.getmtime(os.path.join(_LOCALES_DIR, n)) <= built for n in _locale_files())
+    except OSError:
+        return False
+
+
+def _catalogs() -> dict[str, dict[str, str]]:
+    global _CATALOGS
+    if _CATALOGS is None:
+        compiled = None
+        if _compiled_is_fresh():
+            try:
+                from mark_me import _catalogs as compiled
+            except ImportError:
+                compiled = None
+        _CATALOGS = compiled.CATALOGS if compiled is not None else _build()
+    return _CATALOGS
+
+
+def compile_catalogs(path: str = _COMPILED) -> str:
+    """Write the merged catalogs as a Python module (loads from bytecode, no JSON parsing)."""
+    import py_compile
+    catalogs = _build()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('"""Generated by `python -m mark_me.i18n --compile` from locales/*.json. Do not edit."""\n')
+        f.write(f"CATALOGS = {catalogs!r}\n")
+    # Bytecode written now, even where PYTHONDONTWRITEBYTECODE is set at run time
+    py_compile.compile(path, doraise=True)
+    return path
+
+
 def set_lang(lang: str) -> None:
     """Set current language (e.g. 'en', 'pt_BR', 'de', 'es')."""
-    global _CURRENT_LANG, _TRANSLATIONS
+    global _CURRENT_LANG, _current
     _CURRENT_LANG = lang or _DEFAULT_LANG
-    _TRANSLATIONS[_CURRENT_LANG] = _load(_CURRENT_LANG)
-    if not _TRANSLATIONS[_CURRENT_LANG] and _CURRENT_LANG != _DEFAULT_LANG:
-        _TRANSLATIONS[_CURRENT_LANG] = _load(_DEFAULT_LANG)
+    catalogs = _catalogs()
+    _current = catalogs.get(_CURRENT_LANG) or catalogs.get(_DEFAULT_LANG, {})
 
 
 def get_lang() -> str:
@@ -38,11 +93,9 @@ def get_lang() -> str:
 
 def t(key: str, **kwargs: str | int) -> str:
     """Return translated string for key. Use t('key', n=32) for placeholders like {n}."""
-    if _CURRENT_LANG not in _TRANSLATIONS:
+    if _CATALOGS is None:
         set_lang(_CURRENT_LANG)
-    msg = _TRANSLATIONS.get(_CURRENT_LANG, {}).get(key)
-    if msg is None:
-        msg = _load(_DEFAULT_LANG).get(key, key)
+    msg = _current.get(key, key)
     if kwargs:
         try:
             return msg.format(**kwargs)
@@ -51,5 +104,8 @@ def t(key: str, **kwargs: str | int) -> str:
     return msg
 
 
-# Load default on import
-set_lang(_DEFAULT_LANG)
+if __name__ == "__main__":
+    if sys.argv[1:] != ["--compile"]:
+        print("Usage: python -m mark_me.i18n --compile", file=sys.stderr)
+        sys.exit(2)
+    print(compile_catalogs())
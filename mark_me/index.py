@@ -0,0 +1,137 @@
+"""
+Mark.me - Índice de texto por página: caracteres e posições extraídos uma vez, para buscar
+termos sem voltar ao conteúdo da página (cache em disco, contagens rápidas).
+
+A busca imita TextPage.search do MuPDF: sem diferenciar maiúsculas ASCII, espaços em sequência (e
+quebras de linha) contam como um só, e os caracteres são juntados num retângulo com a mesma regra
+do MuPDF (ver _continua), então os retângulos são os de search_for.
+"""
+import re
+from array import array
+
+import fitz  # PyMuPDF
+
+_ESPACOS = frozenset(" \t\r\n\xa0\u2028\u2029")
+# _canon para str.translate: o texto de uma página inteira sai numa só chamada
+_CANONICO = {ord(c): " " for c in _ESPACOS} | {ord(c): c.lower() for c in map(chr, range(ord("A"), ord("Z") + 1))}
+
+# Floats por caractere em IndicePagina.caixas: x0, y0, x1, y1 e o tamanho da fonte
+CAMPOS_CAIXA = 5
+# Folgas do MuPDF (fz_search_stext_page) para juntar um caractere ao anterior, em frações do
+# tamanho da fonte: na horizontal junta o kerning mas não os espaços largos do texto justificado
+_FOLGA_H = 0.2
+_FOLGA_V = 0.1
+
+
+def _canon(c: str) -> str:
+    """Caractere como a busca do MuPDF compara: só A-Z vira minúsculo; espaços unificados."""
+    if c in _ESPACOS:
+        return " "
+    if "A" <= c <= "Z":
+        return c.lower()
+    return c
+
+
+def padrao_termo(termo: str) -> re.Pattern:
+    """Regex do termo sobre o texto canônico: espaços do termo casam com qualquer sequência de espaços."""
+    partes = "".join(_canon(c) for c in termo).split()
+    return re.compile(" +".join(re.escape(p) for p in partes))
+
+
+class IndicePagina:
+    """Texto de uma página (linhas terminadas em '\\n') e a caixa de cada caractere.
+
+    caixas guarda CAMPOS_CAIXA floats (x0, y0, x1, y1, tamanho da fonte) por caractere de texto;
+    os '\\n' ficam zerados.
+    """
+    __slots__ = ("texto", "caixas", "_canonico")
+
+    def __init__(self, texto: str, caixas: array):
+        self.texto = texto
+        self.caixas = caixas
+        self._canonico: str | None = None
+
+    def __getstate__(self):
+        return (self.texto, self.caixas)
+
+    def __setstate__(self, estado):
+        self.texto, self.caixas = estado
+        self._canonico = None
+
+    @classmethod
+    def da_textpage(cls, textpage: fitz.TextPage) -> "IndicePagina":
+        """Monta o índice a partir de uma TextPage já extraída."""
+        partes: list[str] = []
+        caixas = array("f")
+        for bloco in textpage.extractRAWDICT()["blocks"]:
+            for linha in bloco.get("lines", ()):
+                for span in linha["spans"]:
+                    tamanho = span["size"]
+                    for ch in span["chars"]:
+                        partes.append(ch["c"])
+                        caixas.extend(ch["bbox"])
+                        caixas.append(tamanho)
+                partes.append("\n")
+                caixas.extend((0.0,) * CAMPOS_CAIXA)
+        return cls("".join(partes), caixas)
+
+    @property
+    def canonico(self) -> str:
+        """Texto normalizado para a busca (mesmo comprimento de texto)."""
+        if self._canonico is None:
+            self._canonico = self.texto.translate(_CANONICO)
+        return self._canonico
+
+    def contem(self, padrao: re.Pattern) -> bool:
+        return padrao.search(self.canonico) is not None
+
+    def buscar(self, padrao: re.Pattern) -> list[fitz.Rect]:
+        """Retângulos das ocorrências do padrão (ver padrao_termo), um por trecho contíguo de linha."""
+        return self.retangulos((m.start(), m.end()) for m in padrao.finditer(self.canonico))
+
+    def contar(self, padrao: re.Pattern) -> int:
+        """len(buscar(padrao)), sem criar os retângulos (contagens ao digitar, na GUI)."""
+        return len(self._unir((m.start(), m.end()) for m in padrao.finditer(self.canonico)))
+
+    def retangulos(self, trechos) -> list[fitz.Rect]:
+        """Retângulos dos trechos [inicio, fim) do texto, em ordem e sem sobreposição.
+
+        Caracteres seguidos na mesma linha viram um único retângulo com a regra do MuPDF (ver
+        _continua), inclusive de um trecho para o seguinte.
+        """
+        return [fitz.Rect(r) for r in self._unir(trechos)]
+
+    def _unir(self, trechos) -> list[list[float]]:
+        # Como o quad do MuPDF: lado esquerdo do primeiro caractere e direito do último (x, topo, base)
+        lados: list[tuple] = []
+        ultimo = -2  # índice do último caractere incluído em lados[-1]
+        anterior = None  # caixa desse caractere: o MuPDF compara com ele, não com o retângulo todo
+        for inicio, fim in trechos:
+            for i in range(inicio, fim):
+                if self.texto[i] == "\n":
+                    ultimo = -2
+                    continue
+                caixa = self.caixas[CAMPOS_CAIXA * i:CAMPOS_CAIXA * i + CAMPOS_CAIXA]
+                direito = (caixa[2], caixa[1], caixa[3])
+                if ultimo == i - 1 and lados and _continua(anterior, caixa):
+                    lados[-1] = (lados[-1][0], direito)
+                else:
+                    lados.append(((caixa[0], caixa[1], caixa[3]), direito))
+                anterior = caixa
+                ultimo = i
+        return [
+            [min(e[0], d[0]), min(e[1], d[1]), max(e[0], d[0]), max(e[2], d[2])] for e, d in lados
+        ]
+
+
+def _continua(anterior, caixa) -> bool:
+    """True se o caractere continua o quad do anterior, como em fz_search_stext_page (texto
+    horizontal): começa onde o anterior termina, com base e topo alinhados, dentro das folgas.
+    """
+    folga_h = caixa[4] * _FOLGA_H
+    folga_v = caixa[4] * _FOLGA_V
+    return (
+        abs(caixa[0] - anterior[2]) < folga_h
+        and abs(caixa[3] - anterior[3]) < folga_v
+        and abs(caixa[1] - anterior[1]) < folga_v
+    )
@@ -0,0 +1,49 @@
+"""
+Mark.me - Modos aceitos por apply_plan, seleção de páginas e o socket do mark serve (sem
+dependências: o CLI monta o --help e valida os argumentos sem carregar o PyMuPDF, o lote ou o
+servidor).
+"""
+
+# Variável com o socket do mark serve (o cliente usa o servidor se ela estiver definida)
+ENV_SOCKET = "MARKME_SOCKET"
+
+# Modos de gravação aceitos por apply_plan / destacar_pdf_multi
+SAVE_MODES = ("fast", "compact", "incremental")
+
+# Agrupamento das ocorrências em anotações: uma por ocorrência, uma por linha ou uma por
+# página (sempre por termo; a área marcada é a mesma, muda só o número de anotações)
+COALESCE_MODES = ("none", "line", "page")
+
+
+def intervalos_paginas(texto: str) -> list[tuple[int, int | None]]:
+    """Lê uma seleção de páginas como "1-20,45,100-" (números a partir de 1, fim incluído).
+
+    Retorna [(inicio, fim)] a partir de 0 com fim exclusivo; fim None = até a última página
+    ("100-"); "-5" = do começo até a 5. Levanta ValueError se a seleção for inválida.
+    """
+    intervalos: list[tuple[int, int | None]] = []
+    for parte in texto.replace(" ", "").split(","):
+        if not parte:
+            continue
+        inicio, traco, fim = parte.partition("-")
+        try:
+            primeira = int(inicio) if inicio else 1
+            ultima = (int(fim) if fim else None) if traco else primeira
+        except ValueError:
+            raise ValueError(f"páginas inválidas: {parte!r} (use ex.: 1-20,45,100-)") from None
+        if primeira < 1 or (ultima is not None and ultima < primeira):
+            raise ValueError(f"páginas inválidas: {parte!r} (números a partir de 1, início <= fim)")
+        intervalos.append((primeira - 1, ultima))
+    if not intervalos:
+        raise ValueError("nenhuma página informada")
+    return intervalos
+
+
+def tipo_paginas(texto: str) -> str:
+    """Tipo argparse de --pages (mark e mark watch): valida os intervalos já na leitura dos argumentos."""
+    import argparse
+    try:
+        intervalos_paginas(texto)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return texto
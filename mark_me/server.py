@@ -0,0 +1,296 @@
+"""
+Mark.me - Servidor local (mark serve) e cliente: mantém o PyMuPDF carregado e os índices de
+texto dos documentos usados por último em memória, para chamadas repetidas do CLI não pagarem
+a inicialização a cada arquivo.
+
+Protocolo: socket Unix, uma requisição JSON por linha e uma resposta JSON por linha.
+  {"op": "ping"}
+  {"op": "count", "entrada": "/abs/a.pdf", "termos": ["x"], "dictionary": false, "pages": "1-20"}
+  {"op": "mark", "entrada": "/abs/a.pdf", "saida": "/abs/b.pdf", "pares": [["x", "#ffff00"]],
+   "opcoes": {"save_mode": "compact", "coalesce": "none", ...}, "dictionary": false, "pages": null}
+Respostas: {"ok": true, ...} ou {"ok": false, "erro": "mensagem"}.
+
+As chamadas ao PyMuPDF rodam em --workers processos (ele não é seguro entre threads); cada
+documento vai sempre para o mesmo processo, que guarda o índice dele. As threads só atendem os
+sockets, então um ping ou um documento pequeno não esperam atrás de um documento grande.
+
+O cliente usa o servidor só quando pedido (mark --server ou a variável MARKME_SOCKET) e, se não
+houver servidor no ar ou ele não responder a tempo (MARKME_SERVER_TIMEOUT segundos), devolve None
+para o chamador rodar no próprio processo.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+
+try:
+    from mark_me.modos import ENV_SOCKET
+except ImportError:
+    from modos import ENV_SOCKET
+
+ENV_TEMPO_RESPOSTA = "MARKME_SERVER_TIMEOUT"
+WORKERS_PADRAO = 4
+CONEXOES_PADRAO = 32
+MAXIMO_DOCUMENTOS_PADRAO = 32
+_TEMPO_CONEXAO = 1.0
+# Folgado para PDFs grandes; só evita esperar para sempre por um servidor travado
+TEMPO_RESPOSTA_PADRAO = 600.0
+
+
+def caminho_socket(caminho: str | None = None) -> str:
+    """Socket a usar: o informado, MARKME_SOCKET ou markme-<uid>.sock na pasta de runtime/temporária."""
+    if caminho:
+        return caminho
+    if os.environ.get(ENV_SOCKET):
+        return os.environ[ENV_SOCKET]
+    pasta = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(pasta, f"markme-{uid}.sock")
+
+
+# --- Cliente -----------------------------------------------------------------
+
+def tempo_resposta_padrao() -> float:
+    """Segundos de espera pela resposta: MARKME_SERVER_TIMEOUT ou TEMPO_RESPOSTA_PADRAO."""
+    try:
+        return float(os.environ[ENV_TEMPO_RESPOSTA])
+    except (KeyError, ValueError):
+        return TEMPO_RESPOSTA_PADRAO
+
+
+def enviar(pedido: dict, caminho: str | None = None, tempo_resposta: float | None = None) -> dict | None:
+    """Envia o pedido ao servidor e retorna a resposta; None se não houver servidor no ar ou se a
+    resposta não vier em tempo_resposta segundos (padrão: tempo_resposta_padrao()).
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    if tempo_resposta is None:
+        tempo_resposta = tempo_resposta_padrao()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(_TEMPO_CONEXAO)
+            sock.connect(caminho_socket(caminho))
+            sock.settimeout(tempo_resposta)
+            with sock.makefile("rwb") as canal:
+                canal.write(json.dumps(pedido, ensure_ascii=False).encode("utf-8") + b"\n")
+                canal.flush()
+                linha = canal.readline()
+    except OSError:  # inclui socket.timeout: servidor travado ou sem vaga
+        return None
+    if not linha:
+        return None
+    try:
+        resposta = json.loads(linha)
+    except ValueError:  # não é um servidor do Mark.me (ou a resposta veio cortada)
+        return None
+    return resposta if isinstance(resposta, dict) else None
+
+
+# --- Servidor ----------------------------------------------------------------
+
+# Estado de cada processo do pool (ver _iniciar_processo)
+_core = None
+_cache = None
+
+
+def _iniciar_processo(maximo_documentos: int) -> None:
+    """Carrega o core e cria o LRU de índices do processo (uma vez, na criação do processo)."""
+    global _core, _cache
+    try:
+        from mark_me import core
+        from mark_me.cache import CacheMemoria
+    except ImportError:
+        import core
+        from cache import CacheMemoria
+    _core = core
+    _cache = CacheMemoria(maximo_documentos)
+
+
+def _documentos_em_memoria() -> int:
+    return len(_cache)
+
+
+def _executar_pdf(pedido: dict) -> dict:
+    """Pedidos count e mark, no processo do pool."""
+    op = pedido["op"]
+    entrada = pedido["entrada"]
+    if op == "count":
+        total = _core.contar_ocorrencias_multi(
+            entrada, pedido["termos"], cache_dir=_cache, dictionary=pedido.get("dictionary", False),
+            pages=pedido.get("pages"),
+        )
+        return {"ok": True, "total": total}
+    plan = _core.find_matches(
+        entrada, [tuple(par) for par in pedido["pares"]], cache_dir=_cache,
+        dictionary=pedido.get("dictionary", False), pages=pedido.get("pages"),
+    )
+    if plan.total:
+        _core.apply_plan(plan, pedido["saida"], **pedido.get("opcoes", {}))
+    return {"ok": True, "total": plan.total, "contagens": plan.contagens}
+
+
+class _Tratador(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for linha in self.rfile:
+            if not linha.strip():
+                continue
+            try:
+                resposta = self.server.executar(json.loads(linha))
+            except Exception as e:
+                resposta = {"ok": False, "erro": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(resposta, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class Servidor(socketserver.UnixStreamServer):
+    """Atende até conexoes sockets ao mesmo tempo (threads) e roda o trabalho com PyMuPDF em
+    workers processos de um worker cada: os pedidos de um documento vão sempre ao mesmo processo
+    (um de cada vez, com o índice dele no LRU desse processo); documentos diferentes rodam em
+    paralelo. O LRU de maximo_documentos índices é dividido entre os processos.
+    """
+
+    allow_reuse_address = False
+
+    def __init__(
+        self,
+        caminho: str,
+        workers: int = WORKERS_PADRAO,
+        maximo_documentos: int = MAXIMO_DOCUMENTOS_PADRAO,
+        conexoes: int = CONEXOES_PADRAO,
+    ):
+        from concurrent.futures import ThreadPoolExecutor
+        self._maximo_por_processo = max(1, -(-maximo_documentos // workers))
+        self._trava_processos = threading.Lock()
+        self._processos = [self._novo_processo() for _ in range(workers)]
+        self.pool = ThreadPoolExecutor(max_workers=conexoes, thread_name_prefix="markme")
+        super().__init__(caminho, _Tratador)
+
+    def server_bind(self) -> None:
+        # O socket já nasce só do dono: um chmod depois do bind deixaria outro usuário conectar antes
+        anterior = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(anterior)
+
+    def _novo_processo(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # spawn: o servidor já tem threads rodando; o core é importado pelo processo ao iniciar
+        processo = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_iniciar_processo, initargs=(self._maximo_por_processo,),
+        )
+        processo.submit(_documentos_em_memoria)  # já carrega o PyMuPDF, antes do primeiro pedido
+        return processo
+
+    def _no_processo(self, entrada: str, funcao, *args):
+        """Roda funcao no processo do documento; recria o processo se ele morreu."""
+        from concurrent.futures.process import BrokenProcessPool
+        i = hash(entrada) % len(self._processos)
+        with self._trava_processos:
+            processo = self._processos[i]
+        try:
+            return processo.submit(funcao, *args).result()
+        except BrokenProcessPool:
+            with self._trava_processos:
+                if self._processos[i] is processo:
+                    self._processos[i] = self._novo_processo()
+            raise
+
+    def process_request(self, request, client_address) -> None:
+        self.pool.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        for processo in self._processos:
+            processo.shutdown(wait=True, cancel_futures=True)
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+    def executar(self, pedido: dict) -> dict:
+        """Executa um pedido do protocolo (ver o docstring do módulo)."""
+        op = pedido.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "processos": len(self._processos)}
+        if op in ("count", "mark"):
+            return self._no_processo(pedido["entrada"], _executar_pdf, pedido)
+        return {"ok": False, "erro": f"op desconhecida: {op!r}"}
+
+
+def _em_uso(caminho: str) -> str | None:
+    """Por que caminho não serve para o servidor (já há um servidor nele ou não é um socket); None
+    se estiver livre. Remove o socket abandonado, mas nunca outro tipo de arquivo.
+    """
+    try:
+        modo = os.lstat(caminho).st_mode
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISSOCK(modo):
+        return f"{caminho} já existe e não é um socket"
+    if enviar({"op": "ping"}, caminho) is not None:
+        return f"já há um servidor em {caminho}"
+    os.remove(caminho)
+    return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    """mark serve: roda o servidor até Ctrl+C / SIGTERM."""
+    parser = argparse.ArgumentParser(
+        prog="mark serve",
+        description="Servidor local do Mark.me: mantém o PyMuPDF e os índices de texto em memória.",
+    )
+    parser.add_argument("--socket", metavar="CAMINHO", help=f"Socket Unix (padrão: {ENV_SOCKET} ou markme-<uid>.sock)")
+    parser.add_argument(
+        "--workers", type=int, default=WORKERS_PADRAO, metavar="N", help="Processos que rodam o PyMuPDF (documentos em paralelo)",
+    )
+    parser.add_argument(
+        "--connections", type=int, default=CONEXOES_PADRAO, metavar="N", help="Conexões atendidas ao mesmo tempo",
+    )
+    parser.add_argument(
+        "--max-docs",
+        type=int,
+        default=MAXIMO_DOCUMENTOS_PADRAO,
+        metavar="N",
+        help="Documentos com índice de texto mantido em memória (LRU)",
+    )
+    args = parser.parse_args(argv)
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("Erro: mark serve precisa de sockets Unix.", file=sys.stderr)
+        return 1
+    caminho = caminho_socket(args.socket)
+    ocupado = _em_uso(caminho)
+    if ocupado:
+        print(f"Erro: {ocupado}", file=sys.stderr)
+        return 1
+    servidor = Servidor(
+        caminho, workers=max(1, args.workers), maximo_documentos=max(1, args.max_docs),
+        conexoes=max(1, args.connections),
+    )
+    print(f"Servindo em {caminho} (Ctrl+C para parar)", file=sys.stderr)
+    try:
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=servidor.shutdown).start())
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
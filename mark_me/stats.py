@@ -0,0 +1,94 @@
+"""
+Mark.me - Estatísticas de execução: tempo por fase e por página, ocorrências e anotações.
+
+Passe um Estatisticas em stats= nas funções do core para medir; sem ele (None), o core não mede
+nada. Fases usadas pelo core: abrir, busca, cache, indexacao, marcas, anotacao, gravacao.
+"""
+import time
+from contextlib import contextmanager
+
+
+class Estatisticas:
+    """Acumula tempos (segundos) e contagens; ao_medir(fase, pagina, segundos) é chamado a cada medida.
+
+    pagina é None para medidas do documento inteiro (ex.: abrir, gravacao). Em série, ao_medir é
+    chamado assim que cada página termina; com workers, os tempos por página vêm dos processos
+    filhos (a cada faixa concluída, via mesclar) e a soma das fases pode passar do tempo de parede.
+    """
+
+    def __init__(self, ao_medir=None):
+        self.fases: dict[str, float] = {}
+        self.paginas: dict[int, dict[str, float]] = {}
+        self.contagens: dict[str, int] = {}
+        self.ao_medir = ao_medir
+
+    def __getstate__(self):
+        # O callback fica no processo que criou o objeto
+        return {**self.__dict__, "ao_medir": None}
+
+    def medir(self, fase: str, segundos: float, pagina: int | None = None) -> None:
+        self.fases[fase] = self.fases.get(fase, 0.0) + segundos
+        if pagina is not None:
+            por_pagina = self.paginas.setdefault(pagina, {})
+            por_pagina[fase] = por_pagina.get(fase, 0.0) + segundos
+        if self.ao_medir:
+            self.ao_medir(fase, pagina, segundos)
+
+    def contar(self, nome: str, n: int, pagina: int | None = None) -> None:
+        self.contagens[nome] = self.contagens.get(nome, 0) + n
+        if pagina is not None:
+            por_pagina = self.paginas.setdefault(pagina, {})
+            por_pagina[nome] = por_pagina.get(nome, 0) + n
+
+    @contextmanager
+    def fase(self, nome: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.medir(nome, time.perf_counter() - inicio)
+
+    def mesclar(self, outra: "Estatisticas") -> None:
+        """Soma as medidas de outra vinda de um processo filho (worker); o callback recebe as de página."""
+        for fase, segundos in outra.fases.items():
+            self.fases[fase] = self.fases.get(fase, 0.0) + segundos
+        for nome, n in outra.contagens.items():
+            self.contagens[nome] = self.contagens.get(nome, 0) + n
+        for numero, medidas in sorted(outra.paginas.items()):
+            destino = self.paginas.setdefault(numero, {})
+            for nome, valor in medidas.items():
+                destino[nome] = destino.get(nome, 0) + valor
+                if self.ao_medir and isinstance(valor, float):
+                    self.ao_medir(nome, numero, valor)
+
+    def como_dict(self) -> dict:
+        return {
+            "fases": {fase: round(s, 6) for fase, s in self.fases.items()},
+            "contagens": dict(self.contagens),
+            "paginas": {
+                str(numero + 1): {k: round(v, 6) if isinstance(v, float) else v for k, v in medidas.items()}
+                for numero, medidas in sorted(self.paginas.items())
+            },
+        }
+
+    def resumo_texto(self, mais_lentas: int = 5) -> str:
+        """Tabela das fases e das páginas mais lentas (números de página a partir de 1)."""
+        linhas = ["Perfil por fase:"]
+        for fase, segundos in self.fases.items():
+            linhas.append(f"  {fase:<12} {segundos:>9.3f}s")
+        linhas.append(f"  {'soma':<12} {sum(self.fases.values()):>9.3f}s")
+        for nome, n in self.contagens.items():
+            linhas.append(f"  {nome:<12} {n:>9}")
+        ranking = sorted(
+            self.paginas.items(),
+            key=lambda item: sum(v for v in item[1].values() if isinstance(v, float)),
+            reverse=True,
+        )[:mais_lentas]
+        if ranking:
+            linhas.append(f"Páginas mais lentas (top {len(ranking)}):")
+            for numero, medidas in ranking:
+                detalhes = ", ".join(
+                    f"{k} {v:.3f}s" if isinstance(v, float) else f"{k} {v}" for k, v in medidas.items()
+                )
+                linhas.append(f"  p. {numero + 1}: {detalhes}")
+        return "\n".join(linhas)
@@ -0,0 +1,159 @@
+"""
+Mark.me - Ocorrências de uma busca guardadas em colunas (arrays tipados), em vez de um fitz.Rect
+por ocorrência: página (int32), termo (índice em termos, uint16/uint32) e retângulo (4 float32:
+x0, y0, x1, y1). São ~22 bytes por ocorrência, sem objetos Python para o coletor de lixo, e a
+tabela vai para outro processo (workers, GUI) como alguns blocos de bytes.
+
+As linhas ficam em ordem de página; os fitz.Rect só são criados para a página que está sendo
+lida (da_pagina), por exemplo ao anotá-la. Com NumPy instalado, como_numpy() dá as colunas como
+arrays sem cópia.
+"""
+from array import array
+from collections import Counter
+from itertools import groupby
+from collections.abc import Container, Iterable, Iterator, Mapping, Sequence
+
+import fitz  # PyMuPDF
+
+
+class TabelaOcorrencias:
+    """Ocorrências em colunas: pagina[i], termo[i] (índice em termos) e coords[4 * i:4 * i + 4].
+
+    Páginas entram em ordem crescente (acrescentar, estender); termos repetidos contam uma vez.
+    """
+    __slots__ = ("termos", "pagina", "termo", "coords", "_ids", "_faixas")
+
+    def __init__(self, termos: Iterable[str]):
+        self.termos = list(dict.fromkeys(termos))
+        self._ids = {termo: i for i, termo in enumerate(self.termos)}
+        self.pagina = array("i")
+        self.termo = array("H" if len(self.termos) <= 0xFFFF else "I")
+        self.coords = array("f")
+        self._faixas: dict[int, tuple[int, int]] = {}  # página -> (primeira linha, fim)
+
+    def __getstate__(self):
+        return (self.termos, self.pagina, self.termo, self.coords)
+
+    def __setstate__(self, estado):
+        self.termos, self.pagina, self.termo, self.coords = estado
+        self._ids = {termo: i for i, termo in enumerate(self.termos)}
+        self._faixas = {}
+        inicio = 0
+        for numero, linhas in groupby(self.pagina):
+            fim = inicio + sum(1 for _ in linhas)
+            self._faixas[numero] = (inicio, fim)
+            inicio = fim
+
+    def __len__(self) -> int:
+        return len(self.termo)
+
+    def _seguinte(self, numero: int) -> None:
+        if self.pagina and numero <= self.pagina[-1]:
+            raise ValueError(f"página {numero} fora de ordem (última: {self.pagina[-1]})")
+
+    def acrescentar(self, numero: int, achados: Mapping[str, Iterable[Sequence[float]]]) -> None:
+        """Acrescenta as ocorrências {termo: [retângulos]} da página numero (depois das anteriores)."""
+        self._seguinte(numero)
+        antes = len(self.termo)
+        for termo, rects in achados.items():
+            id_termo = self._ids[termo]
+            n = len(self.coords)
+            for rect in rects:
+                self.coords.extend(rect)
+            self.termo.extend([id_termo] * ((len(self.coords) - n) // 4))
+        if len(self.termo) > antes:
+            self.pagina.extend([numero] * (len(self.termo) - antes))
+            self._faixas[numero] = (antes, len(self.termo))
+
+    def estender(self, outra: "TabelaOcorrencias") -> None:
+        """Acrescenta as linhas de outra tabela (mesmos termos), de páginas depois das desta."""
+        if outra.termos != self.termos:
+            raise ValueError("tabelas com termos diferentes")
+        if outra.pagina:
+            self._seguinte(outra.pagina[0])
+            antes = len(self.termo)
+            self.pagina.extend(outra.pagina)
+            self.termo.extend(outra.termo)
+            self.coords.extend(outra.coords)
+            for numero, (inicio, fim) in outra.faixas().items():
+                self._faixas[numero] = (antes + inicio, antes + fim)
+
+    def faixas(self) -> dict[int, tuple[int, int]]:
+        """{página: (primeira linha, fim)} das páginas com ocorrência, em ordem."""
+        return self._faixas
+
+    def linhas(self, numero: int | None = None) -> Iterator[tuple[int, str, float, float, float, float]]:
+        """(página, termo, x0, y0, x1, y1) de cada ocorrência (só da página numero, se informada),
+        sem criar fitz.Rect."""
+        if numero is None:
+            pagina, termo, coords = self.pagina, self.termo, self.coords
+        else:
+            inicio, fim = self._faixas.get(numero, (0, 0))
+            pagina, termo, coords = self.pagina[inicio:fim], self.termo[inicio:fim], self.coords[4 * inicio:4 * fim]
+        return zip(pagina, map(self.termos.__getitem__, termo), *[iter(coords)] * 4)
+
+    def da_pagina(self, numero: int) -> dict[str, list[fitz.Rect]]:
+        """{termo: [retângulos]} da página, na ordem em que foram acrescentados ({} sem ocorrência)."""
+        achados: dict[str, list[fitz.Rect]] = {}
+        for _, termo, x0, y0, x1, y1 in self.linhas(numero):
+            achados.setdefault(termo, []).append(fitz.Rect(x0, y0, x1, y1))
+        return achados
+
+    def contagens(self) -> dict[str, int]:
+        """Número de ocorrências por termo (na ordem de termos), lido só da coluna de termos."""
+        por_id = Counter(self.termo)
+        return {termo: por_id[i] for i, termo in enumerate(self.termos)}
+
+    def por_pagina(self) -> dict[int, int]:
+        """Número de ocorrências por página com ocorrência."""
+        return {numero: fim - inicio for numero, (inicio, fim) in self.faixas().items()}
+
+    def filtrar(self, paginas: Container[int] | None = None, termos: Container[str] | None = None) -> "TabelaOcorrencias":
+        """Nova tabela (mesmos termos e ids) só com as linhas dessas páginas e desses termos."""
+        nova = TabelaOcorrencias(self.termos)
+        ids = None if termos is None else {i for i, termo in enumerate(self.termos) if termo in termos}
+        for numero, (inicio, fim) in self.faixas().items():
+            if paginas is not None and numero not in paginas:
+                continue
+            for i in range(inicio, fim):
+                if ids is None or self.termo[i] in ids:
+                    nova.termo.append(self.termo[i])
+                    nova.coords.extend(self.coords[4 * i:4 * i + 4])
+            if len(nova.termo) > len(nova.pagina):
+                nova._faixas[numero] = (len(nova.pagina), len(nova.termo))
+                nova.pagina.extend([numero] * (len(nova.termo) - len(nova.pagina)))
+        return nova
+
+    def como_numpy(self) -> dict:
+        """Colunas como arrays NumPy sem cópia: pagina (n,), termo (n,) e retangulos (n, 4).
+
+        Levanta ImportError se o NumPy não estiver instalado (ele não é dependência do Mark.me).
+        """
+        import numpy as np
+        return {
+            "pagina": np.frombuffer(self.pagina, dtype=np.int32),
+            "termo": np.frombuffer(self.termo, dtype=np.uint16 if self.termo.typecode == "H" else np.uint32),
+            "retangulos": np.frombuffer(self.coords, dtype=np.float32).reshape(-1, 4),
+        }
+
+
+class VistaPaginas(Mapping):
+    """{página: {termo: [retângulos]}} de uma tabela, montado página a página só quando lido."""
+    __slots__ = ("_tabela",)
+
+    def __init__(self, tabela: TabelaOcorrencias):
+        self._tabela = tabela
+
+    def __getitem__(self, numero: int) -> dict[str, list[fitz.Rect]]:
+        if numero not in self._tabela.faixas():
+            raise KeyError(numero)
+        return self._tabela.da_pagina(numero)
+
+    def __contains__(self, numero) -> bool:
+        return numero in self._tabela.faixas()
+
+    def __iter__(self):
+        return iter(self._tabela.faixas())
+
+    def __len__(self) -> int:
+        return len(self._tabela.faixas())
@@ -0,0 +1,66 @@
+"""
+Mark.me - Usados por vários testes: o caminho simples de referência, a comparação de PDFs marcados e um Tk de mentira.
+"""
+import time
+
+import fitz  # PyMuPDF
+
+from mark_me.core import AUTOR_MARCAS, MatchPlan, hex_to_rgb_normalized
+
+
+def busca_por_termo(path, termos: list[str]) -> dict[int, dict[str, list[fitz.Rect]]]:
+    """Referência: uma chamada search_for por termo e página, sem TextPage compartilhada."""
+    with fitz.open(path) as doc:
+        return {pagina.number: {termo: pagina.search_for(termo) for termo in termos} for pagina in doc}
+
+
+def destacar_por_termo(path, saida, pares: list[tuple[str, str]]) -> None:
+    """Referência: marca cada search_for na ordem dos pares, como o Mark.me fazia antes das otimizações."""
+    with fitz.open(path) as doc:
+        for pagina in doc:
+            for termo, cor in pares:
+                for rect in pagina.search_for(termo):
+                    annot = pagina.add_highlight_annot(rect)
+                    annot.set_colors(stroke=hex_to_rgb_normalized(cor))
+                    annot.update()
+        doc.save(saida)
+
+
+def linhas(plan: MatchPlan) -> list[tuple]:
+    """(página, termo, x0, y0, x1, y1) de cada ocorrência, em ordem."""
+    return [(numero, termo, *rect) for numero, achados in plan.paginas.items() for termo, rects in achados.items() for rect in rects]
+
+
+def anotacoes(path) -> list[tuple]:
+    """(página, tipo, vértices, cor) de todas as anotações, para comparar saídas."""
+    with fitz.open(path) as doc:
+        return [
+            (pagina.number, annot.type[0], tuple(annot.vertices or ()), annot.colors.get("stroke"))
+            for pagina in doc for annot in pagina.annots()
+        ]
+
+
+def marcas(path) -> set[tuple]:
+    """(página, termo, cor, retângulo) de cada marca do Mark.me no PDF."""
+    with fitz.open(path) as doc:
+        return {
+            (pagina.number, annot.info["subject"], tuple(round(c, 3) for c in annot.colors["stroke"]),
+             tuple(round(v, 2) for v in annot.rect))
+            for pagina in doc for annot in pagina.annots() if annot.info["title"] == AUTOR_MARCAS
+        }
+
+
+class RaizFalsa:
+    """Só o after() do Tk: guarda as chamadas para o teste rodá-las."""
+
+    def __init__(self):
+        self.pendentes = []
+
+    def after(self, _ms: int, funcao) -> None:
+        self.pendentes.append(funcao)
+
+    def rodar(self, limite: float = 60.0) -> None:
+        fim = time.monotonic() + limite
+        while self.pendentes and time.monotonic() < fim:
+            time.sleep(0.01)
+            self.pendentes.pop(0)()
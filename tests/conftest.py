@@ -0,0 +1,37 @@
+"""
+Mark.me - Fixtures dos testes: PDFs sintéticos pequenos (os mesmos geradores dos benchmarks).
+"""
+import pytest
+
+from benchmarks.sintetico import gerar_pdf, nomes_termos
+
+PAGINAS = 12
+
+
+@pytest.fixture(scope="session")
+def termos() -> list[str]:
+    return nomes_termos(5)
+
+
+@pytest.fixture(scope="session")
+def pares(termos) -> list[tuple[str, str]]:
+    cores = ("#ffff00", "#00ff00", "#ff0000", "#00ffff", "#ff00ff")
+    return list(zip(termos, cores))
+
+
+@pytest.fixture(scope="session")
+def pdf(tmp_path_factory, termos) -> str:
+    """PDF de 12 páginas com os termos espalhados (densidade 3%)."""
+    return gerar_pdf(str(tmp_path_factory.mktemp("pdf") / "sintetico.pdf"), paginas=PAGINAS, palavras_por_pagina=200, termos=termos, densidade=0.03)
+
+
+@pytest.fixture(scope="session")
+def pdf_justificado(tmp_path_factory) -> str:
+    """PDF de 3 páginas com texto justificado: espaços largos entre as palavras."""
+    return gerar_pdf(str(tmp_path_factory.mktemp("pdf") / "justificado.pdf"), paginas=3, palavras_por_pagina=200, justificado=True)
+
+
+@pytest.fixture(scope="session")
+def termos_justificado() -> list[str]:
+    """Termos do texto de pdf_justificado, vários atravessando o espaço entre duas palavras."""
+    return ["a d", "e l", "o r", "a", "de", "ra ti"]
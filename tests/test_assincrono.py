@@ -0,0 +1,103 @@
+"""
+Mark.me - API assíncrona: mesmo resultado das funções do core, progresso e cancelamento da tarefa.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from mark_me.assincrono import PoolAssincrono, Progresso, contar_ocorrencias_multi_async, destacar_pdf_multi_async
+from mark_me.core import contar_ocorrencias_multi, destacar_pdf_multi
+from tests.comum import anotacoes
+
+
+class _ProgressoPreso(Progresso):
+    """Segura a thread de trabalho na primeira página até o teste soltar."""
+
+    def __init__(self):
+        super().__init__()
+        self.chegou = threading.Event()
+        self.soltar = threading.Event()
+
+    def __call__(self, fase: str, feitas: int, total: int) -> None:
+        super().__call__(fase, feitas, total)
+        if feitas == 1:
+            self.chegou.set()
+            self.soltar.wait(10)
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_async_igual_ao_core(pdf, termos, pares, tmp_path, kind):
+    async def cenario():
+        async with PoolAssincrono(kind=kind, max_concurrency=1 if kind == "thread" else 2) as pool:
+            contagens = await asyncio.gather(*(contar_ocorrencias_multi_async(pdf, termos, pool=pool) for _ in range(3)))
+            await destacar_pdf_multi_async(pdf, str(tmp_path / "async.pdf"), pares, pool=pool)
+        return contagens
+
+    assert asyncio.run(cenario()) == [contar_ocorrencias_multi(pdf, termos)] * 3
+    destacar_pdf_multi(pdf, str(tmp_path / "sync.pdf"), pares)
+    assert anotacoes(tmp_path / "async.pdf") == anotacoes(tmp_path / "sync.pdf")
+
+
+def test_loop_responde_com_50_tarefas(pdf, termos):
+    async def cenario():
+        atrasos = []
+        parar = asyncio.Event()
+
+        async def relogio():
+            while not parar.is_set():
+                inicio = time.perf_counter()
+                await asyncio.sleep(0.01)
+                atrasos.append(time.perf_counter() - inicio - 0.01)
+
+        tique = asyncio.create_task(relogio())
+        async with PoolAssincrono() as pool:
+            totais = await asyncio.gather(*(contar_ocorrencias_multi_async(pdf, termos, pool=pool) for _ in range(50)))
+        parar.set()
+        await tique
+        return totais, atrasos
+
+    totais, atrasos = asyncio.run(cenario())
+    assert totais == [contar_ocorrencias_multi(pdf, termos)] * 50
+    assert len(atrasos) > 5
+    assert max(atrasos) < 0.5, f"event loop parado por {max(atrasos):.3f}s"
+
+
+def test_progresso_termina_com_a_tarefa(pdf, termos):
+    async def cenario():
+        progresso = Progresso()
+        tarefa = asyncio.create_task(contar_ocorrencias_multi_async(pdf, termos, progress=progresso))
+        eventos = [evento async for evento in progresso]
+        await tarefa
+        return eventos
+
+    eventos = asyncio.run(cenario())
+    assert eventos[-1] == ("busca", 12, 12)
+
+
+def test_cancelar_tarefa_para_o_core(pdf, pares, tmp_path):
+    saida = tmp_path / "saida.pdf"
+
+    async def cenario():
+        loop = asyncio.get_running_loop()
+        async with PoolAssincrono() as pool:
+            progresso = _ProgressoPreso()
+            tarefa = asyncio.create_task(destacar_pdf_multi_async(pdf, str(saida), pares, pool=pool, progress=progresso))
+            await loop.run_in_executor(None, progresso.chegou.wait, 10)
+            tarefa.cancel()
+            await asyncio.sleep(0.1)  # a tarefa aciona o cancel= do core e espera a thread parar
+            progresso.soltar.set()
+            with pytest.raises(asyncio.CancelledError):
+                await tarefa
+            # A vaga foi liberada: a próxima tarefa roda
+            return await asyncio.wait_for(contar_ocorrencias_multi_async(pdf, ["termo000"], pool=pool), 30)
+
+    assert asyncio.run(cenario()) == contar_ocorrencias_multi(pdf, ["termo000"])
+    assert not saida.exists()
+
+
+@pytest.mark.parametrize("opcoes", [{"kind": "thread", "max_concurrency": 2}, {"kind": "fibra"}, {"max_concurrency": 0}])
+def test_pool_recusa_opcoes_invalidas(opcoes):
+    with pytest.raises(ValueError):
+        PoolAssincrono(**opcoes)
@@ -0,0 +1,111 @@
+"""
+Mark.me - atualizar_pdf_multi: as marcas ficam iguais às de refazer tudo a partir do original.
+"""
+import os
+import shutil
+import subprocess
+import sys
+
+import fitz  # PyMuPDF
+import pytest
+
+from mark_me.core import SemMarcas, atualizar_pdf_multi, destacar_pdf_multi
+from tests.comum import marcas
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def marcado(pdf, pares, tmp_path) -> str:
+    path = str(tmp_path / "marcado.pdf")
+    destacar_pdf_multi(pdf, path, pares[:4])
+    return path
+
+
+def _casos(pares):
+    base = pares[:4]
+    return {
+        "+1 termo": (base + [pares[4]], {"novos": [pares[4][0]]}),
+        "1 cor trocada": ([(base[0][0], "#0000ff")] + base[1:], {"recoloridos": [base[0][0]]}),
+        "-1 termo": (base[:-1], {"removidos": [base[-1][0]]}),
+        "tudo junto": ([(base[1][0], "#0000ff")] + base[2:] + [pares[4]], {
+            "novos": [pares[4][0]], "recoloridos": [base[1][0]], "removidos": [base[0][0]],
+        }),
+    }
+
+
+@pytest.mark.parametrize("caso", ["+1 termo", "1 cor trocada", "-1 termo", "tudo junto"])
+@pytest.mark.parametrize("no_proprio_arquivo", [True, False])
+def test_atualizar_igual_a_refazer_tudo(pdf, pares, marcado, tmp_path, caso, no_proprio_arquivo):
+    novos_pares, esperado = _casos(pares)[caso]
+    completo = str(tmp_path / "completo.pdf")
+    destacar_pdf_multi(pdf, completo, novos_pares)
+    saida = marcado if no_proprio_arquivo else str(tmp_path / "atualizado.pdf")
+    diferenca = atualizar_pdf_multi(marcado, saida, novos_pares)
+    assert marcas(saida) == marcas(completo)
+    for situacao in ("novos", "recoloridos", "removidos"):
+        assert getattr(diferenca, situacao) == esperado.get(situacao, [])
+    assert diferenca.mudou
+
+
+def test_atualizar_sem_mudanca_nao_grava(pares, marcado):
+    antes = os.path.getsize(marcado), os.path.getmtime(marcado)
+    diferenca = atualizar_pdf_multi(marcado, marcado, pares[:4])
+    assert not diferenca.mudou and diferenca.mantidos == [t for t, _ in pares[:4]]
+    assert (os.path.getsize(marcado), os.path.getmtime(marcado)) == antes
+
+
+def test_atualizar_em_memoria(pares, marcado, tmp_path):
+    caminho = str(tmp_path / "copia.pdf")
+    shutil.copyfile(marcado, caminho)
+    atualizar_pdf_multi(caminho, caminho, pares)
+    diferenca = atualizar_pdf_multi(marcado, None, pares, save_mode="fast")
+    (tmp_path / "memoria.pdf").write_bytes(diferenca.dados)
+    assert marcas(tmp_path / "memoria.pdf") == marcas(caminho)
+
+
+def test_atualizar_nao_mexe_em_outras_anotacoes(pares, marcado):
+    with fitz.open(marcado) as doc:
+        doc[0].add_text_annot((10, 10), "nota de outra pessoa")
+        doc.saveIncr()
+    atualizar_pdf_multi(marcado, marcado, [])
+    with fitz.open(marcado) as doc:
+        assert [annot.info["content"] for pagina in doc for annot in pagina.annots()] == ["nota de outra pessoa"]
+
+
+@pytest.mark.parametrize("save_mode", ["compact", "fast"])
+def test_atualizar_no_proprio_arquivo_regravando(pdf, pares, marcado, tmp_path, save_mode):
+    # O MuPDF não regrava a origem a não ser incrementalmente: troca por um temporário da pasta
+    completo = str(tmp_path / "completo.pdf")
+    destacar_pdf_multi(pdf, completo, pares)
+    diferenca = atualizar_pdf_multi(marcado, marcado, pares, save_mode=save_mode)
+    assert diferenca.mudou and marcas(marcado) == marcas(completo)
+    assert sorted(os.listdir(tmp_path)) == ["completo.pdf", "marcado.pdf"]
+
+
+def test_exigir_marcas_nao_grava(pdf, pares, tmp_path):
+    caminho = str(tmp_path / "original.pdf")
+    shutil.copyfile(pdf, caminho)
+    antes = open(caminho, "rb").read()
+    with pytest.raises(SemMarcas):
+        atualizar_pdf_multi(caminho, caminho, pares, require_marks=True)
+    assert open(caminho, "rb").read() == antes
+
+
+def test_cli_update_no_lugar(pdf, pares, marcado, tmp_path):
+    def mark(entrada, *opcoes):
+        return subprocess.run(
+            [sys.executable, "-m", "mark_me", "mark", entrada, "-t", pares[4][0], "--update", *opcoes],
+            cwd=_RAIZ, capture_output=True, text=True,
+        )
+    proc = mark(marcado, "--save-mode", "compact")
+    assert proc.returncode == 0, proc.stderr
+    assert pares[4][0] in {termo for _, termo, _, _ in marcas(marcado)}
+
+    original = str(tmp_path / "original.pdf")
+    shutil.copyfile(pdf, original)
+    antes = open(original, "rb").read()
+    proc = mark(original)
+    assert proc.returncode == 1 and "-o" in proc.stderr
+    assert open(original, "rb").read() == antes
+    assert mark(original, "-o", str(tmp_path / "novo.pdf")).returncode == 0
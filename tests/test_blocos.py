@@ -0,0 +1,96 @@
+"""
+Mark.me - Modo em blocos (chunk_pages / max_memory_mb): mesmo resultado da passada única, pico de memória estável.
+"""
+import os
+import random
+import subprocess
+import sys
+
+import fitz  # PyMuPDF
+import pytest
+
+from benchmarks.sintetico import gerar_pdf
+from mark_me import core
+from mark_me.core import apply_plan, find_matches, iter_matches
+from mark_me.stats import Estatisticas
+from tests.comum import anotacoes, linhas
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("limites", [{"chunk_pages": 1}, {"chunk_pages": 5}, {"max_memory_mb": 1}])
+def test_busca_em_blocos_igual_a_unica(pdf, pares, limites):
+    assert linhas(find_matches(pdf, pares, **limites)) == linhas(find_matches(pdf, pares))
+
+
+def test_iter_matches_em_blocos_igual_a_unica(pdf, termos):
+    assert list(iter_matches(pdf, termos, chunk_pages=4)) == list(iter_matches(pdf, termos))
+
+
+@pytest.mark.parametrize("limites", [{"chunk_pages": 1}, {"chunk_pages": 5}, {"max_memory_mb": 1}])
+def test_gravacao_em_blocos_mesmas_anotacoes(pdf, pares, tmp_path, limites):
+    plan = find_matches(pdf, pares)
+    unica, blocos = tmp_path / "unica.pdf", tmp_path / "blocos.pdf"
+    apply_plan(plan, str(unica))
+    apply_plan(plan, str(blocos), save_mode="incremental", **limites)
+    assert plan.total and len(anotacoes(unica)) == plan.total
+    assert anotacoes(blocos) == anotacoes(unica)
+
+
+def test_memoria_abaixo_do_processo_nao_fecha_bloco_por_pagina(pdf, pares, tmp_path, monkeypatch):
+    # O processo começa com 100 MB e cresce a cada medida: o limite de 1 MB vira os 100 do início
+    # e os blocos têm o mínimo de páginas, em vez de uma página (reabrir + gravar) cada
+    plan = find_matches(pdf, pares)
+    rss = iter(range(100, 10_000))
+    monkeypatch.setattr(core, "_rss_mb", lambda: next(rss))
+    stats = Estatisticas()
+    apply_plan(plan, str(tmp_path / "blocos.pdf"), save_mode="incremental", max_memory_mb=1, stats=stats)
+    assert stats.contagens["blocos"] == (len(plan.paginas) - 1) // core._MINIMO_PAGINAS_MEMORIA
+    apply_plan(plan, str(tmp_path / "unica.pdf"))
+    assert anotacoes(tmp_path / "blocos.pdf") == anotacoes(tmp_path / "unica.pdf")
+
+
+def test_gravacao_em_blocos_exige_incremental(pdf, pares, tmp_path):
+    plan = find_matches(pdf, pares)
+    with pytest.raises(ValueError):
+        apply_plan(plan, str(tmp_path / "saida.pdf"), save_mode="compact", chunk_pages=2)
+
+
+def _pdf_com_imagens(path: str, paginas: int, termos: list[str]) -> str:
+    """PDF com uma imagem própria por página: sem blocos, o que o MuPDF guarda cresce com o documento."""
+    rng = random.Random(0)
+    gerar_pdf(path + ".texto", paginas=paginas, termos=termos, densidade=0.002)
+    with fitz.open(path + ".texto") as doc:
+        for pagina in doc:
+            imagem = fitz.Pixmap(fitz.csGRAY, 300, 420, rng.randbytes(300 * 420), False)
+            pagina.insert_image(pagina.rect, pixmap=imagem, overlay=False)
+        doc.save(path)
+    os.remove(path + ".texto")
+    return path
+
+
+def _pico_kb(entrada: str, saida: str, pares: list[tuple[str, str]]) -> int:
+    """Pico de RSS (KB) de find_matches + apply_plan em blocos, num processo novo.
+
+    Lido de VmHWM no próprio filho: ru_maxrss (os.wait4, getrusage) herda o pico do pytest no
+    fork e no exec, e mascararia a diferença entre os tamanhos.
+    """
+    codigo = (
+        "from mark_me.core import apply_plan, find_matches\n"
+        f"plan = find_matches({entrada!r}, {pares!r}, chunk_pages=10)\n"
+        f"apply_plan(plan, {saida!r}, save_mode='incremental', chunk_pages=10)\n"
+        "with open('/proc/self/status') as f:\n"
+        "    print([linha.split()[1] for linha in f if linha.startswith('VmHWM:')][0])\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", codigo], cwd=_RAIZ, capture_output=True, text=True, check=True)
+    return int(proc.stdout.split()[-1])
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="VmHWM só existe no Linux")
+def test_pico_em_blocos_nao_cresce_com_o_documento(pares, tmp_path):
+    termos = [termo for termo, _ in pares]
+    picos = []
+    for paginas in (40, 160):
+        entrada = _pdf_com_imagens(str(tmp_path / f"entrada_{paginas}.pdf"), paginas, termos)
+        picos.append(_pico_kb(entrada, str(tmp_path / f"saida_{paginas}.pdf"), pares))
+    assert picos[1] <= picos[0] * 1.15, f"pico em blocos: {picos[0]} KB com 40 páginas, {picos[1]} KB com 160"
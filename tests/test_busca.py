@@ -0,0 +1,41 @@
+"""
+Mark.me - Busca com uma TextPage por página vs. search_for termo a termo.
+"""
+import pytest
+
+from mark_me.core import contar_ocorrencias, contar_ocorrencias_multi, destacar_pdf_multi
+
+from tests.comum import anotacoes, busca_por_termo, destacar_por_termo
+
+
+def test_contagem_igual_a_search_for(pdf, termos):
+    referencia = busca_por_termo(pdf, termos)
+    esperado = sum(len(rects) for achados in referencia.values() for rects in achados.values())
+    assert esperado > 0
+    assert contar_ocorrencias_multi(pdf, termos) == esperado
+    for termo in termos:
+        assert contar_ocorrencias(pdf, termo) == sum(len(achados[termo]) for achados in referencia.values())
+
+
+def test_termo_repetido_conta_de_novo(pdf, termos):
+    # Como no original (uma search_for por termo da lista): repetir um termo soma as ocorrências de novo
+    um = contar_ocorrencias_multi(pdf, termos[:1])
+    assert um > 0
+    assert contar_ocorrencias_multi(pdf, [termos[0], termos[0], f" {termos[0]} "]) == 3 * um
+    assert contar_ocorrencias_multi(pdf, [termos[0]] * 2, dictionary=True) == 2 * um
+
+
+def test_anotacoes_iguais_a_search_for(pdf, pares, tmp_path):
+    destacar_por_termo(pdf, tmp_path / "referencia.pdf", pares)
+    destacar_pdf_multi(pdf, str(tmp_path / "marcado.pdf"), pares)
+    esperado = anotacoes(tmp_path / "referencia.pdf")
+    assert esperado
+    assert anotacoes(tmp_path / "marcado.pdf") == esperado
+
+
+def test_termo_ausente_e_termos_vazios(pdf, tmp_path):
+    assert contar_ocorrencias_multi(pdf, ["inexistente"]) == 0
+    destacar_pdf_multi(pdf, str(tmp_path / "vazio.pdf"), [("inexistente", "#ffff00")])
+    assert anotacoes(tmp_path / "vazio.pdf") == []
+    with pytest.raises(ValueError):
+        destacar_pdf_multi(pdf, str(tmp_path / "nada.pdf"), [("  ", "#ffff00")])
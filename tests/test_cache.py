@@ -0,0 +1,149 @@
+"""
+Mark.me - Cache em disco dos índices: acerto e falta, invalidação, limite de tamanho, entradas estragadas e formato.
+"""
+import os
+import pickle
+import zlib
+from array import array
+
+import fitz  # PyMuPDF
+import pytest
+
+from mark_me import cache as modulo_cache
+from mark_me import core
+from mark_me.cache import CacheIndices
+from mark_me.core import find_matches
+from mark_me.index import CAMPOS_CAIXA, IndicePagina
+
+
+def _arredondadas(plan) -> list[tuple]:
+    return [
+        (n, termo, *(round(v, 1) for v in rect))
+        for n, achados in plan.paginas.items() for termo, rects in achados.items() for rect in rects
+    ]
+
+
+def _indices(pdf) -> list[IndicePagina]:
+    with fitz.open(pdf) as doc:
+        return [IndicePagina.da_textpage(pagina.get_textpage(flags=core._FLAGS_BUSCA)) for pagina in doc]
+
+
+def _sem_extrair(*_args, **_kwargs):
+    raise AssertionError("com o índice no cache, o PDF não deveria ser extraído de novo")
+
+
+def test_acerto_e_falta(pdf, pares, tmp_path, monkeypatch):
+    cache = CacheIndices(str(tmp_path / "cache"))
+    chave = cache.chave(pdf)
+    assert cache.obter(chave) is None
+    direto = find_matches(pdf, pares)
+    assert _arredondadas(find_matches(pdf, pares, cache_dir=cache)) == _arredondadas(direto)
+    indices = cache.obter(chave)
+    assert [ix.texto for ix in indices] == [ix.texto for ix in _indices(pdf)]
+    monkeypatch.setattr(core, "_indexar_intervalo", _sem_extrair)
+    assert _arredondadas(find_matches(pdf, pares, cache_dir=str(tmp_path / "cache"))) == _arredondadas(direto)
+
+
+def test_chave_muda_com_a_versao(pdf, tmp_path, monkeypatch):
+    cache = CacheIndices(str(tmp_path))
+    chave = cache.chave(pdf)
+    cache.gravar(chave, _indices(pdf))
+    monkeypatch.setattr(modulo_cache.fitz, "VersionBind", "0.0.0")
+    assert cache.chave(pdf) != chave
+    monkeypatch.undo()
+    monkeypatch.setattr(modulo_cache, "VERSAO_FORMATO", modulo_cache.VERSAO_FORMATO + 1)
+    assert cache.chave(pdf) != chave
+    # Uma entrada de outro formato gravada com a chave atual também é falta
+    assert cache.obter(chave) is None
+
+
+def test_limite_remove_os_menos_usados(tmp_path):
+    indices = [IndicePagina("x" * 2000 + "\n", array("f", [0.0] * CAMPOS_CAIXA * 2001))]
+    cache = CacheIndices(str(tmp_path), tamanho_maximo=1 << 30)
+    for i, chave in enumerate(("a", "b", "c")):
+        cache.gravar(chave, indices)
+        os.utime(cache._caminho(chave), (1000 + i, 1000 + i))
+    assert cache.obter("a") is not None  # "a" passa a ser a mais recente; "b" é a mais antiga
+    tamanho = os.path.getsize(cache._caminho("a"))
+    cache.tamanho_maximo = 3 * tamanho
+    cache.gravar("d", indices)
+    restantes = sorted(nome[:-len(".idx")] for nome in os.listdir(tmp_path) if nome.endswith(".idx"))
+    assert restantes == ["a", "c", "d"]
+
+
+@pytest.mark.parametrize("conteudo", [b"", b"lixo", None])
+def test_entrada_estragada_e_falta(pdf, tmp_path, conteudo):
+    cache = CacheIndices(str(tmp_path))
+    chave = cache.chave(pdf)
+    cache.gravar(chave, _indices(pdf))
+    caminho = cache._caminho(chave)
+    with open(caminho, "rb") as f:
+        inteiro = f.read()
+    with open(caminho, "wb") as f:
+        f.write(inteiro[: len(inteiro) // 2] if conteudo is None else conteudo)
+    assert cache.obter(chave) is None
+    assert not os.path.exists(caminho)
+
+
+@pytest.mark.parametrize("corte", [0, 6, 12, 20, -1])
+def test_entrada_truncada_por_dentro_e_falta(pdf, tmp_path, corte):
+    # Comprimido íntegro, mas o conteúdo para no meio do cabeçalho, de uma página ou sobra um byte
+    cache = CacheIndices(str(tmp_path))
+    chave = cache.chave(pdf)
+    cache.gravar(chave, _indices(pdf))
+    caminho = cache._caminho(chave)
+    with open(caminho, "rb") as f:
+        dados = zlib.decompress(f.read())
+    with open(caminho, "wb") as f:
+        f.write(zlib.compress(dados + b"x" if corte == -1 else dados[:corte]))
+    assert cache.obter(chave) is None
+    assert not os.path.exists(caminho)
+
+
+class _Explosivo:
+    def __init__(self, marca):
+        self.marca = marca
+
+    def __reduce__(self):
+        return (open, (self.marca, "w"))
+
+
+def test_entrada_pickle_nao_e_executada(tmp_path):
+    # Uma entrada no formato antigo (ou forjada) é só um arquivo estragado: pickle nunca é lido
+    cache = CacheIndices(str(tmp_path / "cache"))
+    marca = tmp_path / "executou"
+    os.makedirs(cache.pasta)
+    with open(cache._caminho("x"), "wb") as f:
+        f.write(zlib.compress(pickle.dumps((modulo_cache.VERSAO_FORMATO, [_Explosivo(str(marca))]))))
+    assert cache.obter("x") is None
+    assert not marca.exists()
+
+
+def test_formato_preserva_texto_e_caixas(tmp_path):
+    indices = [
+        IndicePagina("Ação ﬁ \U0001f600\n", array("f", [float(i) for i in range(CAMPOS_CAIXA * 9)])),
+        IndicePagina("", array("f")),
+    ]
+    cache = CacheIndices(str(tmp_path))
+    cache.gravar("x", indices)
+    with open(cache._caminho("x"), "rb") as f:
+        assert zlib.decompress(f.read()).startswith(b"MKIX")
+    lidos = cache.obter("x")
+    assert [(ix.texto, ix.caixas) for ix in lidos] == [(ix.texto, ix.caixas) for ix in indices]
+
+
+def test_justificado_igual_ao_search_for(pdf_justificado, termos_justificado, tmp_path):
+    # Os espaços largos do texto justificado separam os retângulos do MuPDF; o índice separa igual
+    pares = [(termo, "#ffff00") for termo in termos_justificado]
+    with fitz.open(pdf_justificado) as doc:
+        esperado = {
+            (pagina.number, termo): [tuple(r) for r in pagina.search_for(termo)]
+            for pagina in doc for termo in termos_justificado
+        }
+    for cache_dir in (None, str(tmp_path / "cache"), str(tmp_path / "cache")):  # sem cache, gravando, lendo
+        plan = find_matches(pdf_justificado, pares, cache_dir=cache_dir)
+        obtido = {(n, termo): [tuple(r) for r in rects] for n, achados in plan.paginas.items() for termo, rects in achados.items()}
+        assert obtido == {chave: rects for chave, rects in esperado.items() if rects}
+    contagens = core.contar_nos_indices(_indices(pdf_justificado), termos_justificado)
+    assert contagens == {termo: sum(len(esperado[n, termo]) for n in range(3)) for termo in termos_justificado}
+    assert contagens["a d"] > 0
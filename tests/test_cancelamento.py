@@ -0,0 +1,139 @@
+"""
+Mark.me - Cancelamento (cancel=): a busca para com Cancelado e a saída não é gravada.
+"""
+import queue
+import threading
+
+import pytest
+
+from mark_me.core import (
+    Cancelado, apply_plan, contar_ocorrencias_multi, destacar_pdf_multi, executar_com_progresso, find_matches,
+)
+from tests.comum import RaizFalsa
+
+
+def _cancelar_em(evento: threading.Event, fase: str, feitas: int):
+    """progress= que aciona evento quando a fase chega a feitas páginas."""
+    def progress(f: str, n: int, total: int) -> None:
+        if f == fase and n >= feitas:
+            evento.set()
+    return progress
+
+
+def test_progresso_para_outro_processo(pdf, termos):
+    # O mesmo envio limitado serve à GUI e ao PoolAssincrono
+    fila = queue.Queue()
+    total = executar_com_progresso(contar_ocorrencias_multi, (pdf, termos), {}, None, fila)
+    assert total == contar_ocorrencias_multi(pdf, termos)
+    eventos = [fila.get_nowait() for _ in range(fila.qsize())]
+    assert eventos[0] == ("progresso", "busca", 1, 12)  # o primeiro evento nunca é segurado
+    assert eventos[-1] == ("progresso", "busca", 12, 12)
+    assert executar_com_progresso(contar_ocorrencias_multi, (pdf, termos), {}, None, None) == total
+
+
+class _EventoContado:
+    """Evento de outro processo de mentira: conta as consultas (cada uma seria uma ida e volta de IPC)."""
+
+    def __init__(self, acionado: bool = False):
+        self.consultas = 0
+        self.acionado = acionado
+
+    def is_set(self) -> bool:
+        self.consultas += 1
+        return self.acionado
+
+
+def test_cancelamento_de_outro_processo_consultado_com_limite(pdf, termos):
+    evento = _EventoContado()
+    executar_com_progresso(contar_ocorrencias_multi, (pdf, termos), {}, evento, None)
+    assert 1 <= evento.consultas < 12  # uma página por vez levaria uma consulta por página
+    with pytest.raises(Cancelado):
+        executar_com_progresso(contar_ocorrencias_multi, (pdf, termos), {}, _EventoContado(acionado=True), None)
+
+
+def test_busca_ja_cancelada(pdf, pares):
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(Cancelado):
+        find_matches(pdf, pares, cancel=cancel)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_busca_cancelada_no_meio(pdf, pares, workers):
+    cancel = threading.Event()
+    paginas = []
+
+    def progress(fase, feitas, total):
+        paginas.append(feitas)
+        _cancelar_em(cancel, "busca", 1)(fase, feitas, total)
+
+    with pytest.raises(Cancelado):
+        find_matches(pdf, pares, workers=workers, progress=progress, cancel=cancel)
+    assert max(paginas) < 12
+
+
+@pytest.mark.parametrize("opcoes", [{}, {"save_mode": "incremental"}, {"save_mode": "incremental", "chunk_pages": 2}])
+def test_gravacao_cancelada_nao_deixa_saida(pdf, pares, tmp_path, opcoes):
+    plan = find_matches(pdf, pares)
+    cancel = threading.Event()
+    saida = tmp_path / "saida.pdf"
+    with pytest.raises(Cancelado):
+        apply_plan(plan, str(saida), progress=_cancelar_em(cancel, "anotacao", 1), cancel=cancel, **opcoes)
+    assert not saida.exists()
+
+
+def test_destacar_cancelado_nao_deixa_saida(pdf, pares, tmp_path):
+    cancel = threading.Event()
+    saida = tmp_path / "saida.pdf"
+    with pytest.raises(Cancelado):
+        destacar_pdf_multi(pdf, str(saida), pares, progress=_cancelar_em(cancel, "busca", 3), cancel=cancel)
+    assert not saida.exists()
+
+
+@pytest.fixture
+def tarefa():
+    gui = pytest.importorskip("mark_me.gui")
+    raiz = RaizFalsa()
+    finais = []
+
+    def criar(args: tuple):
+        t = gui._TarefaEmProcesso(raiz, contar_ocorrencias_multi, args, lambda *_: None, lambda *msg: finais.append(msg))
+        return t, raiz, finais
+    return criar
+
+
+def test_tarefa_na_gui(tarefa, pdf, termos):
+    t, raiz, finais = tarefa((pdf, termos))
+    t._proc.join()
+    raiz.rodar()
+    assert finais == [("ok", contar_ocorrencias_multi(pdf, termos))]
+
+
+class _FilaAtrasada:
+    """Fila cuja primeira leitura vem vazia: a mensagem final chega depois de o Tk olhar a fila."""
+
+    def __init__(self, fila):
+        self._fila = fila
+        self._vazia = True
+
+    def get_nowait(self):
+        if self._vazia:
+            self._vazia = False
+            raise queue.Empty
+        return self._fila.get(timeout=5)
+
+
+def test_tarefa_na_gui_terminada_entre_leitura_e_verificacao(tarefa, pdf, termos):
+    t, raiz, finais = tarefa((pdf, termos))
+    t._proc.join()  # o processo já saiu quando o Tk vê a fila vazia
+    t._fila = _FilaAtrasada(t._fila)
+    raiz.rodar()
+    assert finais == [("ok", contar_ocorrencias_multi(pdf, termos))]
+
+
+def test_tarefa_na_gui_cancelada(tarefa, pdf, termos):
+    t, raiz, finais = tarefa((pdf, termos))
+    t.cancelar()
+    t._proc.join()
+    raiz.rodar()
+    assert finais == [("cancelado", None)]
@@ -0,0 +1,36 @@
+"""
+Mark.me - coalesce: menos anotações (várias quads cada), mesma área marcada.
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from mark_me.core import apply_plan, find_matches
+
+
+def _quads(path) -> tuple[int, set[tuple]]:
+    """(número de anotações, {(página, cor, quad)}) do PDF."""
+    n, quads = 0, set()
+    with fitz.open(path) as doc:
+        for pagina in doc:
+            for annot in pagina.annots():
+                n += 1
+                v = [tuple(round(c, 2) for c in p) for p in annot.vertices]
+                for i in range(0, len(v), 4):
+                    quads.add((pagina.number, tuple(annot.colors["stroke"]), tuple(v[i:i + 4])))
+    return n, quads
+
+
+def test_coalesce_mesma_area(pdf, pares, tmp_path):
+    plan = find_matches(pdf, pares)
+    resultado = {}
+    for modo in ("none", "line", "page"):
+        apply_plan(plan, str(tmp_path / f"{modo}.pdf"), coalesce=modo)
+        resultado[modo] = _quads(tmp_path / f"{modo}.pdf")
+    assert resultado["none"][0] == plan.total
+    assert resultado["page"][0] < resultado["line"][0] <= resultado["none"][0]
+    assert resultado["line"][1] == resultado["page"][1] == resultado["none"][1]
+
+
+def test_coalesce_invalido(pdf, pares, tmp_path):
+    with pytest.raises(ValueError):
+        apply_plan(find_matches(pdf, pares), str(tmp_path / "saida.pdf"), coalesce="bloco")
@@ -0,0 +1,74 @@
+"""
+Mark.me - Contagens ao vivo da GUI: nos índices dão o mesmo que find_matches; pedidos velhos, erros e queda do processo.
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from mark_me.core import contar_nos_indices, find_matches, indexar_pdf
+from tests.comum import RaizFalsa
+
+gui = pytest.importorskip("mark_me.gui")
+
+
+def test_contar_nos_indices_igual_a_find_matches(pdf, pares, termos):
+    indices = indexar_pdf(pdf)
+    assert contar_nos_indices(indices, termos + [" ", termos[0]]) == find_matches(pdf, pares).contagens
+    assert contar_nos_indices(indices, ["TERMO000"]) == {"TERMO000": find_matches(pdf, pares).contagens["termo000"]}
+
+
+@pytest.fixture
+def documento():
+    raiz, respostas, erros = RaizFalsa(), [], []
+    processo = gui._ProcessoDocumento(
+        raiz, lambda *r: respostas.append(r), lambda *_: None, lambda *e: erros.append(e),
+    )
+    yield processo, raiz, respostas, erros
+    processo.encerrar()
+
+
+def test_processo_do_documento_conta(documento, pdf, pares, termos):
+    processo, raiz, respostas, erros = documento
+    processo.pedir("indexar", pdf)
+    processo.pedir("contar", termos[:1])
+    processo.pedir("contar", termos)  # o pedido anterior fica velho: só este é respondido
+    raiz.rodar()
+    assert not erros
+    assert [tipo for tipo, _, _ in respostas] == ["indexar", "contar"]
+    assert len(respostas[0][2]) == 12
+    assert respostas[1][2] == find_matches(pdf, pares).contagens
+
+
+def test_indexacao_velha_e_abandonada(documento, pdf, tmp_path):
+    processo, raiz, respostas, erros = documento
+    processo.pedir("indexar", str(tmp_path / "nao_existe.pdf"))
+    processo.pedir("indexar", pdf)
+    raiz.rodar()
+    assert not erros
+    assert [tipo for tipo, _, _ in respostas] == ["indexar"]
+
+
+def test_processo_do_documento_relata_o_tipo_do_erro(documento, tmp_path):
+    processo, raiz, respostas, erros = documento
+    processo.pedir("indexar", str(tmp_path / "nao_existe.pdf"))
+    raiz.rodar()
+    assert [tipo for tipo, _ in erros] == ["indexar"] and not respostas
+
+
+def test_processo_do_documento_morto(documento, pdf):
+    processo, raiz, respostas, erros = documento
+    processo.pedir("indexar", pdf)
+    processo.encerrar()
+    raiz.rodar()
+    assert erros and erros[-1][0] is None
+
+
+@pytest.mark.parametrize("tipo, desliga_contagens", [
+    ("indexar", True), ("contar", True), (None, True), ("plano", False), ("renderizar", False),
+])
+def test_so_falha_de_contagem_desliga_contagens(tipo, desliga_contagens):
+    app = SimpleNamespace(_pares_plano=[("a", "#ffff00")], _contagem_falhou=mock.Mock())
+    gui.MarkMeApp._documento_falhou(app, tipo, "falhou")
+    assert app._contagem_falhou.called is desliga_contagens
+    assert (app._pares_plano is None) is (tipo == "plano")
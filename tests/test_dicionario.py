@@ -0,0 +1,62 @@
+"""
+Mark.me - Glossários: a busca em uma passada (dictionary=True) acha o mesmo que search_for.
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from mark_me.core import find_matches, iter_matches
+from mark_me.dicionario import ler_termos
+from tests.comum import linhas
+
+
+def _aproximado(plan) -> list[tuple]:
+    """Linhas do plano com os retângulos arredondados (o autômato usa as caixas dos caracteres).
+
+    Ordenadas: na página, o autômato gera na ordem do texto e search_for na ordem dos termos.
+    """
+    return sorted((n, termo, *(round(v, 1) for v in rect)) for n, termo, *rect in linhas(plan))
+
+
+def test_dicionario_igual_a_search_for(pdf, pares):
+    por_termo = find_matches(pdf, pares)
+    assert por_termo.total
+    assert _aproximado(find_matches(pdf, pares, dictionary=True)) == _aproximado(por_termo)
+
+
+def test_dicionario_com_termos_ausentes(pdf, pares):
+    glossario = pares + [(f"ausente{i:04d} glossario", "#ffff00") for i in range(500)]
+    assert find_matches(pdf, glossario, dictionary=True).contagens == find_matches(pdf, glossario).contagens
+
+
+def test_dicionario_com_cache_e_workers(pdf, pares, tmp_path):
+    esperado = _aproximado(find_matches(pdf, pares, dictionary=True))
+    assert _aproximado(find_matches(pdf, pares, dictionary=True, workers=3)) == esperado
+    for _ in range(2):  # falta e acerto no cache
+        assert _aproximado(find_matches(pdf, pares, dictionary=True, cache_dir=str(tmp_path))) == esperado
+
+
+def test_iter_matches_dicionario(pdf, termos):
+    com, sem = list(iter_matches(pdf, termos, dictionary=True)), list(iter_matches(pdf, termos))
+    assert [(o.pagina, o.termo) for o in com] == [(o.pagina, o.termo) for o in sem]
+
+
+@pytest.fixture
+def pdf_sobreposto(tmp_path) -> str:
+    path = str(tmp_path / "sobreposto.pdf")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "de nova york para york")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def test_dicionario_sobreposicao_mais_longa_vence(pdf_sobreposto):
+    pares = [("nova york", "#ffff00"), ("york", "#00ff00")]
+    assert find_matches(pdf_sobreposto, pares, dictionary=True).contagens == {"nova york": 1, "york": 1}
+    assert find_matches(pdf_sobreposto, pares).contagens == {"nova york": 1, "york": 2}
+
+
+def test_ler_termos(tmp_path):
+    csv = tmp_path / "termos.csv"
+    csv.write_text('term,color\nalfa,#ff0000\n\n"beta, gama"\ndelta,00ff00\n', encoding="utf-8")
+    assert ler_termos(str(csv)) == [("alfa", "#ff0000"), ("beta, gama", "#ffff00"), ("delta", "#00ff00")]
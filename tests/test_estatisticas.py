@@ -0,0 +1,54 @@
+"""
+Mark.me - Estatisticas: em série, ao_medir chega a cada página; com workers, ao juntar as faixas; e mark --profile-json.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mark_me.core import destacar_pdf_multi, find_matches
+from mark_me.stats import Estatisticas
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_ao_medir_em_serie_chega_pagina_a_pagina(pdf, pares):
+    eventos = []
+    stats = Estatisticas(ao_medir=lambda fase, pagina, s: eventos.append(("medida", fase, pagina)))
+    find_matches(pdf, pares, stats=stats, progress=lambda fase, feitas, total: eventos.append(("progresso", fase, feitas)))
+    busca = [e for e in eventos if e[1] == "busca"]
+    # Cada página é medida antes de o progresso contá-la como feita
+    assert busca == [evento for n in range(12) for evento in (("medida", "busca", n), ("progresso", "busca", n + 1))]
+
+
+def test_ao_medir_com_workers_recebe_todas_as_paginas(pdf, pares):
+    paginas = []
+    stats = Estatisticas(ao_medir=lambda fase, pagina, s: paginas.append(pagina) if fase == "busca" else None)
+    find_matches(pdf, pares, workers=3, stats=stats)
+    assert sorted(paginas) == list(range(12))
+    assert sorted(stats.paginas) == list(range(12))
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_fases_do_destaque(pdf, pares, tmp_path, workers):
+    stats = Estatisticas()
+    destacar_pdf_multi(pdf, str(tmp_path / "saida.pdf"), pares, workers=workers, stats=stats)
+    assert {"abrir", "busca", "anotacao", "gravacao"} <= set(stats.fases)
+    assert stats.contagens["anotacoes"] == find_matches(pdf, pares).total
+    assert stats.como_dict()["fases"].keys() == stats.fases.keys()
+
+
+def test_cli_profile_json(pdf, tmp_path):
+    perfil = tmp_path / "perfil.json"
+    proc = subprocess.run(
+        [sys.executable, "-m", "mark_me", "mark", pdf, "-t", "termo000", "-o", str(tmp_path / "saida.pdf"),
+         "--profile", "--profile-json", str(perfil)],
+        cwd=_RAIZ, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "Perfil por fase:" in proc.stderr
+    dados = json.loads(perfil.read_text())
+    assert {"busca", "gravacao"} <= set(dados["fases"])
+    assert sorted(dados["paginas"], key=int) == [str(n) for n in range(1, 13)]
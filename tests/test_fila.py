@@ -0,0 +1,138 @@
+"""
+Mark.me - Fila SQLite de mark watch / worker: deduplicação, prazos, tentativas e o resultado do worker.
+"""
+import os
+import shutil
+
+import pytest
+
+from mark_me import batch
+from mark_me.core import destacar_pdf_multi
+from mark_me.fila import EM_ANDAMENTO, MORTO, OK, PENDENTE, PERDIDO, FilaTrabalhos, trabalhar
+from tests.comum import marcas
+
+OPCOES = {"dictionary": False, "pages": None, "save_mode": "compact", "coalesce": "none"}
+
+
+@pytest.fixture
+def db(tmp_path) -> str:
+    return str(tmp_path / "fila.db")
+
+
+@pytest.fixture
+def entradas(pdf, tmp_path) -> list[str]:
+    pasta = tmp_path / "entrada"
+    pasta.mkdir()
+    return [shutil.copyfile(pdf, pasta / f"doc{i}.pdf") for i in range(3)]
+
+
+def _enfileirar(fila: FilaTrabalhos, entrada, config: int) -> bool:
+    info = os.stat(entrada)
+    return fila.enfileirar(str(entrada), str(entrada) + ".saida.pdf", info.st_size, info.st_mtime, config)
+
+
+def _status(fila: FilaTrabalhos) -> list[str]:
+    return [status for (status,) in fila._con.execute("SELECT status FROM trabalhos ORDER BY id")]
+
+
+def test_mesma_versao_e_config_entra_uma_vez(db, entradas, pares):
+    with FilaTrabalhos(db) as fila:
+        config = fila.config(pares, OPCOES)
+        assert fila.config(pares, OPCOES) == config
+        assert _enfileirar(fila, entradas[0], config)
+        assert not _enfileirar(fila, entradas[0], config)
+        assert _enfileirar(fila, entradas[0], fila.config(pares[:1], OPCOES))
+
+
+def test_prazo_vencido_passa_o_trabalho_a_outro_worker(db, entradas, pares):
+    with FilaTrabalhos(db) as fila:
+        _enfileirar(fila, entradas[0], fila.config(pares, OPCOES))
+        primeiro = fila.pegar("a", prazo=0)
+        segundo = fila.pegar("b", prazo=60)
+        assert (segundo.id, segundo.tentativas) == (primeiro.id, 2)
+        assert fila.pegar("c") is None
+        # O primeiro worker não renova, conclui nem falha um trabalho que não é mais dele
+        assert not fila.renovar(primeiro)
+        assert not fila.concluir(primeiro, OK)
+        assert fila.falhar(primeiro, "erro") is None
+        assert fila.concluir(segundo, OK)
+
+
+def test_falhas_voltam_com_espera_ate_os_mortos(db, entradas, pares):
+    with FilaTrabalhos(db) as fila:
+        _enfileirar(fila, entradas[0], fila.config(pares, OPCOES))
+        assert fila.falhar(fila.pegar("a"), "erro 1", max_tentativas=2, espera=60) == PENDENTE
+        assert fila.pegar("a") is None  # esperando 60 s
+        fila._con.execute("UPDATE trabalhos SET disponivel = 0")
+        assert fila.falhar(fila.pegar("a"), "erro 2", max_tentativas=2) == MORTO
+        assert fila.situacao(mortos=5)["mortos"] == [{"entrada": str(entradas[0]), "tentativas": 2, "erro": "erro 2"}]
+        assert fila.devolver_mortos() == 1
+        assert fila.pegar("a").tentativas == 1
+
+
+def test_worker_marca_como_o_core(db, entradas, pares, tmp_path):
+    with FilaTrabalhos(db) as fila:
+        config = fila.config(pares, OPCOES)
+        for entrada in entradas:
+            _enfileirar(fila, entrada, config)
+    assert trabalhar(db, uma_vez=True) == 3
+    esperado = str(tmp_path / "esperado.pdf")
+    destacar_pdf_multi(entradas[0], esperado, pares)
+    for entrada in entradas:
+        assert marcas(str(entrada) + ".saida.pdf") == marcas(esperado)
+    with FilaTrabalhos(db) as fila:
+        assert _status(fila) == [OK] * 3
+
+
+def test_worker_marca_de_novo_com_outra_config(db, entradas, pares):
+    saida = str(entradas[0]) + ".saida.pdf"
+    with FilaTrabalhos(db) as fila:
+        _enfileirar(fila, entradas[0], fila.config(pares, OPCOES))
+        trabalhar(db, uma_vez=True)
+        _enfileirar(fila, entradas[0], fila.config(pares[:2], OPCOES))
+        assert trabalhar(db, uma_vez=True) == 1
+        assert _status(fila) == [OK, OK]
+    assert {termo for _, termo, _, _ in marcas(saida)} == {termo for termo, _ in pares[:2]}
+
+
+def test_worker_descarta_resultado_de_trabalho_perdido(db, entradas, pares, monkeypatch):
+    processar = batch.processar_arquivo
+
+    def processar_e_perder(*args, **kwargs):
+        # Enquanto este worker processa, o prazo vence e outro worker pega o trabalho
+        with FilaTrabalhos(db) as outra:
+            outra._con.execute("UPDATE trabalhos SET disponivel = 0")
+            assert outra.pegar("outro") is not None
+        return processar(*args, **kwargs)
+
+    monkeypatch.setattr(batch, "processar_arquivo", processar_e_perder)
+    relatos = []
+    with FilaTrabalhos(db) as fila:
+        _enfileirar(fila, entradas[0], fila.config(pares, OPCOES))
+        assert trabalhar(db, uma_vez=True, ao_concluir=lambda t, status, r: relatos.append(status)) == 0
+        assert relatos == [PERDIDO]
+        assert fila._con.execute("SELECT status, worker FROM trabalhos").fetchone() == (EM_ANDAMENTO, "outro")
+
+
+def _codigo(funcao) -> int:
+    try:
+        return funcao()
+    except SystemExit as e:  # erro de argumento do argparse
+        return e.code
+
+
+@pytest.mark.parametrize("argumentos", [["-c", "#f00"], ["-t", "x", "--pages", "0"], ["--terms-file", "nao_existe.csv"]])
+def test_watch_valida_como_o_mark(entradas, tmp_path, argumentos, monkeypatch, capsys):
+    # mark watch e mark usam as mesmas funções para os termos e --pages
+    from mark_me import cli
+    from mark_me.fila import main_watch
+
+    monkeypatch.chdir(tmp_path)
+    watch = _codigo(lambda: main_watch([str(entradas[0].parent), *argumentos, "--once", "--db", "fila.db"]))
+    erro_watch = capsys.readouterr().err.splitlines()[-1]
+    monkeypatch.setattr("sys.argv", ["mark", str(entradas[0]), *argumentos])
+    mark = _codigo(cli.main)
+    erro_mark = capsys.readouterr().err.splitlines()[-1]
+    assert watch == mark != 0
+    # Sem o prefixo do argparse ("mark watch: error:" / "mark: error:")
+    assert erro_watch.split("error: ")[-1] == erro_mark.split("error: ")[-1]
@@ -0,0 +1,65 @@
+"""
+Mark.me - PDFs em memória e fluxos: bytes, buffers e arquivos abertos dão o mesmo resultado do caminho.
+"""
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mark_me.core import apply_plan, contar_ocorrencias_multi, destacar_pdf_multi, find_matches
+from tests.comum import anotacoes, linhas
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def conteudo(pdf) -> bytes:
+    with open(pdf, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def em_disco(pdf, pares, tmp_path) -> list[tuple]:
+    destacar_pdf_multi(pdf, str(tmp_path / "disco.pdf"), pares)
+    return anotacoes(tmp_path / "disco.pdf")
+
+
+def test_bytes_entram_e_saem(conteudo, pares, tmp_path, em_disco):
+    saida = destacar_pdf_multi(conteudo, None, pares)
+    assert isinstance(saida, bytes) and saida.startswith(b"%PDF")
+    (tmp_path / "bytes.pdf").write_bytes(saida)
+    assert anotacoes(tmp_path / "bytes.pdf") == em_disco
+
+
+def test_bytesio_com_workers(conteudo, pdf, pares, tmp_path, em_disco):
+    saida = io.BytesIO()
+    assert destacar_pdf_multi(io.BytesIO(conteudo), saida, pares, workers=2) is None
+    (tmp_path / "fluxo.pdf").write_bytes(saida.getvalue())
+    assert anotacoes(tmp_path / "fluxo.pdf") == em_disco
+
+
+@pytest.mark.parametrize("tipo", [bytearray, memoryview])
+def test_buffers_como_entrada(conteudo, pdf, pares, termos, tipo):
+    assert linhas(find_matches(tipo(conteudo), pares)) == linhas(find_matches(pdf, pares))
+    assert contar_ocorrencias_multi(tipo(conteudo), termos) == contar_ocorrencias_multi(pdf, termos)
+
+
+def test_incremental_exige_disco(conteudo, pdf, pares, tmp_path):
+    with pytest.raises(ValueError):
+        destacar_pdf_multi(conteudo, str(tmp_path / "saida.pdf"), pares, save_mode="incremental")
+    with pytest.raises(ValueError):
+        apply_plan(find_matches(pdf, pares), io.BytesIO(), save_mode="incremental")
+    assert not (tmp_path / "saida.pdf").exists()
+
+
+def test_cli_stdin_stdout(conteudo, pares, tmp_path, em_disco):
+    cmd = [sys.executable, "-m", "mark_me", "mark", "-", "-o", "-"]
+    for termo, cor in pares:
+        cmd += ["-t", termo, "-c", cor]
+    proc = subprocess.run(cmd, cwd=_RAIZ, input=conteudo, capture_output=True)
+    assert proc.returncode == 0, proc.stderr.decode()
+    assert proc.stdout.startswith(b"%PDF")
+    (tmp_path / "cli.pdf").write_bytes(proc.stdout)
+    assert anotacoes(tmp_path / "cli.pdf") == em_disco
@@ -0,0 +1,92 @@
+"""
+Mark.me - Modos de gravação (compact, fast, incremental): mesmas anotações, entrada preservada, nada deixado ao falhar.
+"""
+import shutil
+
+import pytest
+
+from mark_me import core
+from mark_me.core import apply_plan, atualizar_pdf_multi, destacar_pdf_multi, find_matches
+from tests.comum import anotacoes
+
+
+@pytest.fixture
+def compacto(pdf, pares, tmp_path) -> list[tuple]:
+    destacar_pdf_multi(pdf, str(tmp_path / "compacto.pdf"), pares)
+    return anotacoes(tmp_path / "compacto.pdf")
+
+
+@pytest.mark.parametrize("save_mode", ["compact", "fast", "incremental"])
+def test_modos_em_arquivo_novo(pdf, pares, tmp_path, compacto, save_mode):
+    with open(pdf, "rb") as f:
+        original = f.read()
+    saida = tmp_path / f"{save_mode}.pdf"
+    apply_plan(find_matches(pdf, pares), str(saida), save_mode=save_mode)
+    assert compacto and anotacoes(saida) == compacto
+    with open(pdf, "rb") as f:
+        assert f.read() == original
+    if save_mode == "incremental":
+        assert saida.read_bytes().startswith(original)
+
+
+def test_incremental_no_proprio_arquivo(pdf, pares, tmp_path, compacto):
+    alvo = str(shutil.copyfile(pdf, tmp_path / "doc.pdf"))
+    with open(alvo, "rb") as f:
+        original = f.read()
+    destacar_pdf_multi(alvo, alvo, pares, save_mode="incremental")
+    assert anotacoes(alvo) == compacto
+    with open(alvo, "rb") as f:
+        assert f.read().startswith(original)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["compacto.pdf", "doc.pdf"]
+
+
+def test_modo_invalido(pdf, pares, tmp_path):
+    with pytest.raises(ValueError):
+        apply_plan(find_matches(pdf, pares), str(tmp_path / "x.pdf"), save_mode="rapido")
+    assert not (tmp_path / "x.pdf").exists()
+
+
+@pytest.fixture
+def reparado(pdf, tmp_path) -> str:
+    """Cópia do PDF com o startxref errado: o MuPDF repara ao abrir e não grava incremental."""
+    with open(pdf, "rb") as f:
+        dados = f.read()
+    path = tmp_path / "reparado.pdf"
+    path.write_bytes(dados[:dados.rindex(b"startxref")] + b"startxref\n7\n%%EOF\n")
+    return str(path)
+
+
+def test_incremental_sem_suporte_nao_deixa_copia(reparado, pares, tmp_path):
+    saida = tmp_path / "saida.pdf"
+    with pytest.raises(ValueError, match="incremental"):
+        apply_plan(find_matches(reparado, pares), str(saida), save_mode="incremental")
+    assert not saida.exists()
+    with pytest.raises(ValueError, match="incremental"):
+        atualizar_pdf_multi(reparado, str(saida), pares)
+    assert not saida.exists()
+
+
+def _falhar(*_args, **_kwargs):
+    raise OSError("disco cheio")
+
+
+@pytest.mark.parametrize("chunk_pages", [None, 5])
+def test_erro_ao_gravar_remove_a_copia(pdf, pares, tmp_path, monkeypatch, chunk_pages):
+    saida = tmp_path / "saida.pdf"
+    plan = find_matches(pdf, pares)
+    monkeypatch.setattr(core, "_salvar", _falhar)
+    with pytest.raises(OSError):
+        apply_plan(plan, str(saida), save_mode="incremental", chunk_pages=chunk_pages)
+    assert not saida.exists()
+    with pytest.raises(OSError):
+        atualizar_pdf_multi(pdf, str(saida), pares)
+    assert not saida.exists()
+
+
+def test_erro_ao_gravar_no_proprio_arquivo_preserva_a_entrada(pdf, pares, tmp_path, monkeypatch):
+    alvo = str(shutil.copyfile(pdf, tmp_path / "doc.pdf"))
+    monkeypatch.setattr(core, "_salvar", _falhar)
+    with pytest.raises(OSError):
+        destacar_pdf_multi(alvo, alvo, pares, save_mode="incremental")
+    with open(pdf, "rb") as a, open(alvo, "rb") as b:
+        assert a.read() == b.read()
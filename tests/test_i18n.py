@@ -0,0 +1,49 @@
+"""
+Mark.me - Catálogos de tradução mesclados: t() dá o mesmo que a busca idioma → padrão → chave.
+"""
+import importlib.util
+
+import pytest
+
+from mark_me import i18n
+
+
+@pytest.fixture
+def idioma():
+    antes = i18n.get_lang()
+    yield i18n.set_lang
+    i18n.set_lang(antes)
+
+
+def _idiomas() -> list[str]:
+    return [nome[:-len(".json")] for nome in i18n._locale_files()]
+
+
+@pytest.mark.parametrize("lang", _idiomas())
+def test_t_igual_a_busca_em_cadeia(idioma, lang):
+    padrao, catalogo = i18n._load("en"), i18n._load(lang)
+    idioma(lang)
+    for chave in padrao.keys() | catalogo.keys():
+        assert i18n.t(chave) == catalogo.get(chave, padrao.get(chave))
+
+
+def test_idioma_desconhecido_usa_o_padrao(idioma):
+    idioma("xx")
+    assert i18n.get_lang() == "xx"
+    assert all(i18n.t(chave) == texto for chave, texto in i18n._load("en").items())
+
+
+def test_chave_desconhecida_e_placeholders(idioma):
+    idioma("en")
+    assert i18n.t("chave.que.nao.existe") == "chave.que.nao.existe"
+    assert i18n.t("chave {n}", n=3) == "chave 3"
+    assert i18n.t("chave {n}", m=3) == "chave {n}"
+
+
+def test_catalogos_compilados_iguais_ao_json(tmp_path):
+    caminho = i18n.compile_catalogs(str(tmp_path / "_catalogs.py"))
+    spec = importlib.util.spec_from_file_location("_catalogs_teste", caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    assert modulo.CATALOGS == i18n._build()
+    assert set(modulo.CATALOGS) == set(_idiomas())
@@ -0,0 +1,35 @@
+"""
+Mark.me - Importação preguiçosa: o CLI sobe sem PyMuPDF nem Tkinter, dentro do orçamento, e os nomes públicos resolvem.
+"""
+import pytest
+
+import mark_me
+from benchmarks.bench_import import CASOS, MODULOS_PARTIDA, ORCAMENTO_MS, PROIBIDOS, medir
+
+REPETICOES = 5
+
+
+@pytest.mark.parametrize("caso", list(CASOS))
+def test_partida_sem_modulos_pesados(caso):
+    _, modulos = medir(CASOS[caso])
+    assert "mark_me" in modulos
+    assert not {m for m in modulos if m.split(".")[0] in PROIBIDOS}
+    assert {m for m in modulos if m.split(".")[0] == "mark_me"} <= MODULOS_PARTIDA
+
+
+@pytest.mark.parametrize("caso", list(CASOS))
+def test_partida_dentro_do_orcamento(caso):
+    # O mínimo das repetições descarta as execuções atrapalhadas por outros processos
+    melhor = min(medir(CASOS[caso])[0] for _ in range(REPETICOES))
+    assert 0 < melhor <= ORCAMENTO_MS, f"{caso}: {melhor:.1f} ms de importação do mark_me (orçamento {ORCAMENTO_MS:.0f} ms)"
+
+
+@pytest.mark.parametrize("nome", mark_me.__all__)
+def test_nomes_publicos_resolvem(nome):
+    assert getattr(mark_me, nome) is not None
+    assert nome in dir(mark_me)
+
+
+def test_nome_desconhecido():
+    with pytest.raises(AttributeError):
+        mark_me.nao_existe
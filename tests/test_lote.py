@@ -0,0 +1,156 @@
+"""
+Mark.me - Modo lote: expansão das entradas, saídas puladas só com a mesma configuração, saídas repetidas e erros.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from mark_me.batch import (
+    ATUALIZADO, ERRO, OK, SEM_OCORRENCIA, SUFIXO_CONFIG, assinatura_config, caminho_saida, expandir_entradas,
+    processar_arquivo, processar_lote, resumo, saidas_repetidas,
+)
+from tests.comum import marcas
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def entrada(pdf, tmp_path) -> str:
+    return shutil.copyfile(pdf, tmp_path / "doc.pdf")
+
+
+def test_expandir_entradas(pdf, tmp_path):
+    (tmp_path / "sub").mkdir()
+    for nome in ("a.pdf", "a_marcado.pdf", "sub/b.pdf"):
+        shutil.copyfile(pdf, tmp_path / nome)
+    (tmp_path / "notas.txt").write_text("x")
+    a, b = str(tmp_path / "a.pdf"), str(tmp_path / "sub" / "b.pdf")
+    assert [e for e, _ in expandir_entradas([str(tmp_path)])] == [a]
+    assert [e for e, _ in expandir_entradas([str(tmp_path)], recursivo=True)] == [a, b]
+    assert [e for e, _ in expandir_entradas([a, str(tmp_path / "*.pdf")])][0] == a
+    raiz = str(tmp_path)
+    assert caminho_saida(b, raiz, None) == str(tmp_path / "sub" / "b_marcado.pdf")
+    assert caminho_saida(b, raiz, str(tmp_path / "out" / "{reldir}")) == str(tmp_path / "out" / "sub" / "b_marcado.pdf")
+
+
+def test_arquivo_com_colchetes_no_nome(pdf, tmp_path):
+    # Existe: é o próprio arquivo, não o glob "relatorio1.pdf"
+    entrada = str(shutil.copyfile(pdf, tmp_path / "relatorio[1].pdf"))
+    assert expandir_entradas([entrada]) == [(entrada, str(tmp_path))]
+    proc = subprocess.run(
+        [sys.executable, "-m", "mark_me", "mark", entrada, "-t", "termo000"], cwd=_RAIZ, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "Pronto:" in proc.stdout and "Lote:" not in proc.stderr  # um único arquivo, não o lote
+    assert (tmp_path / "relatorio[1]_marcado.pdf").is_file()
+
+
+def test_glob_repetido_nao_marca_as_saidas(entrada, tmp_path):
+    comando = [sys.executable, "-m", "mark_me", "mark", str(tmp_path / "*.pdf"), "-t", "termo000"]
+    for _ in range(2):
+        proc = subprocess.run(comando, cwd=_RAIZ, capture_output=True, text=True)
+        assert proc.returncode == 0, proc.stderr
+    assert sorted(p.name for p in tmp_path.glob("*.pdf")) == ["doc.pdf", "doc_marcado.pdf"]
+    # Na segunda vez a saída já está atualizada: a linha diz isso, não "0 ocorrências"
+    assert f"[{ATUALIZADO}] {entrada}" in proc.stdout and "ocorrências" not in proc.stdout
+
+
+def test_pula_saida_atualizada(entrada, pares, tmp_path):
+    saida = str(tmp_path / "saida" / "doc_marcado.pdf")
+    primeiro = processar_arquivo(str(entrada), saida, pares)
+    assert primeiro.status == OK and primeiro.ocorrencias > 0
+    assert processar_arquivo(str(entrada), saida, pares).status == ATUALIZADO
+    assert processar_arquivo(str(entrada), saida, pares, forcar=True).status == OK
+    os.utime(entrada, (os.path.getmtime(saida) + 10,) * 2)
+    assert processar_arquivo(str(entrada), saida, pares).status == OK
+
+
+def test_erro_nao_interrompe_o_lote(entrada, pares, tmp_path):
+    ruim = tmp_path / "ruim.pdf"
+    ruim.write_bytes(b"isto nao e um PDF")
+    tarefas = [(str(p), str(tmp_path / "out" / f"{i}.pdf")) for i, p in enumerate((ruim, entrada))]
+    tarefas.append((str(entrada), str(tmp_path / "out" / "nada.pdf")))
+    concluidos = []
+    resultados = processar_lote(tarefas, pares[:1] + [("inexistente", "#000000")], jobs=2, ao_concluir=concluidos.append)
+    assert [r.status for r in resultados] == [ERRO, OK, OK]
+    assert resultados[0].erro
+    assert len(concluidos) == 3
+    sem = processar_arquivo(str(entrada), str(tmp_path / "sem.pdf"), [("inexistente", "#000000")])
+    assert sem.status == SEM_OCORRENCIA and not os.path.exists(tmp_path / "sem.pdf")
+    dados = resumo(resultados, 1.0)
+    assert dados["por_status"] == {ERRO: 1, OK: 2}
+    assert dados["ocorrencias"] == sum(r.ocorrencias for r in resultados)
+
+
+def test_cli_lote_com_resumo(entrada, tmp_path):
+    (tmp_path / "ruim.pdf").write_bytes(b"isto nao e um PDF")
+    proc = subprocess.run(
+        [sys.executable, "-m", "mark_me", "mark", str(tmp_path), "-t", "termo000", "-j", "2",
+         "--output-dir", str(tmp_path / "out"), "--summary", "-"],
+        cwd=_RAIZ, capture_output=True, text=True,
+    )
+    assert proc.returncode == 1
+    # PyMuPDF recente avisa na saída padrão que o nome fitz está obsoleto
+    dados = json.loads(proc.stdout[proc.stdout.index("{"):])
+    assert dados["por_status"] == {ERRO: 1, OK: 1}
+    assert os.path.exists(tmp_path / "out" / "doc_marcado.pdf")
+
+
+def test_pula_so_com_a_mesma_config(entrada, pares, tmp_path):
+    saida = str(tmp_path / "saida" / "doc_marcado.pdf")
+    assert processar_arquivo(str(entrada), saida, pares).status == OK
+    assert processar_arquivo(str(entrada), saida, pares).status == ATUALIZADO
+    for outra in (
+        {"pares": pares[:2]},
+        {"pares": [(pares[0][0], "#000000")] + pares[1:]},
+        {"pares": pares, "opcoes_gravacao": {"coalesce": "page"}},
+        {"pares": pares, "paginas": "1-3"},
+    ):
+        assert processar_arquivo(str(entrada), saida, **outra).status == OK
+        assert processar_arquivo(str(entrada), saida, **outra).status == ATUALIZADO
+    # A última gravação foi a das páginas 1-3
+    assert {pagina for pagina, *_ in marcas(saida)} == {0, 1, 2}
+
+
+def test_saida_sem_assinatura_e_marcada_de_novo(entrada, pares, tmp_path):
+    saida = str(tmp_path / "doc_marcado.pdf")
+    processar_arquivo(str(entrada), saida, pares)
+    os.remove(saida + SUFIXO_CONFIG)  # ex.: gravada por uma versão antiga ou gravação interrompida
+    assert processar_arquivo(str(entrada), saida, pares).status == OK
+
+
+def test_opcoes_que_nao_mudam_a_saida_nao_mudam_a_assinatura(pares):
+    base = assinatura_config(pares, {"save_mode": "compact"})
+    assert assinatura_config(pares, {"save_mode": "compact", "chunk_pages": 10}) == base
+    assert assinatura_config(pares, {"save_mode": "fast"}) != base
+    assert assinatura_config(pares, {"save_mode": "compact"}, dicionario=True) != base
+
+
+def test_saidas_repetidas(pdf, tmp_path):
+    for pasta in ("a", "b"):
+        (tmp_path / pasta).mkdir()
+        shutil.copyfile(pdf, tmp_path / pasta / "doc.pdf")
+    entradas = expandir_entradas([str(tmp_path)], recursivo=True)
+    assert len(entradas) == 2
+    sem_reldir = [(e, caminho_saida(e, raiz, str(tmp_path / "out"))) for e, raiz in entradas]
+    com_reldir = [(e, caminho_saida(e, raiz, str(tmp_path / "out" / "{reldir}"))) for e, raiz in entradas]
+    assert list(saidas_repetidas(sem_reldir).values()) == [[e for e, _ in entradas]]
+    assert saidas_repetidas(com_reldir) == {}
+
+
+def test_cli_recusa_saidas_repetidas(pdf, tmp_path):
+    for pasta in ("a", "b"):
+        (tmp_path / pasta).mkdir()
+        shutil.copyfile(pdf, tmp_path / pasta / "doc.pdf")
+    proc = subprocess.run(
+        [sys.executable, "-m", "mark_me", "mark", str(tmp_path / "a" / "doc.pdf"), str(tmp_path / "b" / "doc.pdf"),
+         "-t", "termo000", "--output-dir", str(tmp_path / "out")],
+        cwd=_RAIZ, capture_output=True, text=True,
+    )
+    assert proc.returncode == 1
+    assert "2 entradas gravariam em" in proc.stderr
+    assert not (tmp_path / "out").exists()
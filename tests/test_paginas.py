@@ -0,0 +1,71 @@
+"""
+Mark.me - Seleção de páginas (pages=) e pré-filtro de texto simples: só pulam trabalho, nunca ocorrências.
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from benchmarks.sintetico import gerar_pdf
+from mark_me.core import _AMOSTRA_PREFILTRO, _FLAGS_BUSCA, _PreFiltro, find_matches, iter_matches
+from mark_me.modos import intervalos_paginas
+from mark_me.stats import Estatisticas
+from tests.comum import linhas
+
+
+@pytest.fixture(scope="module")
+def pdf_raro(tmp_path_factory, termos) -> str:
+    """PDF de 40 páginas em que a maioria das páginas não tem nenhum termo."""
+    path = str(tmp_path_factory.mktemp("raro") / "raro.pdf")
+    return gerar_pdf(path, paginas=40, palavras_por_pagina=200, termos=termos, densidade=0.002, seed=1)
+
+
+@pytest.mark.parametrize("prefilter", [True, None])
+@pytest.mark.parametrize("documento", ["pdf", "pdf_raro"])
+def test_prefiltro_nao_perde_ocorrencias(request, pares, documento, prefilter):
+    path = request.getfixturevalue(documento)
+    assert linhas(find_matches(path, pares, prefilter=prefilter)) == linhas(find_matches(path, pares, prefilter=False))
+
+
+def test_prefiltro_pula_paginas_sem_termo(pdf_raro, pares):
+    com, sem = Estatisticas(), Estatisticas()
+    plan = find_matches(pdf_raro, pares, prefilter=True, stats=com)
+    find_matches(pdf_raro, pares, prefilter=False, stats=sem)
+    assert com.contagens["paginas_puladas"] == 40 - len(plan.paginas)
+    assert "paginas_puladas" not in sem.contagens
+
+
+def test_prefiltro_ignora_maiusculas_espacos_e_hifens(tmp_path):
+    path = str(tmp_path / "variacoes.pdf")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "ALFA  BETA e Gama")
+    doc.save(path)
+    doc.close()
+    pares = [("alfa beta", "#ffff00"), ("gama", "#ffff00")]
+    assert find_matches(path, pares, prefilter=True).contagens == find_matches(path, pares, prefilter=False).contagens
+    assert find_matches(path, pares, prefilter=True).total == 2
+
+
+@pytest.mark.parametrize("texto, ativo", [("alfa beta gama", False), ("nada aqui", True)])
+def test_prefiltro_automatico(texto, ativo):
+    filtro = _PreFiltro(["alfa", "beta"], automatico=True)
+    with fitz.open() as doc:
+        pagina = doc.new_page()
+        pagina.insert_text((72, 72), texto)
+        textpage = pagina.get_textpage(flags=_FLAGS_BUSCA)
+        for _ in range(_AMOSTRA_PREFILTRO):
+            filtro.filtrar(textpage, ["alfa", "beta"])
+    assert filtro.ativo is ativo
+
+
+@pytest.mark.parametrize("pages, numeros", [("2-4,9-", [1, 2, 3, 8, 9, 10, 11]), ("-2,12,40-", [0, 1, 11]), ([0, 5, 99], [0, 5])])
+def test_pages_igual_a_filtrar_o_plano(pdf, pares, pages, numeros):
+    completo = find_matches(pdf, pares)
+    assert linhas(find_matches(pdf, pares, pages=pages)) == [linha for linha in linhas(completo) if linha[0] in numeros]
+    assert [o for o in iter_matches(pdf, [t for t, _ in pares], pages=pages)] == [
+        o for o in iter_matches(pdf, [t for t, _ in pares]) if o.pagina in numeros
+    ]
+
+
+@pytest.mark.parametrize("texto", ["", "0", "3-1", "a-b", ","])
+def test_pages_invalido(texto):
+    with pytest.raises(ValueError):
+        intervalos_paginas(texto)
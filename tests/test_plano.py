@@ -0,0 +1,44 @@
+"""
+Mark.me - find_matches/apply_plan: uma passada de busca e uma gravação, iguais a search_for termo a termo.
+"""
+import pytest
+
+from mark_me import core
+from mark_me.core import apply_plan, find_matches
+
+from tests.comum import anotacoes, busca_por_termo, destacar_por_termo
+
+
+def test_plano_igual_a_search_for(pdf, pares, termos):
+    plan = find_matches(pdf, pares)
+    referencia = busca_por_termo(pdf, termos)
+    esperado = {
+        numero: {termo: rects for termo, rects in achados.items() if rects}
+        for numero, achados in referencia.items() if any(achados.values())
+    }
+    assert {numero: dict(achados) for numero, achados in plan.paginas.items()} == esperado
+    assert plan.contagens == {termo: sum(len(achados[termo]) for achados in referencia.values()) for termo in termos}
+    assert plan.total == sum(plan.contagens.values()) > 0
+
+
+def test_apply_plan_igual_a_search_for_sem_buscar_de_novo(pdf, pares, tmp_path, monkeypatch):
+    plan = find_matches(pdf, pares)
+    destacar_por_termo(pdf, tmp_path / "referencia.pdf", pares)
+
+    def _nao_busca(*_args, **_kwargs):
+        raise AssertionError("apply_plan não deveria buscar")
+
+    monkeypatch.setattr(core, "_buscar_na_pagina", _nao_busca)
+    apply_plan(plan, str(tmp_path / "marcado.pdf"))
+    assert anotacoes(tmp_path / "marcado.pdf") == anotacoes(tmp_path / "referencia.pdf")
+
+
+def test_termo_repetido_conta_uma_vez(pdf, termos):
+    plan = find_matches(pdf, [(termos[0], "#ffff00"), (termos[0], "#00ff00")])
+    assert plan.total == find_matches(pdf, [(termos[0], "#ffff00")]).total
+
+
+def test_sem_termos(pdf):
+    with pytest.raises(ValueError):
+        find_matches(pdf, [(" ", "#ffff00")])
+    assert core.contar_ocorrencias_multi(pdf, ["", "  "]) == 0
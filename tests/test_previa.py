@@ -0,0 +1,80 @@
+"""
+Mark.me - Pré-visualização da GUI: plano nos índices, página renderizada como no PDF gravado e LRU das imagens.
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from mark_me.core import apply_plan, find_matches, indexar_pdf, plano_nos_indices, renderizar_pagina
+from tests.comum import RaizFalsa, linhas
+
+gui = pytest.importorskip("mark_me.gui")
+
+
+def _aproximado(plan) -> list[tuple]:
+    return [(n, termo, *(round(v, 1) for v in rect)) for n, termo, *rect in linhas(plan)]
+
+
+def test_plano_nos_indices_igual_a_find_matches(pdf, pares):
+    plan = find_matches(pdf, pares)
+    assert _aproximado(plano_nos_indices(pdf, indexar_pdf(pdf), pares)) == _aproximado(plan)
+
+
+def test_pagina_renderizada_igual_ao_pdf_gravado(pdf, pares, tmp_path):
+    plan = find_matches(pdf, pares)
+    saida = str(tmp_path / "saida.pdf")
+    apply_plan(plan, saida)
+    numero = min(plan.paginas)
+    with fitz.open(pdf) as doc, fitz.open(saida) as gravado:
+        previa = renderizar_pagina(doc, plan, numero, zoom=0.5)
+        assert previa == gravado[numero].get_pixmap(matrix=fitz.Matrix(0.5, 0.5)).tobytes("ppm")
+        assert previa != renderizar_pagina(doc, None, numero, zoom=0.5)
+        # As anotações da prévia não ficam no documento
+        assert not list(doc[numero].annots())
+
+
+def test_processo_do_documento_planeja_e_renderiza(pdf, pares):
+    raiz, respostas, imagens, erros = RaizFalsa(), [], [], []
+    processo = gui._ProcessoDocumento(
+        raiz, lambda *r: respostas.append(r), lambda *i: imagens.append(i), lambda *e: erros.append(e),
+    )
+    try:
+        processo.pedir("indexar", pdf)
+        processo.pedir("plano", pares)
+        processo.pedir("renderizar", [(0, 0.5), (1, 0.5)])
+        raiz.rodar()
+    finally:
+        processo.encerrar()
+    assert not erros
+    assert [tipo for tipo, _, _ in respostas] == ["indexar", "plano", "renderizar"]
+    plan = find_matches(pdf, pares)
+    assert respostas[1][2] == {n: sum(map(len, achados.values())) for n, achados in plan.paginas.items()}
+    versao_plano = respostas[1][1]
+    assert [(pagina, zoom, versao) for pagina, zoom, versao, _ in imagens] == [(0, 0.5, versao_plano), (1, 0.5, versao_plano)]
+    assert all(ppm.startswith(b"P6") for *_, ppm in imagens)
+
+
+class _Imagem:
+    def __init__(self, largura: int, altura: int):
+        self._largura, self._altura = largura, altura
+
+    def width(self) -> int:
+        return self._largura
+
+    def height(self) -> int:
+        return self._altura
+
+
+def test_lru_descarta_as_usadas_ha_mais_tempo():
+    descartadas = []
+    lru = gui._LRUImagens(max_bytes=3 * 400, ao_descartar=descartadas.append)
+    for chave in "abc":
+        lru.guardar(chave, _Imagem(10, 10))
+    lru.obter("a")
+    lru.guardar("d", _Imagem(10, 10))
+    assert descartadas == ["b"]
+    assert lru.obter("b") is None and lru.obter("a") is not None
+    lru.guardar("grande", _Imagem(100, 100))  # maior que o limite: fica sozinha
+    assert descartadas == ["b", "c", "d", "a"]
+    assert lru.obter("grande") is not None
+    lru.limpar()
+    assert descartadas[-1] == "grande" and lru._bytes == 0
@@ -0,0 +1,193 @@
+"""
+Mark.me - mark serve: as respostas do servidor são as mesmas das funções do core no próprio processo.
+"""
+import os
+import signal
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+
+import pytest
+
+from mark_me.core import contar_ocorrencias_multi, destacar_pdf_multi
+from tests.comum import anotacoes
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+server = pytest.importorskip("mark_me.server")
+if not hasattr(server.socket, "AF_UNIX"):
+    pytest.skip("mark serve usa socket Unix", allow_module_level=True)
+
+
+@pytest.fixture(scope="module")
+def servidor():
+    # Caminho curto: sockets Unix têm limite de ~100 caracteres
+    pasta = tempfile.mkdtemp(prefix="markme-")
+    caminho = os.path.join(pasta, "s.sock")
+    srv = server.Servidor(caminho, workers=2, maximo_documentos=4)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv, caminho
+    srv.shutdown()
+    srv.server_close()
+    thread.join()
+    os.rmdir(pasta)
+
+
+def test_ping(servidor):
+    _, caminho = servidor
+    assert server.enviar({"op": "ping"}, caminho) == {"ok": True, "pid": os.getpid(), "processos": 2}
+
+
+def test_socket_so_do_dono(servidor):
+    _, caminho = servidor
+    assert stat.S_IMODE(os.stat(caminho).st_mode) == 0o600
+
+
+def test_socket_ja_nasce_so_do_dono():
+    modos = []
+
+    class Espiao(server.Servidor):
+        def server_activate(self):
+            # Logo depois do bind, antes de aceitar conexões
+            modos.append(stat.S_IMODE(os.stat(self.server_address).st_mode))
+            super().server_activate()
+
+    pasta = tempfile.mkdtemp(prefix="markme-")
+    umask = os.umask(0o022)
+    try:
+        Espiao(os.path.join(pasta, "s.sock"), workers=1).server_close()
+        assert os.umask(0o022) == 0o022  # a umask do processo volta ao que era
+    finally:
+        os.umask(umask)
+        os.rmdir(pasta)
+    assert modos == [0o600]
+
+
+def test_count_e_mark_iguais_ao_core(servidor, pdf, termos, pares, tmp_path):
+    _, caminho = servidor
+    for _ in range(2):  # a segunda usa o índice guardado no processo do documento
+        resposta = server.enviar({"op": "count", "entrada": pdf, "termos": termos, "pages": "2-"}, caminho)
+        assert resposta == {"ok": True, "total": contar_ocorrencias_multi(pdf, termos, pages="2-")}
+    saida = str(tmp_path / "servidor.pdf")
+    resposta = server.enviar({"op": "mark", "entrada": pdf, "saida": saida, "pares": pares, "opcoes": {"coalesce": "line"}}, caminho)
+    destacar_pdf_multi(pdf, str(tmp_path / "local.pdf"), pares, coalesce="line")
+    assert resposta["ok"] and resposta["total"] == sum(resposta["contagens"].values())
+    assert anotacoes(saida) == anotacoes(tmp_path / "local.pdf")
+
+
+def test_erros_viram_resposta(servidor, tmp_path):
+    _, caminho = servidor
+    assert server.enviar({"op": "apagar"}, caminho)["ok"] is False
+    resposta = server.enviar({"op": "count", "entrada": str(tmp_path / "nao_existe.pdf"), "termos": ["x"]}, caminho)
+    assert resposta["ok"] is False and resposta["erro"]
+
+
+def test_processo_morto_e_recriado(servidor, pdf, termos):
+    srv, caminho = servidor
+    pedido = {"op": "count", "entrada": pdf, "termos": termos}
+    processo = srv._processos[hash(pdf) % len(srv._processos)]
+    for pid in list(processo._processes):
+        os.kill(pid, signal.SIGKILL)
+    assert server.enviar(pedido, caminho)["ok"] is False
+    assert server.enviar(pedido, caminho) == {"ok": True, "total": contar_ocorrencias_multi(pdf, termos)}
+
+
+def test_sem_servidor_o_cliente_devolve_none(tmp_path):
+    assert server.enviar({"op": "ping"}, str(tmp_path / "ninguem.sock")) is None
+
+
+@pytest.mark.parametrize("no_ar", [True, False])
+def test_cli_com_server(servidor, pdf, pares, tmp_path, monkeypatch, no_ar):
+    srv, caminho = servidor
+    recebidos = []
+    executar = srv.executar
+    monkeypatch.setattr(srv, "executar", lambda pedido: recebidos.append(pedido["op"]) or executar(pedido))
+    saida = tmp_path / "saida.pdf"
+    proc = subprocess.run(
+        [sys.executable, "-m", "mark_me", "mark", pdf, "-t", pares[0][0], "-o", str(saida),
+         "--server", caminho if no_ar else str(tmp_path / "ninguem.sock")],
+        cwd=_RAIZ, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert recebidos == (["mark"] if no_ar else [])
+    destacar_pdf_multi(pdf, str(tmp_path / "local.pdf"), [(pares[0][0], "#ffff00")])
+    assert anotacoes(saida) == anotacoes(tmp_path / "local.pdf")
+
+
+def test_servidor_travado_o_cliente_devolve_none():
+    # Aceita a conexão e nunca responde (processo preso, threads esgotadas)
+    pasta = tempfile.mkdtemp(prefix="markme-")
+    caminho = os.path.join(pasta, "s.sock")
+    with server.socket.socket(server.socket.AF_UNIX, server.socket.SOCK_STREAM) as escuta:
+        escuta.bind(caminho)
+        escuta.listen(1)
+        assert server.enviar({"op": "ping"}, caminho, tempo_resposta=0.2) is None
+    os.remove(caminho)
+    os.rmdir(pasta)
+
+
+def test_tempo_resposta_da_variavel(monkeypatch):
+    monkeypatch.setenv(server.ENV_TEMPO_RESPOSTA, "2.5")
+    assert server.tempo_resposta_padrao() == 2.5
+    monkeypatch.delenv(server.ENV_TEMPO_RESPOSTA)
+    assert server.tempo_resposta_padrao() == server.TEMPO_RESPOSTA_PADRAO
+
+
+def test_cli_com_cache_roda_aqui(servidor, pdf, pares, tmp_path, monkeypatch):
+    srv, caminho = servidor
+    recebidos = []
+    monkeypatch.setattr(srv, "executar", lambda pedido: recebidos.append(pedido["op"]))
+    proc = subprocess.run(
+        [sys.executable, "-m", "mark_me", "mark", pdf, "-t", pares[0][0], "-o", str(tmp_path / "saida.pdf"),
+         "--server", caminho, "--cache-dir", str(tmp_path / "cache")],
+        cwd=_RAIZ, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert recebidos == []
+    assert os.listdir(tmp_path / "cache")
+
+
+def test_mark_igual_ao_processo_local_em_texto_justificado(servidor, pdf_justificado, termos_justificado, tmp_path):
+    # O servidor busca pelo índice guardado em memória; o resultado tem de ser o do search_for
+    _, caminho = servidor
+    pares = [(termo, "#ffff00") for termo in termos_justificado]
+    saida = str(tmp_path / "servidor.pdf")
+    for _ in range(2):  # a segunda usa o índice guardado no processo do documento
+        resposta = server.enviar({"op": "mark", "entrada": pdf_justificado, "saida": saida, "pares": pares}, caminho)
+        assert resposta["ok"]
+        destacar_pdf_multi(pdf_justificado, str(tmp_path / "local.pdf"), pares)
+        assert anotacoes(saida) == anotacoes(tmp_path / "local.pdf")
+        resposta = server.enviar({"op": "count", "entrada": pdf_justificado, "termos": termos_justificado}, caminho)
+        assert resposta["total"] == contar_ocorrencias_multi(pdf_justificado, termos_justificado)
+
+
+def test_serve_nao_apaga_arquivo_comum(tmp_path, capsys):
+    notas = tmp_path / "notas.txt"
+    notas.write_text("não é um socket")
+    assert server.main(["--socket", str(notas)]) == 1
+    assert notas.read_text() == "não é um socket"
+    assert "não é um socket" in capsys.readouterr().err
+
+
+def test_resposta_que_nao_e_json_vira_none():
+    pasta = tempfile.mkdtemp(prefix="markme-")
+    caminho = os.path.join(pasta, "s.sock")
+    with server.socket.socket(server.socket.AF_UNIX, server.socket.SOCK_STREAM) as escuta:
+        escuta.bind(caminho)
+        escuta.listen(1)
+
+        def responder():
+            conexao, _ = escuta.accept()
+            with conexao:
+                conexao.recv(1024)
+                conexao.sendall(b"HTTP/1.1 400 Bad Request\n")
+
+        thread = threading.Thread(target=responder)
+        thread.start()
+        assert server.enviar({"op": "ping"}, caminho, tempo_resposta=5) is None
+        thread.join()
+    os.remove(caminho)
+    os.rmdir(pasta)
@@ -0,0 +1,66 @@
+"""
+Mark.me - Busca sob demanda (iter_matches, has_any_match, count_matches) e mark --dry-run --report.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+from itertools import islice
+
+import pytest
+
+from mark_me.core import count_matches, find_matches, has_any_match, iter_matches
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _mark(*args: str, **kwargs) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "mark_me", "mark", *args], cwd=_RAIZ, capture_output=True, text=True, **kwargs)
+
+
+def test_iter_matches_igual_a_find_matches(pdf, pares, termos):
+    plan = find_matches(pdf, pares)
+    assert [(o.pagina, o.termo, *o.rect) for o in iter_matches(pdf, termos)] == [
+        (n, termo, *rect) for n, achados in plan.paginas.items() for termo, rects in achados.items() for rect in rects
+    ]
+
+
+def test_parar_cedo(pdf, pares, termos):
+    total = find_matches(pdf, pares).total
+    assert count_matches(pdf, termos) == total
+    assert count_matches(pdf, termos, limit=5) == 5
+    assert has_any_match(pdf, termos) and not has_any_match(pdf, ["nao aparece"])
+    assert list(islice(iter_matches(pdf, termos), 3)) == list(iter_matches(pdf, termos))[:3]
+
+
+def test_dry_run_report(pdf, termos, tmp_path):
+    relatorio = tmp_path / "ocorrencias.jsonl"
+    proc = _mark(pdf, *(a for termo in termos for a in ("-t", termo)), "--dry-run", "--report", str(relatorio))
+    assert proc.returncode == 0, proc.stderr
+    linhas = [json.loads(linha) for linha in relatorio.read_text(encoding="utf-8").splitlines()]
+    assert len(linhas) == count_matches(pdf, termos)
+    assert linhas[0].keys() == {"arquivo", "pagina", "termo", "rect"}
+    assert not list(tmp_path.glob("*.pdf"))
+
+
+def test_dry_run_report_em_pasta_inexistente(pdf, tmp_path):
+    proc = _mark(pdf, "-t", "termo000", "--dry-run", "--report", str(tmp_path / "nao" / "existe.jsonl"))
+    assert proc.returncode == 1
+    assert "Erro ao criar --report" in proc.stderr and "Traceback" not in proc.stderr
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGPIPE/EPIPE de pipes POSIX")
+def test_dry_run_com_leitor_que_fecha_o_pipe(pdf, termos, tmp_path):
+    # Saída maior que o buffer do pipe: o processo ainda está escrevendo quando o leitor fecha
+    copias = [shutil.copyfile(pdf, tmp_path / f"doc{i}.pdf") for i in range(20)]
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "mark_me", "mark", *map(str, copias), *(a for termo in termos for a in ("-t", termo)),
+         "--dry-run", "--report", "-"],
+        cwd=_RAIZ, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    proc.stdout.readline()
+    proc.stdout.close()
+    erros = proc.stderr.read().decode()
+    assert proc.wait(timeout=60) == 0
+    assert "Erro ao ler o PDF" not in erros and "Traceback" not in erros and "BrokenPipe" not in erros
@@ -0,0 +1,54 @@
+"""
+Mark.me - Suíte de benchmarks: gerador determinístico, medição por caso e detecção de regressões.
+"""
+import json
+import math
+
+import fitz  # PyMuPDF
+
+from benchmarks.sintetico import gerar_pdf, nomes_termos
+from benchmarks.suite import comparar, executar, main
+
+
+def _textos(path) -> list[str]:
+    with fitz.open(path) as doc:
+        return [pagina.get_text() for pagina in doc]
+
+
+def test_gerador_deterministico(tmp_path):
+    termos = nomes_termos(3)
+    a, b, c = (str(tmp_path / nome) for nome in ("a.pdf", "b.pdf", "c.pdf"))
+    gerar_pdf(a, paginas=2, palavras_por_pagina=50, termos=termos, densidade=0.1, seed=7)
+    gerar_pdf(b, paginas=2, palavras_por_pagina=50, termos=termos, densidade=0.1, seed=7)
+    gerar_pdf(c, paginas=2, palavras_por_pagina=50, termos=termos, densidade=0.1, seed=8)
+    assert _textos(a) == _textos(b) != _textos(c)
+    assert any(termo in texto for texto in _textos(a) for termo in termos)
+
+
+def _resultado(segundos: float, rss_mb: float, paginas: int = 10) -> dict:
+    return {"parametros": {"paginas": paginas}, "casos": {"cli_mark": {"segundos": segundos, "rss_mb": rss_mb}}}
+
+
+def test_comparar():
+    base = _resultado(1.0, 100.0)
+    assert comparar(base, _resultado(1.15, 110.0), 0.2) == []
+    regressoes = comparar(base, _resultado(1.5, 110.0), 0.2)
+    assert len(regressoes) == 1 and regressoes[0].startswith("cli_mark.segundos")
+    assert len(comparar(base, _resultado(1.0, 100.0, paginas=20), 0.2)) == 1
+    assert comparar(_resultado(1.0, math.nan), _resultado(1.0, 500.0), 0.2) == []
+
+
+def test_compare_sai_com_erro_na_regressao(tmp_path):
+    for nome, segundos in (("base", 1.0), ("igual", 1.0), ("lento", 2.0)):
+        (tmp_path / f"{nome}.json").write_text(json.dumps(_resultado(segundos, 100.0)))
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "igual.json")]) == 0
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "lento.json"), "--limite", "0.5"]) == 1
+
+
+def test_executar_mede_cada_caso():
+    resultado = executar(paginas=3, palavras=50, n_termos=2, densidade=0.1, repeticoes=1)
+    assert set(resultado["casos"]) == {"contar_ocorrencias_multi", "destacar_pdf_multi", "cli_mark"}
+    for nome, medidas in resultado["casos"].items():
+        assert medidas["segundos"] > 0
+        assert medidas["rss_mb"] > 0 or math.isnan(medidas["rss_mb"])
+        assert (medidas["saida_bytes"] > 0) == (nome != "contar_ocorrencias_multi")
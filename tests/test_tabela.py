@@ -0,0 +1,93 @@
+"""
+Mark.me - TabelaOcorrencias: as colunas guardam o mesmo que os fitz.Rect de search_for, e sobrevivem a pickle.
+"""
+import pickle
+
+import fitz  # PyMuPDF
+import pytest
+
+from mark_me.core import find_matches
+from mark_me.tabela import TabelaOcorrencias
+
+
+def _arredondar(rects) -> list[tuple]:
+    # As coordenadas são float32 na tabela
+    return [tuple(round(v, 3) for v in rect) for rect in rects]
+
+
+def test_paginas_iguais_a_search_for(pdf, pares):
+    plan = find_matches(pdf, pares, prefilter=False)
+    with fitz.open(pdf) as doc:
+        for pagina in doc:
+            esperado = {termo: _arredondar(pagina.search_for(termo)) for termo, _ in pares}
+            achados = plan.paginas.get(pagina.number, {})
+            assert {termo: _arredondar(achados.get(termo, [])) for termo, _ in pares} == esperado
+
+
+def test_pickle_preserva_a_tabela(pdf, pares):
+    tabela = find_matches(pdf, pares).ocorrencias
+    copia = pickle.loads(pickle.dumps(tabela))
+    assert list(copia.linhas()) == list(tabela.linhas())
+    assert copia.faixas() == tabela.faixas()
+    assert copia.contagens() == tabela.contagens()
+    assert copia.da_pagina(min(tabela.faixas())) == tabela.da_pagina(min(tabela.faixas()))
+
+
+def _tabela(linhas) -> TabelaOcorrencias:
+    tabela = TabelaOcorrencias(["a", "b", "a"])
+    for numero, achados in linhas:
+        tabela.acrescentar(numero, achados)
+    return tabela
+
+
+LINHAS = [
+    (0, {"a": [(0, 0, 1, 1)], "b": [(1, 1, 2, 2), (2, 2, 3, 3)]}),
+    (2, {}),
+    (3, {"b": [(3, 3, 4, 4)]}),
+    (7, {"a": [(7, 7, 8, 8)], "b": []}),
+]
+
+
+def test_estender_igual_a_acrescentar():
+    inteira, primeira, segunda = _tabela(LINHAS), _tabela(LINHAS[:2]), _tabela(LINHAS[2:])
+    primeira.estender(segunda)
+    assert list(primeira.linhas()) == list(inteira.linhas())
+    assert primeira.faixas() == inteira.faixas() == {0: (0, 3), 3: (3, 4), 7: (4, 5)}
+    assert inteira.contagens() == {"a": 2, "b": 3}
+    assert inteira.por_pagina() == {0: 3, 3: 1, 7: 1}
+
+
+def test_paginas_fora_de_ordem_e_termos_diferentes():
+    with pytest.raises(ValueError):
+        _tabela(LINHAS).acrescentar(3, {"a": [(0, 0, 1, 1)]})
+    with pytest.raises(ValueError):
+        _tabela(LINHAS[2:]).estender(_tabela(LINHAS[:2]))
+    with pytest.raises(ValueError):
+        _tabela(LINHAS).estender(TabelaOcorrencias(["b", "a"]))
+
+
+@pytest.mark.parametrize("paginas, termos", [(None, None), ({0, 7}, None), (None, {"b"}), ({3, 7, 9}, {"a"})])
+def test_filtrar_igual_a_filtrar_as_linhas(paginas, termos):
+    tabela = _tabela(LINHAS)
+    filtrada = tabela.filtrar(paginas, termos)
+    assert list(filtrada.linhas()) == [
+        linha for linha in tabela.linhas()
+        if (paginas is None or linha[0] in paginas) and (termos is None or linha[1] in termos)
+    ]
+    assert filtrada.faixas() == pickle.loads(pickle.dumps(filtrada)).faixas()
+
+
+def test_muitos_termos():
+    termos = [f"t{i}" for i in range(70000)]
+    tabela = TabelaOcorrencias(termos)
+    tabela.acrescentar(0, {"t69999": [(0, 0, 1, 1)]})
+    assert tabela.termo.typecode == "I"
+    assert list(tabela.linhas()) == [(0, "t69999", 0.0, 0.0, 1.0, 1.0)]
+
+
+def test_como_numpy():
+    np = pytest.importorskip("numpy")
+    colunas = _tabela(LINHAS).como_numpy()
+    assert colunas["pagina"].tolist() == [0, 0, 0, 3, 7]
+    assert colunas["termo"].tolist() == [0, 1, 1, 1, 0]
+    assert np.array_equal(colunas["retangulos"][3], [3, 3, 4, 4])
@@ -0,0 +1,41 @@
+"""
+Mark.me - Busca paralela por páginas (workers=N): mesmo plano e mesmas anotações da serial.
+"""
+import pytest
+
+from mark_me.core import apply_plan, contar_ocorrencias_multi, destacar_pdf_multi, find_matches, indexar_pdf
+from mark_me.stats import Estatisticas
+from tests.comum import anotacoes, linhas
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_workers_igual_a_serial(pdf, pares, tmp_path, workers):
+    serial, paralelo = find_matches(pdf, pares), find_matches(pdf, pares, workers=workers)
+    assert serial.total
+    assert linhas(paralelo) == linhas(serial)
+    apply_plan(serial, str(tmp_path / "serial.pdf"))
+    apply_plan(paralelo, str(tmp_path / "paralelo.pdf"))
+    assert anotacoes(tmp_path / "paralelo.pdf") == anotacoes(tmp_path / "serial.pdf")
+
+
+def test_workers_com_pages(pdf, pares):
+    assert linhas(find_matches(pdf, pares, workers=3, pages="2-4,9-")) == linhas(find_matches(pdf, pares, pages="2-4,9-"))
+
+
+def test_wrappers_com_workers(pdf, pares, termos, tmp_path):
+    assert contar_ocorrencias_multi(pdf, termos, workers=3) == contar_ocorrencias_multi(pdf, termos)
+    destacar_pdf_multi(pdf, str(tmp_path / "serial.pdf"), pares)
+    destacar_pdf_multi(pdf, str(tmp_path / "paralelo.pdf"), pares, workers=3)
+    assert anotacoes(tmp_path / "paralelo.pdf") == anotacoes(tmp_path / "serial.pdf")
+
+
+def test_workers_juntam_estatisticas(pdf, pares):
+    serial, paralelo = Estatisticas(), Estatisticas()
+    find_matches(pdf, pares, stats=serial)
+    find_matches(pdf, pares, workers=3, stats=paralelo)
+    assert paralelo.contagens == serial.contagens
+    assert sorted(paralelo.paginas) == sorted(serial.paginas)
+
+
+def test_indexar_com_workers(pdf):
+    assert [ix.texto for ix in indexar_pdf(pdf, workers=3)] == [ix.texto for ix in indexar_pdf(pdf)]